@@ -1,9 +1,10 @@
 from datetime import datetime
+import copy
 import requests
 import logging
 from helpers.constants import START_TIME
-from helpers.helpers import (format_date_yyyy_mm_dd, process_game_report,
-                             get_coaches_name)
+from helpers.helpers import (format_date_yyyy_mm_dd, process_game_report)
+from helpers.coach_index import CoachIndex
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,18 @@ class Assignr:
         self.base_url = base_url
         self.auth_url = auth_url
         self.site_id = None
+        self.site_name = None
         self.token = None
         self.referees = {}
         self.assignors = {}
+        # Set to a dict to reuse responses, keyed by end point and params
+        self.response_cache = None
+        # Set to a requests.Session to share connections between sites
+        self.session = None
+        # Set to a Checkpoint to save each page as it's fetched
+        self.checkpoint = None
+        # Set to a RateLimiter to space out the requests of every site
+        self.rate_limiter = None
 
     def authenticate(self) -> None:
         form_data = {
@@ -50,6 +60,53 @@ class Assignr:
         except (KeyError, TypeError):
             logging.error('Site id not found')
 
+    def get_sites(self):
+        """
+        Returns the id and name of every site the credentials can see.
+        """
+        sites = []
+        page_nbr = 1
+        more_rows = True
+        while more_rows:
+            rc, response = self.get_requests('/sites', params={'page': page_nbr})
+            if rc != 200:
+                logging.error(f"Response code {rc} returned for get_sites")
+                return sites
+            try:
+                for site in response['_embedded']['sites']:
+                    sites.append({'id': site['id'], 'name': site['name']})
+                total_pages = response['page']['pages']
+            except (KeyError, TypeError):
+                logging.error('Sites not found')
+                return sites
+
+            page_nbr += 1
+            if page_nbr > total_pages:
+                more_rows = False
+        return sites
+
+    def for_site(self, site):
+        """
+        Returns a client for another site sharing this client's token,
+        session and response cache.
+        """
+        client = copy.copy(self)
+        client.site_id = site['id']
+        client.site_name = site['name']
+        client.referees = {}
+        client.assignors = {}
+        return client
+
+    def without_response_cache(self):
+        """
+        Returns a client sharing this client's token, session and users
+        that doesn't keep the responses it fetches, for exports that read
+        each page once.
+        """
+        client = copy.copy(self)
+        client.response_cache = None
+        return client
+
     def get_requests(self, end_point, params=None):
         if not self.token:
             self.authenticate()
@@ -59,13 +116,77 @@ class Assignr:
             'authorization': f'Bearer {self.token}'
         }
 
+        cache_key = (self.site_id, end_point, tuple(sorted((params or {}).items())))
+        if self.response_cache is not None and cache_key in self.response_cache:
+            return 200, self.response_cache[cache_key]
+        # Only pages of paginated results are checkpointed
+        checkpoint = self.checkpoint if 'page' in (params or {}) else None
+        if checkpoint is not None:
+            saved = checkpoint.load(cache_key)
+            if saved is not None:
+                if self.response_cache is not None:
+                    self.response_cache[cache_key] = saved
+                return 200, saved
+
         # Logic manages pagination url
-        if self.base_url in end_point:
-            response = requests.get(end_point, headers=headers, params=params)
-        else:
-            response = requests.get(f"{self.base_url}{end_point}", headers=headers, params=params)
+        if self.base_url not in end_point:
+            end_point = f"{self.base_url}{end_point}"
+        response = self.send('get', end_point, headers, params=params)
+        if response.status_code == 200:
+            if self.response_cache is not None:
+                self.response_cache[cache_key] = response.json()
+            if checkpoint is not None:
+                checkpoint.save(cache_key, response.json())
+        elif checkpoint is not None:
+            checkpoint.record_failure()
         return response.status_code, response.json()
 
+    def send(self, method, end_point, headers, **kwargs):
+        """
+        Sends a request once the rate limiter allows it, authenticating
+        again when the token is rejected.
+        """
+        http = self.session or requests
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        response = getattr(http, method)(end_point, headers=headers, **kwargs)
+        if response.status_code == 401:
+            # The token expired, as it does when the client is kept between runs
+            logger.info('Token rejected, authenticating again')
+            self.authenticate()
+            headers['authorization'] = f'Bearer {self.token}'
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = getattr(http, method)(end_point, headers=headers, **kwargs)
+        return response
+
+    def write_requests(self, method, end_point, payload=None):
+        """
+        Sends a change to Assignr, returning the status code and the
+        response, if any. Changes are never cached or checkpointed.
+        """
+        if not self.token:
+            self.authenticate()
+
+        headers = {
+            'accept': 'application/json',
+            'authorization': f'Bearer {self.token}'
+        }
+        if self.base_url not in end_point:
+            end_point = f"{self.base_url}{end_point}"
+        kwargs = {} if payload is None else {'json': payload}
+        response = self.send(method, end_point, headers, **kwargs)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+    def delete_game(self, game_id):
+        return self.write_requests('delete', f'games/{game_id}')
+
+    def update_game(self, game_id, fields):
+        return self.write_requests('patch', f'games/{game_id}', {'game': fields})
+
     def load_referees_assignors(self):
         self.referees = {}
         self.assignors = {}
@@ -119,8 +240,10 @@ class Assignr:
                 if '_embedded' in official and \
                     'official' in official['_embedded'] and \
                     'id' in official['_embedded']['official']:
-                    referee_info = self.referees[official['_embedded']['official']['id']]
+                    referee_id = official['_embedded']['official']['id']
+                    referee_info = self.referees[referee_id]
                     referees.append({
+                        'id': referee_id,
                         'accepted': official['accepted'],
                         'position': official['position'],
                         'first_name': referee_info['first_name'],
@@ -131,11 +254,20 @@ class Assignr:
             logging.error(f"Key: {ke}, missing from Referee")
         return referees
 
+    def get_open_positions(self, payload):
+        """
+        Returns the positions of the assignments no official has been
+        assigned to.
+        """
+        return [official['position'] for official in payload
+                if 'official' not in official.get('_embedded', {})]
+
     def get_game_information(self, payload):
         try:
             sub_item = payload["_embedded"]
             assignor = self.assignors[sub_item['assignor']['id']]
             referees = self.get_referees_by_assignments(sub_item['assignments'])
+            open_positions = self.get_open_positions(sub_item['assignments'])
             sub_venue = payload["subvenue"] if "subvenue" in payload else None
 
             return {
@@ -153,6 +285,7 @@ class Assignr:
                 'game_type': payload["game_type"],
                 'cancelled': payload["cancelled"],
                 'referees': referees,
+                'open_positions': open_positions,
                 'assignor': assignor 
             }
         except KeyError as ke:
@@ -172,25 +305,25 @@ class Assignr:
                 'game_type': None,
                 'cancelled': None,
                 'referees': None,
+                'open_positions': None,
                 'assignor': None                 
             }
 
-    def get_reports(self, start_dt, end_dt, assignors, coaches):
+    def get_report_pages(self, start_dt, end_dt):
+        """
+        Fetches the game report submissions, one response per page. Doesn't
+        need the coaches or assignors, so it can run while they load.
+
+        The submissions end point isn't scoped to a site, so a client made
+        by for_site only keeps the submissions for its own site's games.
+        """
         if not self.token:
             self.authenticate()
 
-        misconducts = []
-        admin_reports = []
-        assignor_reports = []
+        pages = []
         page_nbr = 1
         more_rows = True
 
-        reports = {
-            "misconducts": misconducts,
-            "admin_reports": admin_reports,
-            'assignor_reports': assignor_reports
-        }
-
         if self.site_id is None:
             self.get_site_id()
 
@@ -205,41 +338,162 @@ class Assignr:
                                                       params=params)    
             if status_code != 200:
                 logging.error(f'Failed to get reports: {status_code}')
-                more_rows = False
-                return reports
+                break
 
+            pages.append(response)
             try:
                 total_pages = response['page']['pages']
-                for item in response['_embedded']['form_submissions']:
-                    data_dict = {}
-                    for data in item['_embedded']['values']:
-                        data_dict[data['key']] = data['value']
-
-                    data_dict[START_TIME] = datetime.fromisoformat(data_dict[START_TIME])
-                    data_dict['.author_name'] = item['author_name']
-                    result = process_game_report(data_dict)
-                    result['home_coach'] = get_coaches_name(coaches, result['age_group'], \
-                                                            result['gender'], result['home_team'])
-                    result['away_coach'] = get_coaches_name(coaches, result['age_group'], \
-                                                            result['gender'], result['away_team'])
-                    if result['admin_review']:
-                        reports['admin_reports'].append(result)
-                    if result['misconduct']:
-                        result['assignors'] = assignors[result['league']]
-                        reports['misconducts'].append(result)
-                    if result['assignments_correct'] == False:
-                        result['assignors'] = assignors[result['league']]
-                        reports['assignor_reports'].append(result)
-
             except KeyError as ke:
                 logging.error(f"Key: {ke}, missing from Game Report response")
+                break
 
             page_nbr += 1
             if page_nbr > total_pages:
                 more_rows = False
 
+        if self.site_name is None:
+            return pages
+
+        game_ids = self.get_site_game_ids(start_dt, end_dt)
+        if game_ids is None:
+            logging.error(f'Failed to get the games of site {self.site_name},'
+                          ' skipping its reports')
+            return []
+        return [self.filter_site_submissions(page, game_ids) for page in pages]
+
+    def get_site_game_ids(self, start_dt, end_dt):
+        """
+        Returns the ids of the site's games between the dates, or None when
+        a page of games couldn't be fetched.
+        """
+        game_ids = set()
+        params = {
+            SEARCH_START_DT: format_date_yyyy_mm_dd(start_dt),
+            SEARCH_END_DT: format_date_yyyy_mm_dd(end_dt),
+            'page': 1,
+            'limit': 50
+        }
+
+        while True:
+            status_code, response = self.get_requests(f'sites/{self.site_id}/games',
+                                                      params=dict(params))
+            if status_code != 200:
+                logging.error(f'Failed to get games: {status_code}')
+                return None
+
+            try:
+                for item in response['_embedded']['games']:
+                    game_ids.add(item['id'])
+                total_pages = response['page']['pages']
+            except KeyError as ke:
+                logging.error(f"Key: {ke}, missing from Game response")
+                return None
+
+            if params['page'] >= total_pages:
+                return game_ids
+            params['page'] += 1
+
+    def filter_site_submissions(self, page, game_ids):
+        """
+        Returns a copy of the page keeping the submissions filed for one of
+        the games.
+        """
+        try:
+            submissions = page['_embedded']['form_submissions']
+        except KeyError:
+            return page
+
+        kept = [item for item in submissions
+                if item.get('_embedded', {}).get('game', {}).get('id') in game_ids]
+        return {**page, '_embedded': {**page['_embedded'],
+                                      'form_submissions': kept}}
+
+    def classify_submissions(self, submissions, assignors, coaches,
+                             reports=None):
+        """
+        Adds each game report submission to the misconduct, administrator
+        and assignor reports it belongs to. Raises KeyError for a
+        submission missing a value, keeping the ones already added.
+        """
+        if not isinstance(coaches, CoachIndex):
+            coaches = CoachIndex(coaches)
+
+        if reports is None:
+            reports = {
+                "misconducts": [],
+                "admin_reports": [],
+                'assignor_reports': []
+            }
+
+        for item in submissions:
+            data_dict = {}
+            for data in item['_embedded']['values']:
+                data_dict[data['key']] = data['value']
+
+            data_dict[START_TIME] = datetime.fromisoformat(data_dict[START_TIME])
+            data_dict['.author_name'] = item['author_name']
+            result = process_game_report(data_dict)
+            result['report_id'] = item['id']
+            result['home_coach'] = coaches.get(result['age_group'], \
+                                               result['gender'], result['home_team'])
+            result['away_coach'] = coaches.get(result['age_group'], \
+                                               result['gender'], result['away_team'])
+            if result['admin_review']:
+                reports['admin_reports'].append(result)
+            if result['misconduct']:
+                result['assignors'] = assignors[result['league']]
+                reports['misconducts'].append(result)
+            if result['assignments_correct'] == False:
+                result['assignors'] = assignors[result['league']]
+                reports['assignor_reports'].append(result)
+
         return reports
 
+    def classify_reports(self, pages, assignors, coaches):
+        if not isinstance(coaches, CoachIndex):
+            coaches = CoachIndex(coaches)
+
+        misconducts = []
+        admin_reports = []
+        assignor_reports = []
+
+        reports = {
+            "misconducts": misconducts,
+            "admin_reports": admin_reports,
+            'assignor_reports': assignor_reports
+        }
+
+        for response in pages:
+            try:
+                self.classify_submissions(response['_embedded']['form_submissions'],
+                                          assignors, coaches, reports)
+            except KeyError as ke:
+                logging.error(f"Key: {ke}, missing from Game Report response")
+
+        return reports
+
+    def partition_by_league(self, pages):
+        """
+        Splits the game report submissions by the league they were filed
+        for, without processing them.
+        """
+        leagues = {}
+        for response in pages:
+            try:
+                for item in response['_embedded']['form_submissions']:
+                    league = None
+                    for data in item['_embedded']['values']:
+                        if data['key'] == '.league':
+                            league = data['value']
+                    leagues.setdefault(league, []).append(item)
+            except KeyError as ke:
+                logging.error(f"Key: {ke}, missing from Game Report response")
+        return leagues
+
+    def get_reports(self, start_dt, end_dt, assignors, coaches):
+        return self.classify_reports(self.get_report_pages(start_dt, end_dt),
+                                     assignors, coaches)
+
     def get_availability(self, user_id, start_dt, end_dt):
         availability = []
         params = {
@@ -326,7 +580,12 @@ class Assignr:
 
         return games
     
-    def get_game_ids(self, start_dt, end_dt, game_type="Coastal"):
+    def get_game_ids(self, start_dt, end_dt, game_type="Coastal", complete=False):
+        """
+        Returns the games of the type, keyed by id. A page that can't be
+        fetched ends the search with the games found so far, or, with
+        complete, returns None.
+        """
         results = {}
         if not self.token:
             self.authenticate()
@@ -350,7 +609,7 @@ class Assignr:
             if status_code != 200:
                 logging.error(f'Failed to get reports: {status_code}')
                 more_rows = False
-                return results
+                return None if complete else results
 
             try:
                 total_pages = response['page']['pages']
@@ -364,6 +623,8 @@ class Assignr:
 
             except KeyError as ke:
                 logging.error(f"Key: {ke}, missing from Game Report response")
+                if complete:
+                    return None
 
             page_nbr += 1
             params['page'] = page_nbr
@@ -372,34 +633,42 @@ class Assignr:
 
         return results
 
-    def get_league_games(self, league, start_dt, end_dt):
-        results = []
-
+    def iter_league_games(self, league, start_dt, end_dt):
+        """
+        Yields the league's games page by page, as each page arrives.
+        """
         params = {
             SEARCH_START_DT: format_date_yyyy_mm_dd(start_dt),
-            SEARCH_END_DT: format_date_yyyy_mm_dd(end_dt)
+            SEARCH_END_DT: format_date_yyyy_mm_dd(end_dt),
+            'page': 1
         }
 
         if self.site_id is None:
             self.get_site_id()
 
-        status_code, response = self.get_requests(f'sites/{self.site_id}/games',
-                                                  params=params)
+        while True:
+            status_code, response = self.get_requests(f'sites/{self.site_id}/games',
+                                                      params=dict(params))
 
-        if status_code != 200:
-            logging.error(f'Failed to get games: {status_code}')
-            return results
+            if status_code != 200:
+                logging.error(f'Failed to get games: {status_code}')
+                return
 
-        try:
-            for item in response['_embedded']['games']:
-                if item['league'] == league:
-                    game_info = self.get_game_information(item)
-                    results.append(game_info)
+            try:
+                for item in response['_embedded']['games']:
+                    if item['league'] == league:
+                        yield self.get_game_information(item)
+                total_pages = response.get('page', {}).get('pages', 1)
+            except KeyError as ke:
+                logging.error(f"Key: {ke}, missing from Game response")
+                return
 
-        except KeyError as ke:
-            logging.error(f"Key: {ke}, missing from Game response")
+            if params['page'] >= total_pages:
+                return
+            params['page'] += 1
 
-        return results
+    def get_league_games(self, league, start_dt, end_dt):
+        return list(self.iter_league_games(league, start_dt, end_dt))
 
     def get_assignors(self):
         results = []
@@ -0,0 +1,145 @@
+from os import (environ, makedirs, path, replace, stat)
+from sys import (argv, exit)
+from sys import path as sys_path
+from importlib import import_module
+from tempfile import mkdtemp
+from zipfile import (ZipFile, is_zipfile)
+import logging
+import shutil
+
+COMMANDS = {
+    'availability': 'availability',
+    'backfill': 'backfill',
+    'bulk_games': 'bulk_games',
+    'conflict_report': 'conflict_report',
+    'email_benchmark': 'email_benchmark',
+    'flush_outbox': 'flush_outbox',
+    'game_report': 'game_report',
+    'missing_game_reports': 'missing_game_reports',
+    'scheduler': 'scheduler',
+    'score_sheet': 'score_sheet',
+    'suggest_crews': 'suggest_crews'
+}
+COMMAND_SEPARATOR = '+'
+NATIVE_DIR = '_native'
+USAGE = f'USAGE: assignr_tools.py <{"|".join(COMMANDS)}> [command options]' \
+    f' [{COMMAND_SEPARATOR} <command> [command options] ...]'
+
+logger = logging.getLogger(__name__)
+
+
+def get_command(args):
+    if not args or args[0] in ('-h', '--help'):
+        logger.error(USAGE)
+        return 99, None
+
+    if args[0] not in COMMANDS:
+        logger.error(f"Command value, {args[0]} is invalid")
+        logger.error(USAGE)
+        return 77, None
+
+    return 0, args[0]
+
+def split_commands(args) -> list:
+    """
+    Splits the arguments on a standalone separator, one list per command.
+    """
+    commands = [[]]
+    for arg in args:
+        if arg == COMMAND_SEPARATOR:
+            commands.append([])
+        else:
+            commands[-1].append(arg)
+    return commands
+
+def get_cache_dir():
+    return environ.get('ASSIGNR_TOOLS_CACHE',
+                       path.join(environ.get('XDG_CACHE_HOME',
+                                             path.expanduser('~/.cache')),
+                                 'assignr_tools'))
+
+def add_native_packages() -> None:
+    """
+    When running from the zipapp, packages with compiled extensions can't
+    be imported from the archive. They're extracted once per build of the
+    archive to a cache directory which is added to the module search path.
+    """
+    archive = path.dirname(path.abspath(__file__))
+    if not is_zipfile(archive):
+        return
+
+    archive_stat = stat(archive)
+    native_dir = path.join(get_cache_dir(),
+                           f'{archive_stat.st_size}-{archive_stat.st_mtime_ns}')
+    if not path.isdir(native_dir):
+        with ZipFile(archive) as bundle:
+            members = [name for name in bundle.namelist()
+                       if name.startswith(f'{NATIVE_DIR}/')]
+            if not members:
+                return
+            makedirs(path.dirname(native_dir), exist_ok=True)
+            temp_dir = mkdtemp(dir=path.dirname(native_dir))
+            bundle.extractall(temp_dir, members)
+        try:
+            replace(temp_dir, native_dir)
+        except OSError:
+            # Another run extracted the same archive first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    sys_path.append(path.join(native_dir, NATIVE_DIR))
+
+def run_commands(commands) -> int:
+    """
+    Runs several commands in one process. Every command's options are
+    checked before any of them runs. The commands share one RunContext, so
+    the Assignr token, site id and the pages already fetched, the coach
+    directory and the outbox are loaded once. Stops at the first command
+    that fails and returns its return code.
+    """
+    from helpers.context import RunContext
+
+    runs = []
+    for command_args in commands:
+        module = import_module(COMMANDS[command_args[0]])
+        rc, args = module.get_arguments(command_args[1:])
+        if rc:
+            return rc
+        runs.append((command_args[0], module, args))
+
+    context = RunContext()
+    rc = 0
+    for command, module, args in runs:
+        logger.info(f"Running {command}")
+        rc = module.run(args, context)
+        if rc:
+            logger.error(f"{command} failed with return code {rc}")
+            break
+    context.close()
+    return rc
+
+def main():
+    """
+    Single entry point for the zipapp. Runs the script named by the first
+    argument with the remaining arguments, as if it had been run directly.
+    Each script is only imported when it's the one being run. Commands
+    separated by "+" are run one after another in the same process.
+    """
+    commands = split_commands(argv[1:])
+    for command_args in commands:
+        rc, _ = get_command(command_args)
+        if rc:
+            exit(rc)
+
+    add_native_packages()
+    if len(commands) > 1:
+        rc = run_commands(commands)
+        if rc:
+            exit(rc)
+        return
+
+    command = commands[0][0]
+    argv[:] = [f'{command}.py'] + commands[0][1:]
+    import_module(COMMANDS[command]).main()
+
+if __name__ == "__main__":
+    main()
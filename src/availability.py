@@ -5,8 +5,11 @@ import csv
 from dotenv import load_dotenv
 from getopt import (getopt, GetoptError)
 from datetime import datetime
-from assignr.assignr import Assignr
-from helpers.helpers import get_environment_vars
+from helpers.context import RunContext
+from helpers.availability_index import AvailabilityIndex
+from helpers.exporters import (AVAILABILITY_FIELDS, COVERAGE_FIELDS, CSV,
+                               check_export_arguments, get_exporter,
+                               log_to_stderr)
 
 load_dotenv()
 
@@ -17,16 +20,18 @@ logger = logging.getLogger(__name__)
 
 def get_arguments(args):
     arguments = {
-        'start_date': None, 'end_date': None
+        'start_date': None, 'end_date': None, 'format': CSV, 'output': None,
+        'coverage': False
     }
 
     rc = 0
     USAGE='USAGE: availability.py -s <start-date> -e <end-date>' \
-    ' FORMAT=MM/DD/YYYY'
+    ' -f <csv|ndjson|parquet> -o <output file> -c FORMAT=MM/DD/YYYY'
 
     try:
-        opts, args = getopt(args,"hs:e:",
-                            ["start-date=","end-date="])
+        opts, args = getopt(args,"hs:e:f:o:c",
+                            ["start-date=","end-date=","format=","output=",
+                             "coverage"])
     except GetoptError:
         logger.error(USAGE)
         return 77, arguments
@@ -39,6 +44,12 @@ def get_arguments(args):
             arguments['start_date'] = arg
         elif opt in ("-e", "--end-date"):
             arguments['end_date'] = arg
+        elif opt in ("-f", "--format"):
+            arguments['format'] = arg
+        elif opt in ("-o", "--output"):
+            arguments['output'] = arg
+        elif opt in ("-c", "--coverage"):
+            arguments['coverage'] = True
 
     if arguments['start_date'] is None or arguments['end_date'] is None:
         logger.error(USAGE)
@@ -55,6 +66,11 @@ def get_arguments(args):
         logger.error(f"End Date value, {arguments['end_date']} is invalid")
         rc = 88
 
+    error = check_export_arguments(arguments['format'], arguments['output'])
+    if error:
+        logger.error(error)
+        rc = 88
+
     return rc, arguments
 
 def get_referees():
@@ -62,7 +78,11 @@ def get_referees():
 
     try:
         with open(environ['FILE_NAME'], 'r') as csv_file:
-            reader = csv.reader(csv_file)
+            for row in csv.reader(csv_file):
+                referees.append({
+                    'referee': f"{row[0]} {row[1]}",
+                    'id': row[2]
+                })
     except KeyError:
         logger.error("FILE_NAME environment variable not provided")
         return referees
@@ -70,43 +90,89 @@ def get_referees():
         logger.error(f"{environ['FILE_NAME']} Not Found!")
         return referees
 
-    for row in reader:
-        referees.append({
-            'referee': f"{row[0]} {row[1]}",
-            'id': row[2]
-        })
-
     return referees
 
+def export_coverage(args, assignr, referees):
+    """
+    Writes one row per game with the referees available for it, from an
+    index of every referee's availability.
+    """
+    index = AvailabilityIndex()
+    names = {}
+    for referee in referees:
+        names[referee['id']] = referee['referee']
+        index.add_availability(referee['id'],
+                               assignr.get_availability(referee['id'], args['start_date'],
+                                                        args['end_date']))
+
+    games = assignr.get_game_ids(args['start_date'], args['end_date'])
+    available = index.query(games.values())
+    with get_exporter(args['format'], args['output'], COVERAGE_FIELDS) as exporter:
+        for game in games.values():
+            referee_ids = available[game['id']]
+            exporter.write({
+                'id': game['id'],
+                'game_date': game['game_date'],
+                'game_time': game['game_time'],
+                'league': game['league'],
+                'home_team': game['home_team'],
+                'away_team': game['away_team'],
+                'available': len(referee_ids),
+                'referees': '; '.join(names[referee_id] for referee_id in referee_ids)
+            })
+
+    logger.info(f"Exported coverage of {exporter.count} game(s)")
+    return 0
+
+def run(args, context):
+    """
+    Writes each referee's availability as soon as it's returned, so the
+    export never holds more than one referee's availability. The responses
+    aren't kept by the client.
+    """
+    if not args['output']:
+        log_to_stderr()
+
+    if args['coverage']:
+        rc, assignr = context.load_users()
+        if rc:
+            return rc
+        return export_coverage(args, assignr.without_response_cache(),
+                               get_referees())
+
+    rc, assignr = context.get_assignr()
+    if rc:
+        return rc
+    assignr = assignr.without_response_cache()
+
+    with get_exporter(args['format'], args['output'], AVAILABILITY_FIELDS) as exporter:
+        for referee in get_referees():
+            response = assignr.get_availability(referee['id'], args['start_date'],
+                                        args['end_date'])
+            if not response:
+                logger.warning(f"{referee['referee']} isn't Available")
+
+            for resp in response:
+                exporter.write({
+                    'referee': referee['referee'],
+                    'referee_id': referee['id'],
+                    'date': resp['date'],
+                    'availability': resp['avail']
+                })
+
+    logger.info(f"Exported {exporter.count} availability row(s)")
+    return 0
+
 def main():
     rc, args = get_arguments(argv[1:])
     if rc:
         exit(rc)
 
-    rc, env_vars = get_environment_vars()
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
     if rc:
         exit(rc)
 
-    assignr = Assignr(env_vars['CLIENT_ID'], env_vars['CLIENT_SECRET'],
-                      env_vars['CLIENT_SCOPE'], env_vars['BASE_URL'],
-                      env_vars['AUTH_URL'])
-
-    referee_availability = []
-    for referee in get_referees():
-        response = assignr.get_availability(referee['id'], args['start_date'],
-                                    args['end_date'])
-        if response:
-            for resp in response:
-                print(f"{referee['referee']} - {resp['date']} - {resp['avail']}")
-        else:
-            logger.warning(f"{referee['referee']} isn't Available")
-
-        referee_availability.append({
-            'referee': referee['referee'],
-            'availability': response
-        })
-
-    print(referee_availability)
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,205 @@
+from os import (environ, makedirs, path, replace)
+from sys import (argv, exit, stdout)
+import json
+import logging
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+from datetime import datetime
+from concurrent.futures import (ThreadPoolExecutor, as_completed)
+
+from helpers.backfill import (ShardStore, get_backfill_dir, get_shards,
+                              get_submissions, is_complete, merge_shards)
+from helpers.checkpoint import get_run_id
+from helpers.context import RunContext
+
+START_DATE = "start_date"
+END_DATE = "end_date"
+SHARD_DAYS = "shard_days"
+WORKERS = "workers"
+OUTPUT = "output"
+RESUME = "resume"
+
+env_file = environ.get('ENV_FILE', '.env')
+load_dotenv(env_file)
+
+log_level = environ.get('LOG_LEVEL', logging.INFO)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        START_DATE: None, END_DATE: None, SHARD_DAYS: 7, WORKERS: 4,
+        OUTPUT: None, RESUME: False
+    }
+
+    rc = 0
+    USAGE='USAGE: backfill.py -s <start-date> -e <end-date> -w <shard days>' \
+    ' -j <workers> -o <output file> --resume DATE FORMAT=MM/DD/YYYY'
+
+    try:
+        opts, args = getopt(args,"hs:e:w:j:o:",
+                            ["start-date=","end-date=","shard-days=",
+                             "workers=","output=","resume"])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-s", "--start-date"):
+            arguments[START_DATE] = arg
+        elif opt in ("-e", "--end-date"):
+            arguments[END_DATE] = arg
+        elif opt in ("-w", "--shard-days"):
+            arguments[SHARD_DAYS] = arg
+        elif opt in ("-j", "--workers"):
+            arguments[WORKERS] = arg
+        elif opt in ("-o", "--output"):
+            arguments[OUTPUT] = arg
+        elif opt == "--resume":
+            arguments[RESUME] = True
+
+    if not arguments[START_DATE]:
+        logger.error("Start Date is required")
+        logger.error(USAGE)
+        return 88, arguments
+
+    for key, name in ((START_DATE, 'Start Date'), (END_DATE, 'End Date')):
+        try:
+            if arguments[key]:
+                arguments[key] = datetime.strptime(arguments[key], "%m/%d/%Y").date()
+            else:
+                arguments[key] = datetime.now().date()
+                logger.info(f"No end date provided, setting to {arguments[key]}")
+        except ValueError:
+            logger.error(f"{name} value, {arguments[key]} is invalid")
+            rc = 88
+
+    for key, name in ((SHARD_DAYS, 'Shard days'), (WORKERS, 'Workers')):
+        try:
+            arguments[key] = int(arguments[key])
+            if arguments[key] < 1:
+                raise ValueError
+        except ValueError:
+            logger.error(f"{name} value, {arguments[key]} is invalid")
+            rc = 88
+
+    if not rc and arguments[START_DATE] > arguments[END_DATE]:
+        logger.error(f"Start Date {arguments[START_DATE]} is after End Date {arguments[END_DATE]}")
+        rc = 88
+
+    return rc, arguments
+
+def fetch_shard(site, store, shard) -> bool:
+    """
+    Fetches one shard's game reports and saves them as soon as every page
+    is fetched. Returns False when a page couldn't be fetched, leaving the
+    shard for the next run.
+    """
+    pages = site.get_report_pages(*shard)
+    if not is_complete(pages):
+        logger.error(f"Shard {shard[0]} to {shard[1]} of site {site.site_id} not fetched")
+        return False
+    try:
+        submissions = get_submissions(pages)
+    except (KeyError, TypeError) as error:
+        logger.error(f"Shard {shard[0]} to {shard[1]} of site {site.site_id}"
+                     f" not fetched, {error} missing from a page")
+        return False
+    try:
+        store.save(shard, submissions)
+    except OSError as error:
+        logger.error(f"Unable to save shard {shard[0]} to {shard[1]}: {error}")
+        return False
+    logger.debug(f"Shard {shard[0]} to {shard[1]} of site {site.site_id} saved")
+    return True
+
+def save_output(output_file, args, site_ids, submissions) -> None:
+    output_dir = path.dirname(output_file)
+    if output_dir:
+        makedirs(output_dir, exist_ok=True)
+    temp_file = f'{output_file}.tmp'
+    with open(temp_file, 'w') as output_json:
+        json.dump({
+            'start_date': args[START_DATE].isoformat(),
+            'end_date': args[END_DATE].isoformat(),
+            'sites': site_ids,
+            'form_submissions': submissions
+        }, output_json)
+    replace(temp_file, output_file)
+
+def run(args, context):
+    """
+    Fetches the missing shards of the date range in parallel, then merges
+    every shard into one file of game reports.
+    """
+    rc, _ = context.get_environment_vars()
+    if rc:
+        return rc
+
+    rc, sites = context.get_sites()
+    if rc:
+        return rc
+
+    backfill_dir = get_backfill_dir()
+    shards = get_shards(args[START_DATE], args[END_DATE], args[SHARD_DAYS])
+    # Pages of the shards that don't complete are kept for --resume
+    context.start_checkpoint(get_run_id('backfill', args[START_DATE], args[END_DATE],
+                                        args[SHARD_DAYS]), args[RESUME])
+    completed = False
+    try:
+        stores = []
+        pending = []
+        for site in sites:
+            # Resolved once, so the shards don't each look it up
+            if site.site_id is None:
+                site.get_site_id()
+            store = ShardStore(backfill_dir, site.site_id)
+            stores.append(store)
+            pending.extend((site, store, shard) for shard in store.missing(shards))
+        logger.info(f"Fetching {len(pending)} of {len(shards) * len(sites)} shard(s)")
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=args[WORKERS],
+                                thread_name_prefix='shard') as executor:
+            futures = [executor.submit(fetch_shard, *task) for task in pending]
+            for future in as_completed(futures):
+                if not future.result():
+                    failed += 1
+        completed = not failed
+    finally:
+        context.finish_checkpoint(completed)
+    if failed:
+        logger.error(f"{failed} shard(s) not fetched, run the backfill again to fetch them")
+        return 33
+
+    submissions = merge_shards(store.load(shard) for store in stores
+                               for shard in shards)
+    output_file = args[OUTPUT] or path.join(
+        backfill_dir,
+        f'game_reports_{args[START_DATE].isoformat()}_{args[END_DATE].isoformat()}.json')
+    save_output(output_file, args, [site.site_id for site in sites], submissions)
+    logger.info(f"{len(submissions)} game report(s) saved to {output_file}")
+    return 0
+
+def main():
+    logger.info("Starting Backfill")
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+    logger.info("Completed Backfill")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+from os import (environ, listdir, makedirs, path, remove, walk)
+from py_compile import PycInvalidationMode
+from sys import (argv, executable, exit, stdout)
+from getopt import (getopt, GetoptError)
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import compileall
+import re
+import logging
+import shutil
+import subprocess
+import zipapp
+
+from assignr_tools import (COMMANDS, NATIVE_DIR)
+
+SRC_DIR = path.dirname(path.realpath(__file__))
+PACKAGES = ['assignr', 'helpers']
+EXCLUDE = shutil.ignore_patterns('__pycache__', '*.pyc', 'tests')
+DISCOVERY_DIR = path.join('googleapiclient', 'discovery_cache', 'documents')
+DISCOVERY_DOCUMENTS = ['drive.v3.json', 'sheets.v4.json']
+EXTENSION_SUFFIXES = ('.so', '.pyd')
+# Packages that hand out paths to their data files, certifi's CA bundle
+# is copied to a temporary file on every run when imported from a zip
+DATA_FILE_PACKAGES = ['certifi']
+OUTPUT = "output"
+REQUIREMENTS = "requirements"
+RUNS = "runs"
+
+log_level = environ.get('LOG_LEVEL', logging.INFO)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        OUTPUT: path.join(path.dirname(SRC_DIR), 'dist', 'assignr_tools.pyz'),
+        REQUIREMENTS: path.join(SRC_DIR, 'requirements-game-report.txt'),
+        RUNS: 0
+    }
+
+    rc = 0
+    USAGE='USAGE: build_zipapp.py -o <output file> -r <requirements file>' \
+    ' -b <cold start runs, 0 skips the benchmark>'
+
+    try:
+        opts, args = getopt(args,"ho:r:b:",
+                            ["output=","requirements=","benchmark="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-o", "--output"):
+            arguments[OUTPUT] = arg
+        elif opt in ("-r", "--requirements"):
+            arguments[REQUIREMENTS] = arg
+        elif opt in ("-b", "--benchmark"):
+            arguments[RUNS] = arg
+
+    try:
+        arguments[RUNS] = int(arguments[RUNS])
+    except ValueError:
+        logger.error(f"Benchmark value, {arguments[RUNS]} is invalid")
+        rc = 88
+
+    if arguments[REQUIREMENTS] and not path.isfile(arguments[REQUIREMENTS]):
+        logger.error(f"Requirements file, {arguments[REQUIREMENTS]} Not Found!")
+        rc = 88
+
+    return rc, arguments
+
+def stage_sources(staging_dir) -> None:
+    for package in PACKAGES:
+        shutil.copytree(path.join(SRC_DIR, package),
+                        path.join(staging_dir, package), ignore=EXCLUDE)
+    for module in set(COMMANDS.values()) | {'assignr_tools'}:
+        shutil.copy2(path.join(SRC_DIR, f'{module}.py'), staging_dir)
+
+def install_requirements(staging_dir, requirements) -> int:
+    result = subprocess.run(
+        [executable, '-m', 'pip', 'install', '--quiet', '--no-compile',
+         '--disable-pip-version-check', '--target', staging_dir,
+         '-r', requirements],
+        capture_output=True, text=True, check=False)
+    if result.returncode:
+        logger.error(f"Failed to install {requirements}: {result.stderr.strip()}")
+        return 22
+    for directory in ('bin', '__pycache__'):
+        shutil.rmtree(path.join(staging_dir, directory), ignore_errors=True)
+    prune_requirements(staging_dir)
+    native = move_native_packages(staging_dir)
+    if native:
+        logger.info(f"Packages extracted on first run: {', '.join(native)}")
+    return 0
+
+def prune_requirements(staging_dir) -> None:
+    """
+    googleapiclient ships a discovery document for every Google API, most
+    of the archive's size and entries. Only the Sheets and Drive documents
+    are kept.
+    """
+    discovery_dir = path.join(staging_dir, DISCOVERY_DIR)
+    if path.isdir(discovery_dir):
+        for document in listdir(discovery_dir):
+            if document not in DISCOVERY_DOCUMENTS:
+                remove(path.join(discovery_dir, document))
+
+def has_extensions(package_dir) -> bool:
+    for _, _, files in walk(package_dir):
+        if any(file_name.endswith(EXTENSION_SUFFIXES) for file_name in files):
+            return True
+    return False
+
+def find_native_packages(staging_dir, prefix=''):
+    """
+    Returns the packages and modules, relative to the staging directory,
+    that contain compiled extensions or need their data files on disk.
+    Namespace packages, like google, are searched one level down so only
+    the portion with extensions is moved.
+    """
+    native = []
+    for name in sorted(listdir(path.join(staging_dir, prefix))):
+        relative = path.join(prefix, name)
+        full_path = path.join(staging_dir, relative)
+        if relative in DATA_FILE_PACKAGES or name.endswith(EXTENSION_SUFFIXES):
+            native.append(relative)
+        elif path.isdir(full_path) and not name.endswith('.dist-info') and \
+            name != NATIVE_DIR:
+            if path.isfile(path.join(full_path, '__init__.py')):
+                if has_extensions(full_path):
+                    native.append(relative)
+            elif has_extensions(full_path):
+                native.extend(find_native_packages(staging_dir, relative))
+    return native
+
+def move_native_packages(staging_dir) -> list:
+    """
+    zipimport can't load compiled extensions. Packages that have them, or
+    that need their data files on disk, are moved under NATIVE_DIR, which
+    assignr_tools extracts to a cache directory the first time the archive
+    runs.
+    """
+    native = find_native_packages(staging_dir)
+    for relative in native:
+        destination = path.join(staging_dir, NATIVE_DIR, relative)
+        makedirs(path.dirname(destination), exist_ok=True)
+        shutil.move(path.join(staging_dir, relative), destination)
+    return native
+
+def build_zipapp(output, requirements=None) -> int:
+    """
+    Builds a single file zipapp holding the scripts, the helpers templates
+    and the requirements. Modules are compiled next to their source, the
+    only layout zipimport loads bytecode from, so nothing is compiled at
+    start up. Extracted packages get unchecked pycs since their files'
+    modification times change when they're extracted.
+    """
+    with TemporaryDirectory() as staging_dir:
+        stage_sources(staging_dir)
+        if requirements:
+            rc = install_requirements(staging_dir, requirements)
+            if rc:
+                return rc
+
+        native_dir = path.join(staging_dir, NATIVE_DIR)
+        if not compileall.compile_dir(staging_dir, quiet=1, legacy=True,
+                                      rx=re.compile(re.escape(native_dir))) or \
+            (path.isdir(native_dir) and not compileall.compile_dir(
+                native_dir, quiet=1,
+                invalidation_mode=PycInvalidationMode.UNCHECKED_HASH)):
+            logger.error("Failed to compile the zipapp sources")
+            return 22
+
+        makedirs(path.dirname(path.abspath(output)), exist_ok=True)
+        zipapp.create_archive(staging_dir, output, interpreter='/usr/bin/env python3',
+                              main='assignr_tools:main')
+
+    logger.info(f"Built {output}, {path.getsize(output)} bytes")
+    return 0
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = perf_counter()
+        result = subprocess.run(command, cwd=SRC_DIR, capture_output=True,
+                                text=True, check=False)
+        timings.append(perf_counter() - start)
+        # -h exits with 99 once every import succeeded
+        if result.returncode != 99:
+            logger.error(f"{' '.join(command)} failed: {result.stderr.strip()}")
+            return None
+    return median(timings)
+
+def measure_cold_start(output, runs):
+    """
+    Times each script printing its usage, which is all import and start up
+    work, run from the source tree and from the zipapp. The zipapp is run
+    with -S since everything it needs is inside the archive.
+    """
+    results = {}
+    for command, module in COMMANDS.items():
+        results[command] = (
+            time_command([executable, path.join(SRC_DIR, f'{module}.py'), '-h'], runs),
+            time_command([executable, '-S', path.abspath(output), command, '-h'], runs))
+    return results
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    rc = build_zipapp(args[OUTPUT], args[REQUIREMENTS])
+    if rc:
+        exit(rc)
+
+    if args[RUNS]:
+        print(f"{'Command':22} {'Source (ms)':>12} {'Zipapp (ms)':>12}")
+        for command, (source, bundle) in measure_cold_start(args[OUTPUT],
+                                                            args[RUNS]).items():
+            if source is None or bundle is None:
+                rc = 22
+                continue
+            print(f"{command:22} {source * 1000:12.1f} {bundle * 1000:12.1f}")
+        if rc:
+            exit(rc)
+
+if __name__ == "__main__":
+    main()
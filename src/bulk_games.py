@@ -0,0 +1,230 @@
+from os import environ
+from sys import (argv, exit, stdout)
+import logging
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+from datetime import datetime
+
+from helpers.bulk import (ACTIONS, FAILED, RESCHEDULE, BulkUpdater, get_journal,
+                          select_games)
+from helpers.checkpoint import get_run_id
+from helpers.context import RunContext
+from helpers.exporters import (BULK_FIELDS, CSV, check_export_arguments,
+                               get_exporter, log_to_stderr)
+from helpers.helpers import get_content_hash
+
+ACTION = "action"
+START_DATE = "start_date"
+END_DATE = "end_date"
+GAME_TYPE = "game_type"
+FILTERS = "filters"
+NEW_DATE = "new_date"
+NEW_TIME = "new_time"
+WORKERS = "workers"
+DRY_RUN_ARG = "dry_run"
+RESUME = "resume"
+FORMAT = "format"
+OUTPUT = "output"
+
+env_file = environ.get('ENV_FILE', '.env')
+load_dotenv(env_file)
+
+log_level = environ.get('LOG_LEVEL', logging.INFO)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_list(value):
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+def get_arguments(args):
+    arguments = {
+        ACTION: None, START_DATE: None, END_DATE: None, GAME_TYPE: 'Coastal',
+        FILTERS: {'league': None, 'venue': None, 'age_group': None, 'id': None},
+        NEW_DATE: None, NEW_TIME: None, WORKERS: 4, DRY_RUN_ARG: False,
+        RESUME: False, FORMAT: CSV, OUTPUT: None
+    }
+
+    rc = 0
+    USAGE='USAGE: bulk_games.py -a <delete|cancel|reschedule> -s <start-date>' \
+    ' -e <end-date> -g <game type, default "Coastal"> -l <leagues> -v <venues>' \
+    ' -y <age groups> -i <game ids> --date <new date> --time <new time, HH:MM>' \
+    ' -j <workers> -n -f <csv|ndjson|parquet> -o <output file> --resume' \
+    ' DATE FORMAT=MM/DD/YYYY'
+
+    try:
+        opts, args = getopt(args,"ha:s:e:g:l:v:y:i:j:nf:o:",
+                            ["action=","start-date=","end-date=","game-type=",
+                             "league=","venue=","age-group=","ids=","date=",
+                             "time=","workers=","dry-run","format=","output=",
+                             "resume"])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-a", "--action"):
+            arguments[ACTION] = arg
+        elif opt in ("-s", "--start-date"):
+            arguments[START_DATE] = arg
+        elif opt in ("-e", "--end-date"):
+            arguments[END_DATE] = arg
+        elif opt in ("-g", "--game-type"):
+            arguments[GAME_TYPE] = arg
+        elif opt in ("-l", "--league"):
+            arguments[FILTERS]['league'] = get_list(arg)
+        elif opt in ("-v", "--venue"):
+            arguments[FILTERS]['venue'] = get_list(arg)
+        elif opt in ("-y", "--age-group"):
+            arguments[FILTERS]['age_group'] = get_list(arg)
+        elif opt in ("-i", "--ids"):
+            arguments[FILTERS]['id'] = get_list(arg)
+        elif opt == "--date":
+            arguments[NEW_DATE] = arg
+        elif opt == "--time":
+            arguments[NEW_TIME] = arg
+        elif opt in ("-j", "--workers"):
+            arguments[WORKERS] = arg
+        elif opt in ("-n", "--dry-run"):
+            arguments[DRY_RUN_ARG] = True
+        elif opt in ("-f", "--format"):
+            arguments[FORMAT] = arg
+        elif opt in ("-o", "--output"):
+            arguments[OUTPUT] = arg
+        elif opt == "--resume":
+            arguments[RESUME] = True
+
+    if arguments[ACTION] is None or arguments[START_DATE] is None or \
+            arguments[END_DATE] is None:
+        logger.error(USAGE)
+        return 99, arguments
+
+    if arguments[ACTION] not in ACTIONS:
+        logger.error(f"Action value, {arguments[ACTION]} is invalid")
+        rc = 88
+
+    for key, name in ((START_DATE, 'Start Date'), (END_DATE, 'End Date'),
+                      (NEW_DATE, 'New Date')):
+        try:
+            if arguments[key]:
+                arguments[key] = datetime.strptime(arguments[key], "%m/%d/%Y").date()
+        except ValueError:
+            logger.error(f"{name} value, {arguments[key]} is invalid")
+            rc = 88
+
+    if arguments[NEW_TIME]:
+        try:
+            arguments[NEW_TIME] = datetime.strptime(arguments[NEW_TIME], "%H:%M").time()
+        except ValueError:
+            logger.error(f"New Time value, {arguments[NEW_TIME]} is invalid")
+            rc = 88
+
+    if arguments[ACTION] == RESCHEDULE and not (arguments[NEW_DATE] or arguments[NEW_TIME]):
+        logger.error("Rescheduling needs a new date, a new time or both, use --date or --time")
+        rc = 88
+
+    try:
+        arguments[WORKERS] = int(arguments[WORKERS])
+        if arguments[WORKERS] < 1:
+            raise ValueError
+    except ValueError:
+        logger.error(f"Workers value, {arguments[WORKERS]} is invalid")
+        rc = 88
+
+    error = check_export_arguments(arguments[FORMAT], arguments[OUTPUT])
+    if error:
+        logger.error(error)
+        rc = 88
+
+    return rc, arguments
+
+def get_fields(args) -> dict:
+    """
+    Returns the game fields a reschedule changes.
+    """
+    fields = {}
+    if args[NEW_DATE]:
+        fields['localized_date'] = args[NEW_DATE].isoformat()
+    if args[NEW_TIME]:
+        fields['localized_time'] = args[NEW_TIME].strftime('%H:%M')
+    return fields
+
+def get_operation_id(args) -> str:
+    """
+    Names what a run selects and changes beyond its action and dates, so
+    a resume only skips games changed by the same operation.
+    """
+    operation = {
+        GAME_TYPE: args[GAME_TYPE],
+        FILTERS: {name: sorted(values) for name, values in args[FILTERS].items()
+                  if values},
+        'fields': get_fields(args)
+    }
+    return get_content_hash('bulk_games', operation)[:12]
+
+def run(args, context):
+    """
+    Changes the selected games, writing each game's result. Returns 33
+    when any game couldn't be changed, run it again with --resume to only
+    retry those, and 44 when the games couldn't all be fetched.
+    """
+    if not args[OUTPUT]:
+        log_to_stderr()
+
+    rc, assignr = context.load_users()
+    if rc:
+        return rc
+
+    found = assignr.get_game_ids(args[START_DATE], args[END_DATE], args[GAME_TYPE],
+                                 complete=True)
+    if found is None:
+        logger.error("Games not fetched, none were changed")
+        return 44
+    games = select_games(found.values(), args[FILTERS])
+    journal = None
+    if not args[DRY_RUN_ARG]:
+        journal = get_journal(get_run_id('bulk_games', args[ACTION], args[START_DATE],
+                                         args[END_DATE], get_operation_id(args)),
+                              args[RESUME])
+    updater = BulkUpdater(assignr, args[ACTION], get_fields(args), args[WORKERS],
+                          args[DRY_RUN_ARG], journal)
+    results = updater.run(games)
+
+    counts = {}
+    with get_exporter(args[FORMAT], args[OUTPUT], BULK_FIELDS) as exporter:
+        for game, result in zip(games, results):
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            exporter.write(dict(result, game_date=game['game_date'],
+                                game_time=game['game_time'], league=game['league'],
+                                home_team=game['home_team'],
+                                away_team=game['away_team']))
+
+    logger.info(f"{len(games)} game(s) selected to {args[ACTION]}: " +
+                ', '.join(f'{count} {status}' for status, count in sorted(counts.items())))
+    if counts.get(FAILED):
+        logger.error(f"{counts[FAILED]} game(s) not changed, run again with --resume "
+                     "to retry them")
+        return 33
+    if journal is not None:
+        journal.discard()
+    return 0
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+
+if __name__ == "__main__":
+    main()
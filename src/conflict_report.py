@@ -0,0 +1,129 @@
+from os import environ
+from sys import (argv, exit, stdout)
+import logging
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+from datetime import datetime
+from helpers.availability_index import DEFAULT_GAME_MINUTES
+from helpers.conflicts import (DEFAULT_TURNAROUND_MINUTES, find_conflicts)
+from helpers.context import RunContext
+from helpers.exporters import (CONFLICT_FIELDS, CSV, check_export_arguments,
+                               get_exporter, log_to_stderr)
+
+load_dotenv()
+
+log_level = environ.get('LOG_LEVEL', 30)
+logging.basicConfig(stream=stdout,
+                    level=int(log_level))
+logger = logging.getLogger(__name__)
+
+def get_arguments(args):
+    arguments = {
+        'start_date': None, 'end_date': None, 'game_type': 'Coastal',
+        'game_minutes': DEFAULT_GAME_MINUTES,
+        'turnaround_minutes': DEFAULT_TURNAROUND_MINUTES,
+        'format': CSV, 'output': None
+    }
+
+    rc = 0
+    USAGE='USAGE: conflict_report.py -s <start-date> -e <end-date>' \
+    ' -g <game type, default "Coastal"> -m <game minutes> -t <turnaround minutes>' \
+    ' -f <csv|ndjson|parquet> -o <output file> FORMAT=MM/DD/YYYY'
+
+    try:
+        opts, args = getopt(args,"hs:e:g:m:t:f:o:",
+                            ["start-date=","end-date=","game-type=",
+                             "game-minutes=","turnaround-minutes=",
+                             "format=","output="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-s", "--start-date"):
+            arguments['start_date'] = arg
+        elif opt in ("-e", "--end-date"):
+            arguments['end_date'] = arg
+        elif opt in ("-g", "--game-type"):
+            arguments['game_type'] = arg
+        elif opt in ("-m", "--game-minutes"):
+            arguments['game_minutes'] = arg
+        elif opt in ("-t", "--turnaround-minutes"):
+            arguments['turnaround_minutes'] = arg
+        elif opt in ("-f", "--format"):
+            arguments['format'] = arg
+        elif opt in ("-o", "--output"):
+            arguments['output'] = arg
+
+    if arguments['start_date'] is None or arguments['end_date'] is None:
+        logger.error(USAGE)
+        return 99, arguments
+
+    try:
+         arguments['start_date'] = datetime.strptime(arguments['start_date'], "%m/%d/%Y").date()
+    except ValueError:
+        logger.error(f"Start Date value, {arguments['start_date']} is invalid")
+        rc = 88
+    try:
+         arguments['end_date'] = datetime.strptime(arguments['end_date'], "%m/%d/%Y").date()
+    except ValueError:
+        logger.error(f"End Date value, {arguments['end_date']} is invalid")
+        rc = 88
+
+    for key, name in (('game_minutes', 'Game Minutes'),
+                      ('turnaround_minutes', 'Turnaround Minutes')):
+        try:
+            arguments[key] = int(arguments[key])
+            if arguments[key] < 0:
+                raise ValueError
+        except ValueError:
+            logger.error(f"{name} value, {arguments[key]} is invalid")
+            rc = 88
+
+    error = check_export_arguments(arguments['format'], arguments['output'])
+    if error:
+        logger.error(error)
+        rc = 88
+
+    return rc, arguments
+
+def run(args, context):
+    """
+    Writes a row per referee assignment that overlaps, or is too soon
+    after at another venue, the referee's earlier assignments.
+    """
+    if not args['output']:
+        log_to_stderr()
+
+    rc, assignr = context.load_users()
+    if rc:
+        return rc
+
+    games = assignr.get_game_ids(args['start_date'], args['end_date'],
+                                 args['game_type'])
+    conflicts = find_conflicts(games.values(), args['game_minutes'],
+                               args['turnaround_minutes'])
+
+    with get_exporter(args['format'], args['output'], CONFLICT_FIELDS) as exporter:
+        for conflict in conflicts:
+            exporter.write(conflict)
+
+    logger.info(f"Found {exporter.count} conflict(s) in {len(games)} game(s)")
+    return 0
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+from os import environ
+from sys import (argv, exit, stdout)
+import logging
+from getopt import (getopt, GetoptError)
+from datetime import (date, datetime)
+from time import perf_counter
+
+from helpers.report_message import build_report_message
+from helpers.email import EMailClient
+from helpers.smtp_sink import SMTPSink
+
+MESSAGES = "messages"
+ROWS = "rows"
+TEMPLATE = "template"
+TEMPLATES = {
+    'administrator': ('administrator.html.jinja', 'reports'),
+    'misconduct': ('misconduct.html.jinja', 'misconducts'),
+    'missing_report': ('missing_report.html.jinja', 'reports')
+}
+
+log_level = environ.get('LOG_LEVEL', logging.WARNING)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        MESSAGES: 100, ROWS: 10, TEMPLATE: 'administrator'
+    }
+
+    rc = 0
+    USAGE='USAGE: email_benchmark.py -n <messages> -r <rows per message>' \
+    ' -t <administrator|misconduct|missing_report>'
+
+    try:
+        opts, args = getopt(args,"hn:r:t:",
+                            ["messages=","rows=","template="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-n", "--messages"):
+            arguments[MESSAGES] = arg
+        elif opt in ("-r", "--rows"):
+            arguments[ROWS] = arg
+        elif opt in ("-t", "--template"):
+            arguments[TEMPLATE] = arg
+
+    for key in (MESSAGES, ROWS):
+        try:
+            arguments[key] = int(arguments[key])
+        except ValueError:
+            logger.error(f"{key.capitalize()} value, {arguments[key]} is invalid")
+            rc = 88
+
+    if arguments[TEMPLATE] not in TEMPLATES:
+        logger.error(f"Template value, {arguments[TEMPLATE]} is invalid")
+        rc = 88
+
+    return rc, arguments
+
+def get_sample_row(message_nbr, row_nbr):
+    return {
+        'author': f'Referee {message_nbr}-{row_nbr}',
+        'game_dt': datetime(2024, 9, 21, 9, 0),
+        'game_date': '09/21/2024',
+        'game_time': '09:00 AM',
+        'league': 'Springfield',
+        'age_group': 'Grade 5/6',
+        'gender': 'Boys',
+        'venue': {'name': 'Springfield Elementary'},
+        'sub_venue': 'Field 1',
+        'venue_subvenue': 'Springfield Elementary - Field 1',
+        'home_team': 'Springfield-1',
+        'away_team': 'Ogdenville-1',
+        'home_team_score': '2',
+        'away_team_score': '1',
+        'home_coach': 'Mr. Burns',
+        'away_coach': 'Mr. Smithers',
+        'officials': [{'position': 'Referee', 'name': 'Homer Simpson'},
+                      {'position': 'Asst. Referee', 'name': 'Ned Flanders'},
+                      {'position': 'Asst. Referee', 'name': 'Moe Szyslak'}],
+        'misconducts': [{
+            'caution_send_off': 'caution', 'name': 'Bart Simpson',
+            'role': 'player', 'pass_number': '10', 'team': 'home',
+            'minute': '43', 'offense': 'C1', 'description': 'Unsporting behavior'
+        }],
+        'game_report_url': None,
+        'home_roster': False,
+        'away_roster': True,
+        'narrative': 'Game played without incident.',
+        'admin_narrative': None
+    }
+
+def get_sample_content(template, message_nbr, rows):
+    _, rows_key = TEMPLATES[template]
+    return {
+        'start_date': date(2024, 9, 21),
+        'end_date': date(2024, 9, 28),
+        rows_key: [get_sample_row(message_nbr, row_nbr) for row_nbr in range(rows)]
+    }
+
+def run_benchmark(messages, rows, template):
+    template_name, rows_key = TEMPLATES[template]
+    sink = SMTPSink().start()
+    email_client = EMailClient('127.0.0.1', sink.port, 'benchmark@example.com',
+                               'Benchmark', 'password', starttls=False)
+    render_time = 0.0
+    send_time = 0.0
+    failures = 0
+    try:
+        for message_nbr in range(messages):
+            start = perf_counter()
+            report = build_report_message(
+                get_sample_content(template, message_nbr, rows), template_name,
+                rows_key)
+            render_time += perf_counter() - start
+
+            start = perf_counter()
+            if email_client.send_email(f'Benchmark {message_nbr}', report['message'],
+                                       'Homer Simpson<homer@example.com>', True,
+                                       report['text'], report['attachments']):
+                failures += 1
+            send_time += perf_counter() - start
+    finally:
+        sink.stop()
+
+    results = sink.stats.as_dict()
+    total_time = render_time + send_time
+    results['failures'] = failures
+    results['render_seconds'] = render_time
+    results['send_seconds'] = send_time
+    results['messages_per_second'] = messages / total_time if total_time else 0
+    results['bytes_per_message'] = \
+        results['bytes'] / results['messages'] if results['messages'] else 0
+    return results
+
+def run(args, context=None):
+    """
+    The benchmark sends to a local sink, so nothing is taken from the
+    context.
+    """
+    results = run_benchmark(args[MESSAGES], args[ROWS], args[TEMPLATE])
+    print(f"Template:            {args[TEMPLATE]} ({args[ROWS]} rows)")
+    print(f"Messages:            {results['messages']} ({results['failures']} failed)")
+    print(f"Messages per second: {results['messages_per_second']:.1f}")
+    print(f"Bytes per message:   {results['bytes_per_message']:.0f}")
+    print(f"Render seconds:      {results['render_seconds']:.3f}")
+    print(f"Send seconds:        {results['send_seconds']:.3f}")
+    print(f"Connections:         {results['connections']}")
+    print(f"Handshakes:          {results['handshakes']}")
+    print(f"Logins:              {results['logins']}")
+    return 0
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    run(args)
+
+if __name__ == "__main__":
+    main()
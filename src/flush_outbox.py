@@ -0,0 +1,90 @@
+from os import environ
+from sys import (argv, exit, stdout)
+import logging
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+
+from helpers.context import RunContext
+from helpers.email import EMailClient
+from helpers import constants
+
+RETRIES = "retries"
+
+env_file = environ.get('ENV_FILE', '.env')
+load_dotenv(env_file)
+
+log_level = environ.get('LOG_LEVEL', logging.INFO)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        RETRIES: 3
+    }
+
+    rc = 0
+    USAGE='USAGE: flush_outbox.py -r <retries>'
+
+    try:
+        opts, args = getopt(args,"hr:",
+                            ["retries="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-r", "--retries"):
+            arguments[RETRIES] = arg
+
+    try:
+        arguments[RETRIES] = int(arguments[RETRIES])
+    except ValueError:
+        logger.error(f"Retries value, {arguments[RETRIES]} is invalid")
+        rc = 88
+
+    return rc, arguments
+
+def run(args, context):
+    rc, email_vars = context.get_email_vars()
+    if rc:
+        return rc
+
+    email_client = EMailClient(
+        email_vars[constants.EMAIL_SERVER], email_vars[constants.EMAIL_PORT],
+        email_vars[constants.EMAIL_USERNAME], 'Game Report',
+        email_vars[constants.EMAIL_PASSWORD])
+
+    outbox = context.get_outbox()
+    logger.info(f"{len(outbox.pending())} email(s) pending")
+    failed = outbox.flush(
+        lambda subject, message, send_to, **kwargs: email_client.send_email(
+            subject, message, send_to, True, **kwargs),
+        retries=args[RETRIES])
+
+    if failed:
+        logger.error(f"{failed} email(s) left in the outbox")
+        return 44
+    return 0
+
+def main():
+    logger.info("Starting Outbox Flush")
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+    logger.info("Completed Outbox Flush")
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,23 @@ import logging
 from dotenv import load_dotenv
 from getopt import (getopt, GetoptError)
 from datetime import (datetime, timedelta)
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 
-from assignr.assignr import Assignr
-from helpers.helpers import (get_environment_vars, get_spreadsheet_vars,
-                             get_coach_information, get_email_vars,
-                             create_message, get_assignor_information)
+from helpers.checkpoint import get_run_id
+from helpers.context import RunContext
 from helpers.email import EMailClient
+from helpers.outbox import get_idempotency_key
+from helpers.report_message import build_report_message
+from helpers.stages import StageExecutor
 from helpers import constants
 
 START_DATE = "start_date"
 END_DATE = "end_date"
+RESUME = "resume"
+MERGE = "merge"
+SPLIT = "split"
 
 env_file = environ.get('ENV_FILE', '.env')
 load_dotenv(env_file)
@@ -28,16 +35,16 @@ logger = logging.getLogger(__name__)
 
 def get_arguments(args):
     arguments = {
-        START_DATE: None, END_DATE: None
+        START_DATE: None, END_DATE: None, RESUME: False
     }
 
     rc = 0
-    USAGE='USAGE: game_report.py -s <start-date> -e <end-date>' \
+    USAGE='USAGE: game_report.py -s <start-date> -e <end-date> --resume' \
     ' DATE FORMAT=MM/DD/YYYY'
 
     try:
         opts, args = getopt(args,"hs:e:",
-                            ["start-date=","end-date="])
+                            ["start-date=","end-date=","resume"])
     except GetoptError:
         logger.error(USAGE)
         return 77, arguments
@@ -50,6 +57,8 @@ def get_arguments(args):
             arguments[START_DATE] = arg
         elif opt in ("-e", "--end-date"):
             arguments[END_DATE] = arg
+        elif opt == "--resume":
+            arguments[RESUME] = True
 
     try:
         if arguments[END_DATE]:
@@ -83,19 +92,20 @@ def get_arguments(args):
 
     return rc, arguments
 
-def send_email(email_vars, subject, message, send_to):
+def send_email(email_vars, subject, message, send_to, text=None,
+               attachments=None):
     email_client = EMailClient(
         email_vars[constants.EMAIL_SERVER], email_vars[constants.EMAIL_PORT],
         email_vars[constants.EMAIL_USERNAME], 'Game Report',
         email_vars[constants.EMAIL_PASSWORD])
 
     return email_client.send_email(subject, message,
-                                   send_to, True)
+                                   send_to, True, text, attachments)
 
 def process_administrator(email_vars, reports, start_date, end_date,
-                          assignor_emails):
-    subject = f'Administrator Game Reports: {start_date.strftime("%m/%d/%Y")}' \
-             f' - {end_date.strftime("%m/%d/%Y")}'
+                          assignor_emails, outbox, scope=None):
+    subject = f'Administrator Game Reports: {get_scope_prefix(scope)}' \
+             f'{start_date.strftime("%m/%d/%Y")} - {end_date.strftime("%m/%d/%Y")}'
     temp_addresses = [email_vars[constants.ADMIN_EMAIL]]
     temp_addresses.extend(assignor_emails)
     email_addresses = ','.join(temp_addresses) 
@@ -106,112 +116,268 @@ def process_administrator(email_vars, reports, start_date, end_date,
         'reports': reports
     }
 
-    message = create_message(content, 'administrator.html.jinja')
+    report = build_report_message(content, 'administrator.html.jinja',
+                                  'reports', 'Administrative Report')
 
-    response = send_email(email_vars, subject, message,
-                          email_addresses)
-    if response:
-        logger.error(response)
+    key = get_idempotency_key('administrator', start_date, end_date, scope)
+    outbox.add(key, subject, send_to=email_addresses, **report)
 
     logger.info("Completed Administrator Report")
+    return key
 
 def process_misconducts(email_vars, misconducts, start_date,
-                        end_date, assignor_emails):
+                        end_date, assignor_emails, outbox, scope=None):
     temp_emails = [email_vars[constants.MISCONDUCTS_EMAIL]]
     temp_emails.extend(assignor_emails)
     email_addresses = ",".join(temp_emails)
 
-    subject = f'Misconduct: {start_date.strftime("%m/%d/%Y")}' \
-             f' - {end_date.strftime("%m/%d/%Y")}'
+    subject = f'Misconduct: {get_scope_prefix(scope)}' \
+             f'{start_date.strftime("%m/%d/%Y")} - {end_date.strftime("%m/%d/%Y")}'
     content = {
         START_DATE: start_date,
         END_DATE: end_date,
         'misconducts': misconducts
     }
 
-    message = create_message(content, 'misconduct.html.jinja')
+    report = build_report_message(content, 'misconduct.html.jinja',
+                                  'misconducts', 'Misconduct Report')
 
-    response = send_email(email_vars, subject, message,
-                          email_addresses)
-
-    if response:
-        logger.error(response)
+    key = get_idempotency_key('misconduct', start_date, end_date, scope)
+    outbox.add(key, subject, send_to=email_addresses, **report)
 
     logger.info("Completed Misconduct Report")
+    return key
 
-def process_assignor_reports(email_vars, reports, start_date, end_date,
-                             assignors):
-    subject = f'Game Reports Needing Attention: {start_date.strftime("%m/%d/%Y")}' \
-             f' - {end_date.strftime("%m/%d/%Y")}'
+def get_scope(*names) -> str:
+    """
+    Names the site and league an email covers, None when it covers all.
+    """
+    return ' '.join(str(name) for name in names if name) or None
+
+def get_scope_prefix(scope) -> str:
+    return f'{scope}: ' if scope else ''
+
+def get_league_workers() -> int:
+    try:
+        return max(int(environ.get(constants.LEAGUE_WORKERS) or 0), 0)
+    except ValueError:
+        logger.error(f'{constants.LEAGUE_WORKERS} environment variable is not an integer, processing leagues together')
+        return 0
+
+def get_site_reports() -> str:
+    site_reports = environ.get(constants.SITE_REPORTS) or MERGE
+    if site_reports not in (MERGE, SPLIT):
+        logger.error(f'{constants.SITE_REPORTS} value, {site_reports} is invalid, merging sites')
+        return MERGE
+    return site_reports
+
+def get_assignor_emails(assignors):
+    assignor_emails = []
+    for association in assignors:
+        for assignor in assignors[association]:
+            assignor_emails.append(assignor['email'])
+    return assignor_emails
 
+def group_reports_by_league(reports):
+    leagues = {}
     for report in reports:
+        leagues.setdefault(report['league'], []).append(report)
+    return leagues
+
+def process_assignor_reports(email_vars, reports, start_date, end_date,
+                             assignors, outbox, scope=None):
+    subject = f'Game Reports Needing Attention: {get_scope_prefix(scope)}' \
+             f'{start_date.strftime("%m/%d/%Y")} - {end_date.strftime("%m/%d/%Y")}'
+
+    keys = []
+    for league, league_reports in group_reports_by_league(reports).items():
         content = {
             START_DATE: start_date,
             END_DATE: end_date,
-            'report': report
+            'league': league,
+            'reports': league_reports
         }
 
-        message = create_message(content, 'assignor.html.jinja')
+        report = build_report_message(content, 'assignor.html.jinja',
+                                      'reports', f'Assignor Report: {league}')
 
         temp_emails = []
-        for assignor in assignors[report['league']]:
+        for assignor in assignors[league]:
             temp_emails.append(assignor['email'])
         assignor_emails = ','.join(temp_emails)
 
-        response = send_email(email_vars, subject, message,
-                              assignor_emails)
-    
-        if response:
-            logger.error(response)
+        report_ids = '-'.join(str(league_report['report_id'])
+                              for league_report in league_reports)
+        key = get_idempotency_key('assignor', start_date, end_date,
+                                  ':'.join(str(item) for item in (scope, league, report_ids)
+                                           if item))
+        outbox.add(key, subject, send_to=assignor_emails, **report)
+        keys.append(key)
 
     logger.info("Completed Assignors Report")
+    return keys
+
+def process_league(email_vars, league, submissions, assignr, assignors,
+                   coaches, start_date, end_date, outbox, site=None):
+    """
+    Sorts and renders one league's game reports into the outbox.
+    """
+    start = perf_counter()
+    reports = {'misconducts': [], 'admin_reports': [], 'assignor_reports': []}
+    try:
+        assignr.classify_submissions(submissions, assignors, coaches, reports)
+    except KeyError as ke:
+        logger.error(f"Key: {ke}, missing from {league} game reports")
+
+    assignor_emails = get_assignor_emails(assignors)
+    scope = get_scope(site, league)
+    if reports['misconducts']:
+        process_misconducts(email_vars, reports['misconducts'], start_date,
+                            end_date, assignor_emails, outbox, scope)
+    if reports['admin_reports']:
+        process_administrator(email_vars, reports['admin_reports'], start_date,
+                              end_date, assignor_emails, outbox, scope)
+    process_assignor_reports(email_vars, reports['assignor_reports'], start_date,
+                             end_date, assignors, outbox, site)
+
+    logger.info(f"League {scope}: {len(submissions)} game report(s)"
+                f" in {perf_counter() - start:.3f}s")
+
+def process_leagues(email_vars, pages, assignr, assignors, coaches,
+                    start_date, end_date, outbox, workers, site=None):
+    """
+    Renders each league in its own worker, at most `workers` at a time
+    and largest league first. Nothing is sent until every league is
+    queued, so the outbox sends all leagues' misconducts before any
+    assignor report.
+    """
+    leagues = assignr.partition_by_league(pages)
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix='league') as executor:
+        futures = [executor.submit(process_league, email_vars, league, submissions,
+                                   assignr, assignors, coaches, start_date,
+                                   end_date, outbox, site)
+                   for league, submissions in sorted(leagues.items(),
+                                                     key=lambda item: len(item[1]),
+                                                     reverse=True)]
+        for future in futures:
+            future.result()
+
+def add_report_stages(stages, email_vars, pages_stage, assignr, start_date,
+                      end_date, outbox, workers, site=None) -> list:
+    """
+    Adds the stages turning one set of report pages into queued emails.
+    Returns the names of the last stages.
+    """
+    suffix = f':{site}' if site else ''
+    if workers:
+        stages.add(f'leagues{suffix}', lambda pages, assignors, coaches: process_leagues(
+            email_vars, pages, assignr, assignors, coaches, start_date, end_date,
+            outbox, workers, site), requires=(pages_stage, 'assignors', 'coaches'))
+        return [f'leagues{suffix}']
+
+    stages.add(f'reports{suffix}', assignr.classify_reports,
+               requires=(pages_stage, 'assignors', 'coaches'))
+    stages.add(f'misconducts{suffix}', lambda reports, assignors: process_misconducts(
+        email_vars, reports['misconducts'], start_date, end_date,
+        get_assignor_emails(assignors), outbox, site),
+        requires=(f'reports{suffix}', 'assignors'))
+    stages.add(f'administrator{suffix}', lambda reports, assignors: process_administrator(
+        email_vars, reports['admin_reports'], start_date, end_date,
+        get_assignor_emails(assignors), outbox, site),
+        requires=(f'reports{suffix}', 'assignors'))
+    stages.add(f'assignor_reports{suffix}', lambda reports, assignors: process_assignor_reports(
+        email_vars, reports['assignor_reports'], start_date, end_date,
+        assignors, outbox, site), requires=(f'reports{suffix}', 'assignors'))
+    return [f'misconducts{suffix}', f'administrator{suffix}',
+            f'assignor_reports{suffix}']
+
+def run(args, context):
+    """
+    Runs the report with the client, coaches and outbox shared through
+    the context. Returns 0, or the return code of the missing setting.
+    """
+    rc, _ = context.get_environment_vars()
+    if rc:
+        return rc
 
-def main():
-    logger.info("Starting Game Report")
-    rc, args = get_arguments(argv[1:])
+    rc, _ = context.get_spreadsheet_vars()
     if rc:
-        exit(rc)
+        return rc
 
-    rc, env_vars = get_environment_vars()
+    rc, email_vars = context.get_email_vars()
     if rc:
-        exit(rc)
+        return rc
 
-    rc, spreadsheet_vars = get_spreadsheet_vars()
+    rc, sites = context.get_sites()
     if rc:
-        exit(rc)
+        return rc
+
+    outbox = context.get_outbox()
+    start_date = args[START_DATE]
+    end_date = args[END_DATE]
+    workers = get_league_workers()
+
+    # The coach sheet, assignor CSV and each site's Assignr reports load
+    # concurrently, then the three emails are queued concurrently, or
+    # each league runs on its own. Several sites are merged into one set
+    # of emails, or each site gets its own.
+    stages = StageExecutor()
+    stages.add('coaches', lambda: context.get_coaches()[1])
+    stages.add('assignors', context.get_assignors)
+    if len(sites) == 1:
+        stages.add('report_pages', partial(sites[0].get_report_pages,
+                                           start_date, end_date))
+        last_stages = add_report_stages(stages, email_vars, 'report_pages',
+                                        sites[0], start_date, end_date,
+                                        outbox, workers)
+    else:
+        for site in sites:
+            stages.add(f'report_pages:{site.site_name}',
+                       partial(site.get_report_pages, start_date, end_date))
+        if get_site_reports() == SPLIT:
+            last_stages = []
+            for site in sites:
+                last_stages.extend(add_report_stages(
+                    stages, email_vars, f'report_pages:{site.site_name}', site,
+                    start_date, end_date, outbox, workers, site.site_name))
+        else:
+            stages.add('report_pages', lambda *site_pages: [
+                page for pages in site_pages for page in pages],
+                requires=[f'report_pages:{site.site_name}' for site in sites])
+            last_stages = add_report_stages(stages, email_vars, 'report_pages',
+                                            sites[0], start_date, end_date,
+                                            outbox, workers)
+
+    def flush(coaches, *_):
+        coaches.report_unmatched()
+        return outbox.flush(partial(send_email, email_vars))
+
+    stages.add('flush', flush, requires=['coaches'] + last_stages)
+
+    context.start_checkpoint(get_run_id('game_report', start_date, end_date),
+                             args[RESUME])
+    completed = False
+    try:
+        failed = stages.run()['flush']
+        completed = True
+    finally:
+        context.finish_checkpoint(completed)
+    if failed:
+        logger.error(f"{failed} email(s) left in the outbox, run flush_outbox.py to resend")
+    return 0
 
-    rc, email_vars = get_email_vars()
+def main():
+    logger.info("Starting Game Report")
+    rc, args = get_arguments(argv[1:])
     if rc:
         exit(rc)
 
-    assignr = Assignr(env_vars[constants.CLIENT_ID],
-                      env_vars[constants.CLIENT_SECRET],
-                      env_vars[constants.CLIENT_SCOPE],
-                      env_vars[constants.BASE_URL],
-                      env_vars[constants.AUTH_URL])
-
-    coaches = get_coach_information(spreadsheet_vars[constants.SPREADSHEET_ID],
-                                    spreadsheet_vars[constants.SPREADSHEET_RANGE])
-    
-    assignors = get_assignor_information()
-    assignor_emails = []
-    for association in assignors:
-        for assignor in assignors[association]:
-            assignor_emails.append(assignor['email'])
-
-    reports = assignr.get_reports(args[START_DATE],
-                                    args[END_DATE],
-                                    assignors,
-                                    coaches)
-    process_misconducts(email_vars, reports['misconducts'],
-                        args[START_DATE], args[END_DATE],
-                        assignor_emails)
-    process_administrator(email_vars, reports['admin_reports'],
-                        args[START_DATE], args[END_DATE],
-                        assignor_emails)
-    process_assignor_reports(email_vars, reports['assignor_reports'],
-                             args[START_DATE], args[END_DATE],
-                             assignors)
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
     logger.info("Completes Game Report")
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+from datetime import (date, datetime)
+from functools import (lru_cache, reduce)
+from operator import and_
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALL_DAY = 'ALL DAY'
+DEFAULT_SLOT_MINUTES = 15
+DEFAULT_GAME_MINUTES = 90
+TIME_FORMATS = ('%I:%M %p', '%I:%M%p', '%H:%M', '%H:%M:%S')
+
+
+@lru_cache(maxsize=None)
+def parse_time(value) -> int:
+    """
+    Returns the minutes after midnight of "4:00 PM" or "16:00". Cached,
+    as games and windows repeat a handful of times.
+    """
+    value = value.strip().upper()
+    for time_format in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(value, time_format)
+            return parsed.hour * 60 + parsed.minute
+        except ValueError:
+            continue
+    raise ValueError(f'Time value, {value} is invalid')
+
+def parse_availability(avail):
+    """
+    Returns the start and end minutes of "ALL DAY" or "8:00 AM - 11:00 AM",
+    as returned by get_availability.
+    """
+    if avail.strip().upper() == ALL_DAY:
+        return 0, 24 * 60
+    start, _, end = avail.partition(' - ')
+    return parse_time(start), parse_time(end)
+
+def get_game_start(game):
+    """
+    Returns the day and minutes after midnight a game starts, from its
+    local date and time.
+    """
+    return date.fromisoformat(game['game_date']), parse_time(game['game_time'])
+
+
+class AvailabilityIndex:
+    """
+    Referee availability split into fixed slots of slot_minutes. Each
+    slot of each day holds an int used as a bitset, with a bit per
+    referee, so the referees available for a game are the AND of the
+    slots the game covers. A referee is available in a slot only when
+    the whole slot is inside one of their windows.
+    """
+    def __init__(self, slot_minutes=DEFAULT_SLOT_MINUTES) -> None:
+        if (24 * 60) % slot_minutes:
+            raise ValueError(f'Slot minutes, {slot_minutes} must divide a day')
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = 24 * 60 // slot_minutes
+        self.referee_ids = []
+        self.referee_bits = {}
+        self.days = {}
+
+    def get_referee_bit(self, referee_id) -> int:
+        if referee_id not in self.referee_bits:
+            self.referee_bits[referee_id] = 1 << len(self.referee_ids)
+            self.referee_ids.append(referee_id)
+        return self.referee_bits[referee_id]
+
+    def add_window(self, referee_id, day, start, end) -> None:
+        """
+        Marks the referee available on day from start to end, in minutes
+        after midnight.
+        """
+        bit = self.get_referee_bit(referee_id)
+        slots = self.days.setdefault(day, [0] * self.slots_per_day)
+        first_slot = -(-start // self.slot_minutes)
+        last_slot = min(end // self.slot_minutes, self.slots_per_day)
+        for slot in range(first_slot, last_slot):
+            slots[slot] |= bit
+
+    def add_availability(self, referee_id, availability) -> None:
+        """
+        Adds the dates and windows returned by get_availability.
+        """
+        self.get_referee_bit(referee_id)
+        for avail in availability:
+            try:
+                start, end = parse_availability(avail['avail'])
+                self.add_window(referee_id, date.fromisoformat(avail['date']),
+                                start, end)
+            except ValueError as error:
+                logger.warning(f"Ignoring availability of referee {referee_id}: {error}")
+
+    def get_slots(self, start, minutes):
+        """
+        Returns the first and last slot, excluded, a game covers.
+        """
+        first_slot = start // self.slot_minutes
+        last_slot = -(-(start + minutes) // self.slot_minutes)
+        return first_slot, min(max(last_slot, first_slot + 1), self.slots_per_day)
+
+    def available_bits(self, day, first_slot, last_slot) -> int:
+        slots = self.days.get(day)
+        if slots is None:
+            return 0
+        return reduce(and_, slots[first_slot:last_slot])
+
+    def get_referees(self, bits) -> list:
+        """
+        Returns the ids of the referees whose bits are set, in the order
+        they were added.
+        """
+        referee_ids = []
+        while bits:
+            lowest = bits & -bits
+            referee_ids.append(self.referee_ids[lowest.bit_length() - 1])
+            bits ^= lowest
+        return referee_ids
+
+    def query_bits(self, games, game_minutes=DEFAULT_GAME_MINUTES) -> dict:
+        """
+        Returns the bitset of referees available for each game, by game
+        id. Games starting at the same time share one lookup.
+        """
+        windows = {}
+        results = {}
+        for game in games:
+            try:
+                day, start = get_game_start(game)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                logger.warning(f"Game {game.get('id')} has no start, no referees available")
+                results[game['id']] = 0
+                continue
+            window = (day,) + self.get_slots(start, game_minutes)
+            if window not in windows:
+                windows[window] = self.available_bits(*window)
+            results[game['id']] = windows[window]
+        return results
+
+    def query(self, games, game_minutes=DEFAULT_GAME_MINUTES) -> dict:
+        """
+        Returns the ids of the referees available for each game, by game id.
+        """
+        referees = {}
+        results = {}
+        for game_id, bits in self.query_bits(games, game_minutes).items():
+            if bits not in referees:
+                referees[bits] = self.get_referees(bits)
+            results[game_id] = referees[bits]
+        return results
@@ -0,0 +1,103 @@
+from os import (environ, makedirs, path, replace)
+from datetime import (date, timedelta)
+import json
+import logging
+
+from helpers.constants import BACKFILL_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKFILL_DIR = 'backfill'
+
+
+def get_backfill_dir() -> str:
+    return environ.get(BACKFILL_DIR) or DEFAULT_BACKFILL_DIR
+
+def get_shards(start_date, end_date, shard_days) -> list:
+    """
+    Splits the dates from start_date to end_date, both included, into
+    shards of shard_days days. The last shard ends on end_date.
+    """
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        shard_end = min(shard_start + timedelta(days=shard_days - 1), end_date)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + timedelta(days=1)
+    return shards
+
+def is_complete(pages) -> bool:
+    """
+    True when every page of the game reports was fetched.
+    """
+    try:
+        return bool(pages) and len(pages) >= pages[-1]['page']['pages']
+    except (KeyError, TypeError):
+        return False
+
+def get_submissions(pages) -> list:
+    return [submission for page in pages
+            for submission in page['_embedded']['form_submissions']]
+
+def merge_shards(shard_submissions) -> list:
+    """
+    Merges the submissions of each shard into one list sorted by report
+    id. A report found in several shards is kept once, so the result
+    doesn't depend on the order the shards were fetched in.
+    """
+    merged = {}
+    for submissions in shard_submissions:
+        for submission in submissions:
+            merged.setdefault(submission['id'], submission)
+    return [merged[report_id] for report_id in sorted(merged)]
+
+
+class ShardStore:
+    """
+    Keeps each fetched shard's game reports in its own json file under
+    the site's directory, so a rerun only fetches the missing shards. A
+    shard fetched before its last day had passed is fetched again, since
+    reports for its games may still be submitted.
+    """
+    def __init__(self, backfill_dir, site_id) -> None:
+        self.shard_dir = path.join(backfill_dir, str(site_id))
+
+    def get_shard_file(self, shard) -> str:
+        start_date, end_date = shard
+        return path.join(self.shard_dir,
+                         f'{start_date.isoformat()}_{end_date.isoformat()}.json')
+
+    def read(self, shard):
+        shard_file = self.get_shard_file(shard)
+        try:
+            with open(shard_file, 'r') as shard_json:
+                return json.load(shard_json)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(f"Ignoring unreadable shard {shard_file}")
+            return None
+
+    def load(self, shard) -> list:
+        saved = self.read(shard)
+        return saved['form_submissions'] if saved else []
+
+    def save(self, shard, submissions, fetched_on=None) -> None:
+        makedirs(self.shard_dir, exist_ok=True)
+        shard_file = self.get_shard_file(shard)
+        temp_file = f'{shard_file}.tmp'
+        with open(temp_file, 'w') as shard_json:
+            json.dump({
+                'start_date': shard[0].isoformat(),
+                'end_date': shard[1].isoformat(),
+                'fetched_on': (fetched_on or date.today()).isoformat(),
+                'form_submissions': submissions
+            }, shard_json)
+        replace(temp_file, shard_file)
+
+    def is_missing(self, shard) -> bool:
+        saved = self.read(shard)
+        return saved is None or date.fromisoformat(saved['fetched_on']) <= shard[1]
+
+    def missing(self, shards) -> list:
+        return [shard for shard in shards if self.is_missing(shard)]
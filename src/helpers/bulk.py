@@ -0,0 +1,165 @@
+from os import (environ, makedirs, path, remove)
+from concurrent.futures import (ThreadPoolExecutor, as_completed)
+from threading import Lock
+import json
+import logging
+
+from helpers.checkpoint import DEFAULT_CHECKPOINT_DIR
+from helpers.conflicts import get_venue_name
+from helpers.constants import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+DELETE = 'delete'
+CANCEL = 'cancel'
+RESCHEDULE = 'reschedule'
+ACTIONS = (DELETE, CANCEL, RESCHEDULE)
+
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+DRY_RUN = 'dry run'
+
+# Fields games can be selected by, with how to read them from a game
+FILTERS = {
+    'league': lambda game: game.get('league'),
+    'venue': get_venue_name,
+    'age_group': lambda game: game.get('age_group'),
+    'id': lambda game: str(game.get('id'))
+}
+
+
+def select_games(games, filters) -> list:
+    """
+    Returns the games matching one of the values of every filter, in id
+    order.
+    """
+    selected = [game for game in games
+                if all(FILTERS[name](game) in values
+                       for name, values in filters.items() if values)]
+    return sorted(selected, key=lambda game: game['id'])
+
+def get_journal(run_id, resume=False):
+    return Journal(environ.get(CHECKPOINT_DIR) or DEFAULT_CHECKPOINT_DIR,
+                   run_id, resume)
+
+
+class Journal:
+    """
+    Appends the result of each game changed in a run to a file under the
+    run id as soon as Assignr confirms it, so a run that stops part way is
+    resumed without changing a game twice. Without resume the run's
+    previous journal is discarded first.
+    """
+    def __init__(self, journal_dir, run_id, resume=False) -> None:
+        self.journal_dir = journal_dir
+        self.journal_file = path.join(journal_dir, f'{run_id}.journal')
+        self.lock = Lock()
+        if not resume:
+            self.discard()
+
+    def done(self) -> set:
+        """
+        Returns the ids of the games already changed.
+        """
+        done = set()
+        try:
+            with open(self.journal_file, 'r') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line is cut short when the run was killed
+                        continue
+                    if entry.get('status') == DONE:
+                        done.add(entry['id'])
+        except FileNotFoundError:
+            pass
+        return done
+
+    def record(self, result) -> None:
+        with self.lock:
+            makedirs(self.journal_dir, exist_ok=True)
+            with open(self.journal_file, 'a') as journal:
+                journal.write(json.dumps(result) + '\n')
+                journal.flush()
+
+    def discard(self) -> None:
+        try:
+            remove(self.journal_file)
+        except FileNotFoundError:
+            pass
+
+
+class BulkUpdater:
+    """
+    Deletes, cancels or reschedules games, workers at a time. Every
+    request goes through the client's rate limiter. Games the journal
+    records as done are skipped, and a dry run only reports what would
+    change.
+    """
+    def __init__(self, assignr, action, fields=None, workers=4, dry_run=False,
+                 journal=None) -> None:
+        self.assignr = assignr
+        self.action = action
+        self.fields = fields or {}
+        self.workers = workers
+        self.dry_run = dry_run
+        self.journal = journal
+
+    def get_result(self, game, status, status_code=None, error=None) -> dict:
+        return {'id': game['id'], 'action': self.action, 'status': status,
+                'status_code': status_code, 'error': error}
+
+    def apply(self, game) -> dict:
+        try:
+            if self.action == DELETE:
+                status_code, response = self.assignr.delete_game(game['id'])
+                # A game already deleted, by an earlier run, is done too
+                succeeded = status_code in (200, 204, 404)
+            elif self.action == CANCEL:
+                status_code, response = self.assignr.update_game(game['id'],
+                                                                 {'cancelled': True})
+                succeeded = status_code in (200, 204)
+            else:
+                status_code, response = self.assignr.update_game(game['id'], self.fields)
+                succeeded = status_code in (200, 204)
+        except Exception as error:
+            logger.error(f"Game {game['id']} not changed: {error}")
+            return self.get_result(game, FAILED, error=str(error))
+
+        if not succeeded:
+            logger.error(f"Game {game['id']} not changed: {status_code}")
+            return self.get_result(game, FAILED, status_code, json.dumps(response))
+        result = self.get_result(game, DONE, status_code)
+        if self.journal is not None:
+            self.journal.record(result)
+        return result
+
+    def run(self, games) -> list:
+        """
+        Returns the result of each game, in the order of the games.
+        """
+        done = self.journal.done() if self.journal is not None else set()
+        results = {}
+        pending = []
+        for game in games:
+            if game['id'] in done:
+                results[game['id']] = self.get_result(game, SKIPPED,
+                                                      error='Changed by an earlier run')
+            elif self.action == CANCEL and game.get('cancelled'):
+                results[game['id']] = self.get_result(game, SKIPPED,
+                                                      error='Already cancelled')
+            elif self.dry_run:
+                results[game['id']] = self.get_result(game, DRY_RUN)
+            else:
+                pending.append(game)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self.apply, game): game for game in pending}
+                for future in as_completed(futures):
+                    game = futures[future]
+                    results[game['id']] = future.result()
+
+        return [results[game['id']] for game in games]
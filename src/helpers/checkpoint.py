@@ -0,0 +1,82 @@
+from os import (environ, listdir, makedirs, path, replace)
+from hashlib import sha256
+import json
+import logging
+import shutil
+from threading import Lock
+
+from helpers.constants import CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = 'checkpoints'
+
+
+def get_run_id(command, *parts) -> str:
+    """
+    Names a run after its command and the options deciding what it
+    fetches, so rerunning the same command finds its checkpoint.
+    """
+    return '_'.join([command] + [str(part) for part in parts if part is not None])
+
+def get_checkpoint(run_id, resume=False):
+    return Checkpoint(environ.get(CHECKPOINT_DIR) or DEFAULT_CHECKPOINT_DIR,
+                      run_id, resume)
+
+
+class Checkpoint:
+    """
+    Saves each page fetched from Assignr during a run in its own json
+    file under the run id, as soon as it's fetched. A run that stops part
+    way is resumed by reading the saved pages back instead of fetching
+    them again, so at most the page being fetched is lost. Without resume
+    the run's previous pages are discarded first. Pages that couldn't be
+    fetched are counted, so the run's pages are kept for a resume.
+    """
+    def __init__(self, checkpoint_dir, run_id, resume=False) -> None:
+        self.run_id = run_id
+        self.run_dir = path.join(checkpoint_dir, run_id)
+        self.failed_pages = 0
+        self.lock = Lock()
+        if not resume:
+            self.discard()
+
+    def get_page_file(self, key) -> str:
+        name = sha256(json.dumps(key, default=str).encode('utf-8')).hexdigest()
+        return path.join(self.run_dir, f'{name}.json')
+
+    def load(self, key):
+        page_file = self.get_page_file(key)
+        try:
+            with open(page_file, 'r') as page_json:
+                return json.load(page_json)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(f"Ignoring unreadable checkpoint {page_file}")
+            return None
+
+    def save(self, key, response) -> None:
+        page_file = self.get_page_file(key)
+        try:
+            makedirs(self.run_dir, exist_ok=True)
+            temp_file = f'{page_file}.tmp'
+            with open(temp_file, 'w') as page_json:
+                json.dump(response, page_json)
+            replace(temp_file, page_file)
+        except OSError as error:
+            logger.error(f"Unable to save checkpoint {page_file}: {error}")
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failed_pages += 1
+
+    def saved_pages(self) -> int:
+        try:
+            return sum(1 for file_name in listdir(self.run_dir)
+                       if file_name.endswith('.json'))
+        except FileNotFoundError:
+            return 0
+
+    def discard(self) -> None:
+        shutil.rmtree(self.run_dir, ignore_errors=True)
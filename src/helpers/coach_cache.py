@@ -0,0 +1,158 @@
+from os import (environ, makedirs, path, replace)
+from datetime import (datetime, timedelta)
+from threading import Thread
+import json
+import logging
+
+from httplib2 import HttpLib2Error
+from google.auth.exceptions import GoogleAuthError
+from googleapiclient.errors import HttpError
+
+from helpers.constants import (COACH_CACHE_FILE, COACH_CACHE_MAX_STALE,
+                               COACH_CACHE_TTL)
+from helpers.sheets import (SheetsReader, get_drive_service,
+                            get_modified_time, get_sheets_service)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = 'coach_cache.json'
+DEFAULT_TTL = 3600
+DEFAULT_MAX_STALE = 7 * 24 * 3600
+SHEET_ERRORS = (HttpError, HttpLib2Error, GoogleAuthError, OSError)
+
+
+def get_coach_cache():
+    ttl = DEFAULT_TTL
+    max_stale = DEFAULT_MAX_STALE
+    try:
+        ttl = int(environ.get(COACH_CACHE_TTL, DEFAULT_TTL))
+        max_stale = int(environ.get(COACH_CACHE_MAX_STALE, DEFAULT_MAX_STALE))
+    except ValueError:
+        logger.error(f'{COACH_CACHE_TTL} and {COACH_CACHE_MAX_STALE} must be integers, using defaults')
+        ttl = DEFAULT_TTL
+        max_stale = DEFAULT_MAX_STALE
+
+    return CoachCache(environ.get(COACH_CACHE_FILE, DEFAULT_CACHE_FILE),
+                      ttl=ttl, max_stale=max_stale)
+
+
+class CoachCache:
+    """
+    Local snapshot of the coach directory parsed from the coach sheet.
+
+    A snapshot checked less than `ttl` seconds ago is used without calling
+    Google. An older snapshot, up to `max_stale` seconds, is still used
+    right away while a background thread compares the sheet's modified
+    time and downloads the sheet only if it changed. When Google can't be
+    reached the last good snapshot is used, however old it is.
+    """
+    def __init__(self, cache_file, ttl=DEFAULT_TTL, max_stale=DEFAULT_MAX_STALE,
+                 sheets_service=None, drive_service=None) -> None:
+        self.cache_file = cache_file
+        self.ttl = timedelta(seconds=ttl)
+        self.max_stale = timedelta(seconds=max_stale)
+        self.sheets_service = sheets_service
+        self.drive_service = drive_service
+        self.thread = None
+
+    def get_sheets_service(self):
+        if self.sheets_service is None:
+            self.sheets_service = get_sheets_service()
+        return self.sheets_service
+
+    def get_drive_service(self):
+        if self.drive_service is None:
+            self.drive_service = get_drive_service()
+        return self.drive_service
+
+    def get_modified_time(self, spreadsheet_id):
+        """
+        Returns the sheet's modified time, or None when the Drive API is
+        disabled or the credentials have no Drive scope.
+        """
+        try:
+            return get_modified_time(self.get_drive_service(), spreadsheet_id)
+        except SHEET_ERRORS as error:
+            logger.warning(f"Coach sheet modified time unavailable, downloading the sheet: {error}")
+            return None
+
+    def load_snapshot(self, spreadsheet_id, sheet_range):
+        try:
+            with open(self.cache_file, 'r') as cache_file:
+                snapshot = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning(f"Ignoring unreadable coach cache {self.cache_file}")
+            return None
+
+        if snapshot.get('spreadsheet_id') != spreadsheet_id or \
+            snapshot.get('sheet_range') != sheet_range:
+            return None
+        return snapshot
+
+    def save_snapshot(self, snapshot) -> None:
+        try:
+            cache_dir = path.dirname(self.cache_file)
+            if cache_dir:
+                makedirs(cache_dir, exist_ok=True)
+            temp_file = f'{self.cache_file}.tmp'
+            with open(temp_file, 'w') as cache_file:
+                json.dump(snapshot, cache_file)
+            replace(temp_file, self.cache_file)
+        except OSError as error:
+            logger.error(f"Unable to save coach cache {self.cache_file}: {error}")
+
+    def get(self, spreadsheet_id, sheet_range, background=True) -> dict:
+        snapshot = self.load_snapshot(spreadsheet_id, sheet_range)
+        if snapshot:
+            age = datetime.now() - datetime.fromisoformat(snapshot['checked_at'])
+            if age < self.ttl:
+                logger.debug('Using cached coach directory')
+                return snapshot['coaches']
+            if age < self.max_stale and background:
+                logger.debug('Using cached coach directory, revalidating')
+                self.thread = Thread(target=self.revalidate,
+                                     args=(spreadsheet_id, sheet_range, dict(snapshot)))
+                self.thread.start()
+                return snapshot['coaches']
+
+        return self.revalidate(spreadsheet_id, sheet_range, snapshot)
+
+    def wait(self) -> None:
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def revalidate(self, spreadsheet_id, sheet_range, snapshot=None) -> dict:
+        """
+        Downloads the coach sheet when its modified time differs from the
+        snapshot's, or can't be read, and saves the new snapshot.
+        """
+        now = datetime.now().isoformat()
+        modified_time = self.get_modified_time(spreadsheet_id)
+        if snapshot and modified_time is not None and \
+            snapshot.get('modified_time') == modified_time:
+            snapshot['checked_at'] = now
+            self.save_snapshot(snapshot)
+            return snapshot['coaches']
+
+        try:
+            coaches = SheetsReader(self.get_sheets_service()).read_coaches(
+                spreadsheet_id, sheet_range)
+        except SHEET_ERRORS as error:
+            if snapshot:
+                logger.warning(f"Coach sheet unavailable, using the copy from {snapshot['fetched_at']}: {error}")
+                return snapshot['coaches']
+            logger.error(f"Coach sheet unavailable: {error}")
+            return {}
+
+        self.save_snapshot({
+            'spreadsheet_id': spreadsheet_id,
+            'sheet_range': sheet_range,
+            'modified_time': modified_time,
+            'fetched_at': now,
+            'checked_at': now,
+            'coaches': coaches
+        })
+        return coaches
@@ -0,0 +1,108 @@
+from collections import Counter
+from threading import Lock
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_COACH = 'Unknown'
+GENDER_ALIASES = {
+    'b': 'boys', 'boy': 'boys', 'boys': 'boys', 'm': 'boys', 'male': 'boys',
+    'g': 'girls', 'girl': 'girls', 'girls': 'girls', 'f': 'girls',
+    'female': 'girls',
+    'c': 'coed', 'coed': 'coed', 'co ed': 'coed', 'mixed': 'coed'
+}
+AGE_GROUP_WORDS = re.compile(r'\b(grades?|gr)\b\.?')
+AGE_GROUP_SEPARATORS = re.compile(r'\s*[-/&]\s*|\s+and\s+')
+NOT_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_age_group(age_group) -> str:
+    """
+    "Grade 7/8", "grade 7-8" and "Gr. 7 & 8" all become "7/8".
+    """
+    value = AGE_GROUP_WORDS.sub(' ', str(age_group or '').casefold())
+    return AGE_GROUP_SEPARATORS.sub('/', value.strip())
+
+def normalize_gender(gender) -> str:
+    value = ' '.join(str(gender or '').casefold().replace('-', ' ').split())
+    return GENDER_ALIASES.get(value, value)
+
+def normalize_team(team) -> str:
+    return NOT_ALPHANUMERIC.sub('', str(team or '').casefold())
+
+def get_key(age_group, gender, team):
+    return (normalize_age_group(age_group), normalize_gender(gender),
+            normalize_team(team))
+
+def get_near_teams(team):
+    """
+    Team names one typo away: a missing character or two neighbouring
+    characters swapped.
+    """
+    variants = {team[:pos] + team[pos + 1:] for pos in range(len(team))}
+    variants.update(team[:pos] + team[pos + 1] + team[pos] + team[pos + 2:]
+                    for pos in range(len(team) - 1))
+    variants.discard(team)
+    return variants
+
+
+class CoachIndex:
+    """
+    Coach lookup built once per run from the nested dictionary returned by
+    rows_to_dict. Age group, gender and team are normalized, so differences
+    in case, spacing and punctuation still match, and aliases such as "G"
+    for "Girls" are resolved. Team names one typo away from a single team
+    are found in a precomputed near match table. Every lookup is one probe
+    of each table.
+
+    Teams that can't be matched are collected and logged together by
+    report_unmatched, which starts a new collection.
+    """
+    def __init__(self, coaches=None) -> None:
+        self.index = {}
+        self.near_matches = {}
+        self.unmatched = Counter()
+        self.unmatched_lock = Lock()
+        self.size = 0
+
+        ambiguous = set()
+        for age_group, genders in (coaches or {}).items():
+            for gender, teams in genders.items():
+                for team, coach in teams.items():
+                    key = get_key(age_group, gender, team)
+                    self.index[key] = coach
+                    self.size += 1
+                    for near_team in get_near_teams(key[2]):
+                        near_key = key[:2] + (near_team,)
+                        if self.near_matches.get(near_key, coach) != coach:
+                            ambiguous.add(near_key)
+                        self.near_matches[near_key] = coach
+
+        for near_key in ambiguous | set(self.index):
+            self.near_matches.pop(near_key, None)
+
+    def __len__(self):
+        return self.size
+
+    def get(self, age_group, gender, team) -> str:
+        key = get_key(age_group, gender, team)
+        coach = self.index.get(key)
+        if coach is None:
+            coach = self.near_matches.get(key)
+            if coach is None:
+                with self.unmatched_lock:
+                    self.unmatched[(age_group, gender, team)] += 1
+                return UNKNOWN_COACH
+            logger.debug(f"Matched {team} to a coach's team with a similar name")
+        return coach
+
+    def report_unmatched(self) -> None:
+        if not self.unmatched:
+            return
+        teams = '; '.join(f'{age_group} {gender} {team} ({count})'
+                          for (age_group, gender, team), count
+                          in sorted(self.unmatched.items(),
+                                    key=lambda item: tuple(str(part) for part in item[0])))
+        logger.warning(f"No coach found for {len(self.unmatched)} team(s): {teams}")
+        self.unmatched.clear()
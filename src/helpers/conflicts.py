@@ -0,0 +1,98 @@
+from datetime import (datetime, timedelta)
+import logging
+
+from helpers.availability_index import (DEFAULT_GAME_MINUTES, get_game_start)
+
+logger = logging.getLogger(__name__)
+
+OVERLAP = 'overlap'
+TURNAROUND = 'turnaround'
+DEFAULT_TURNAROUND_MINUTES = 30
+
+
+def get_venue_key(game):
+    """
+    Returns what identifies a game's venue, its id when Assignr embeds
+    the venue, so two fields of one venue count as one venue.
+    """
+    venue = game.get('venue')
+    if isinstance(venue, dict):
+        return venue.get('id', venue.get('name'))
+    return venue
+
+def get_venue_name(game):
+    venue = game.get('venue')
+    if isinstance(venue, dict):
+        return venue.get('name')
+    return venue
+
+def get_assignments(games, game_minutes=DEFAULT_GAME_MINUTES) -> dict:
+    """
+    Returns the start, end and game of each referee's assignments, by
+    referee id. Cancelled games and games without a start are left out,
+    as is a referee's second position on one game.
+    """
+    duration = timedelta(minutes=game_minutes)
+    assignments = {}
+    for game in games:
+        if game.get('cancelled') or not game.get('referees'):
+            continue
+        try:
+            day, minutes = get_game_start(game)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            logger.warning(f"Game {game.get('id')} has no start, not checked")
+            continue
+        start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=minutes)
+        referee_ids = set()
+        for referee in game['referees']:
+            if referee.get('id') is None or referee['id'] in referee_ids:
+                continue
+            referee_ids.add(referee['id'])
+            assignments.setdefault(referee['id'], []).append(
+                (start, start + duration, game))
+    return assignments
+
+def find_conflicts(games, game_minutes=DEFAULT_GAME_MINUTES,
+                   turnaround_minutes=DEFAULT_TURNAROUND_MINUTES) -> list:
+    """
+    Sorts each referee's assignments by start and sweeps them once,
+    keeping the assignment that ends last so far. An assignment starting
+    before it ends overlaps it, and one starting less than
+    turnaround_minutes after it ends at another venue is a turnaround.
+    """
+    turnaround = timedelta(minutes=turnaround_minutes)
+    conflicts = []
+    for referee_id, assignments in get_assignments(games, game_minutes).items():
+        assignments.sort(key=lambda assignment: (assignment[0], assignment[2]['id']))
+        latest = assignments[0]
+        for assignment in assignments[1:]:
+            start, end, game = assignment
+            gap = start - latest[1]
+            conflict_type = None
+            if gap < timedelta(0):
+                conflict_type = OVERLAP
+            elif gap < turnaround and get_venue_key(game) != get_venue_key(latest[2]):
+                conflict_type = TURNAROUND
+            if conflict_type:
+                conflicts.append(get_conflict(conflict_type, referee_id, latest[2],
+                                              game, gap))
+            if end > latest[1]:
+                latest = assignment
+    return conflicts
+
+def get_conflict(conflict_type, referee_id, first_game, second_game, gap) -> dict:
+    referee = next(referee for referee in second_game['referees']
+                   if referee.get('id') == referee_id)
+    return {
+        'conflict': conflict_type,
+        'referee_id': referee_id,
+        'referee': f"{referee['first_name']} {referee['last_name']}",
+        'game_date': second_game['game_date'],
+        'first_game': first_game['id'],
+        'first_time': first_game['game_time'],
+        'first_venue': get_venue_name(first_game),
+        'second_game': second_game['id'],
+        'second_time': second_game['game_time'],
+        'second_venue': get_venue_name(second_game),
+        'gap_minutes': int(gap.total_seconds() // 60)
+    }
@@ -2,21 +2,35 @@ ADMIN_EMAIL = 'ADMIN_EMAIL'
 ADMIN_NARRATIVE = ".adminNarrative"
 ADMIN_REVIEW = ".adminReview"
 ASSIGNOR_CSV_FILE = 'ASSIGNOR_CSV_FILE'
+ASSIGNR_RATE_LIMIT = 'ASSIGNR_RATE_LIMIT'
+ASSIGNR_SITES = 'ASSIGNR_SITES'
 AUTH_URL = 'AUTH_URL'
+BACKFILL_DIR = 'BACKFILL_DIR'
 BASE_URL = 'BASE_URL'
+CHECKPOINT_DIR = 'CHECKPOINT_DIR'
 CLIENT_SECRET = 'CLIENT_SECRET'
 CLIENT_ID = 'CLIENT_ID'
 CLIENT_SCOPE = 'CLIENT_SCOPE'
+COACH_CACHE_FILE = 'COACH_CACHE_FILE'
+COACH_CACHE_MAX_STALE = 'COACH_CACHE_MAX_STALE'
+COACH_CACHE_TTL = 'COACH_CACHE_TTL'
 CREW_CHANGES = ".crewChanges"
+EMAIL_DAILY_QUOTA = 'EMAIL_DAILY_QUOTA'
 EMAIL_PASSWORD = 'EMAIL_PASSWORD'
 EMAIL_PORT = 'EMAIL_PORT'
+EMAIL_QUOTA_RESERVE = 'EMAIL_QUOTA_RESERVE'
 EMAIL_SERVER = 'EMAIL_SERVER'
 EMAIL_USERNAME = 'EMAIL_USERNAME'
 GOOGLE_APPLICATION_CREDENTIALS = 'GOOGLE_APPLICATION_CREDENTIALS'
+LEAGUE_WORKERS = 'LEAGUE_WORKERS'
 MISCONDUCTS_EMAIL = 'MISCONDUCTS_EMAIL'
 NARRATIVE = ".description"
 NOT_ASSIGNED = "Not Assigned"
+OUTBOX_DIR = 'OUTBOX_DIR'
+REPORT_BYTE_THRESHOLD = 'REPORT_BYTE_THRESHOLD'
+REPORT_ROW_THRESHOLD = 'REPORT_ROW_THRESHOLD'
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+SITE_REPORTS = 'SITE_REPORTS'
 SPREADSHEET_ID = 'SPREADSHEET_ID'
 SPREADSHEET_RANGE = 'SPREADSHEET_RANGE'
 START_TIME = '.startTime'
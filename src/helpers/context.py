@@ -0,0 +1,214 @@
+from os import environ
+from datetime import datetime
+import logging
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from assignr.assignr import Assignr
+from helpers.checkpoint import get_checkpoint
+from helpers.helpers import (get_assignor_information, get_email_vars,
+                             get_environment_vars, get_spreadsheet_vars)
+from helpers.outbox import get_outbox
+from helpers.rate_limiter import get_rate_limiter
+from helpers import constants
+
+logger = logging.getLogger(__name__)
+
+
+class RunContext:
+    """
+    State shared by the reports run in one process. Environment variables,
+    the Assignr client, the assignor CSV, the coach directory and the
+    outbox are each loaded once, on first use. The client keeps the
+    responses it fetched, so reports run over the same dates share one
+    fetch of each page.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forgets everything loaded, so the next report reloads the settings,
+        token, users and coaches.
+        """
+        self.created_at = datetime.now()
+        self.env_vars = None
+        self.email_vars = None
+        self.spreadsheet_vars = None
+        self.assignr = None
+        self.sites = None
+        self.checkpoint = None
+        self.users_loaded = False
+        self.assignors = None
+        self.coach_cache = None
+        self.coaches = None
+        self.outbox = None
+
+    def get_environment_vars(self):
+        if self.env_vars is None:
+            rc, env_vars = get_environment_vars()
+            if rc:
+                return rc, env_vars
+            self.env_vars = env_vars
+        return 0, self.env_vars
+
+    def get_email_vars(self):
+        if self.email_vars is None:
+            rc, email_vars = get_email_vars()
+            if rc:
+                return rc, email_vars
+            self.email_vars = email_vars
+        return 0, self.email_vars
+
+    def get_spreadsheet_vars(self):
+        if self.spreadsheet_vars is None:
+            rc, spreadsheet_vars = get_spreadsheet_vars()
+            if rc:
+                return rc, spreadsheet_vars
+            self.spreadsheet_vars = spreadsheet_vars
+        return 0, self.spreadsheet_vars
+
+    def get_assignr(self):
+        if self.assignr is None:
+            rc, env_vars = self.get_environment_vars()
+            if rc:
+                return rc, None
+            self.assignr = Assignr(env_vars[constants.CLIENT_ID],
+                                   env_vars[constants.CLIENT_SECRET],
+                                   env_vars[constants.CLIENT_SCOPE],
+                                   env_vars[constants.BASE_URL],
+                                   env_vars[constants.AUTH_URL])
+            self.assignr.response_cache = {}
+            self.assignr.rate_limiter = get_rate_limiter()
+        return 0, self.assignr
+
+    def get_sites(self):
+        """
+        Returns a client for each site chosen by ASSIGNR_SITES, "all" or a
+        comma separated list of site ids or names. When it isn't set, the
+        first site the credentials can see is used, as before. The clients
+        share one token and one pool of connections.
+        """
+        if self.sites is None:
+            rc, assignr = self.get_assignr()
+            if rc:
+                return rc, None
+            selection = [item.strip() for item in
+                         environ.get(constants.ASSIGNR_SITES, '').split(',')
+                         if item.strip()]
+            if not selection:
+                self.sites = [assignr]
+                return 0, self.sites
+
+            sites = assignr.get_sites()
+            if selection != ['all']:
+                chosen = [site for site in sites
+                          if str(site['id']) in selection or site['name'] in selection]
+                found = {str(site['id']) for site in chosen} | \
+                    {site['name'] for site in chosen}
+                for item in selection:
+                    if item not in found:
+                        logger.error(f"{constants.ASSIGNR_SITES} site, {item} not found")
+                sites = chosen
+            if not sites:
+                logger.error('No Assignr sites found')
+                return 66, None
+
+            assignr.session = Session()
+            adapter = HTTPAdapter(pool_maxsize=max(len(sites), 10))
+            assignr.session.mount('https://', adapter)
+            assignr.session.mount('http://', adapter)
+            self.sites = [assignr.for_site(site) for site in sites]
+            logger.info(f"Reporting on {len(self.sites)} site(s): "
+                        f"{', '.join(str(site.site_name) for site in self.sites)}")
+        return 0, self.sites
+
+    def load_users(self):
+        """
+        Loads the Assignr referees and assignors into the client once.
+        """
+        rc, assignr = self.get_assignr()
+        if rc:
+            return rc, None
+        if not self.users_loaded:
+            assignr.load_referees_assignors()
+            self.users_loaded = bool(assignr.referees or assignr.assignors)
+        return 0, assignr
+
+    def get_assignors(self):
+        if self.assignors is None:
+            self.assignors = get_assignor_information()
+        return self.assignors
+
+    def get_coaches(self):
+        """
+        Returns the coach index. The Google client is only imported by the
+        reports that need coaches.
+        """
+        if self.coaches is None:
+            from helpers.coach_cache import get_coach_cache
+            from helpers.coach_index import CoachIndex
+
+            rc, spreadsheet_vars = self.get_spreadsheet_vars()
+            if rc:
+                return rc, None
+            self.coach_cache = get_coach_cache()
+            self.coaches = CoachIndex(self.coach_cache.get(
+                spreadsheet_vars[constants.SPREADSHEET_ID],
+                spreadsheet_vars[constants.SPREADSHEET_RANGE]))
+        return 0, self.coaches
+
+    def get_outbox(self):
+        if self.outbox is None:
+            self.outbox = get_outbox()
+        return self.outbox
+
+    def start_checkpoint(self, run_id, resume=False):
+        """
+        Saves the pages the Assignr clients fetch under the run id. With
+        resume, the pages saved by an earlier run with the same id are
+        read back instead of fetched again.
+        """
+        self.checkpoint = get_checkpoint(run_id, resume)
+        if resume:
+            logger.info(f"Resuming run {run_id} from "
+                        f"{self.checkpoint.saved_pages()} saved page(s)")
+        for assignr in [self.assignr] + (self.sites or []):
+            if assignr is not None:
+                assignr.checkpoint = self.checkpoint
+        return self.checkpoint
+
+    def finish_checkpoint(self, completed=True) -> None:
+        """
+        Detaches the run's checkpoint from the clients. Its saved pages are
+        discarded when the run completed with every page fetched, and
+        otherwise kept for --resume. Called even when the run raised, so
+        the next run on the context doesn't use a stale checkpoint.
+        """
+        if self.checkpoint is not None:
+            if completed and not self.checkpoint.failed_pages:
+                self.checkpoint.discard()
+            else:
+                logger.info(f"Keeping {self.checkpoint.saved_pages()} saved page(s)"
+                            f" of run {self.checkpoint.run_id}, use --resume to continue")
+        for assignr in [self.assignr] + (self.sites or []):
+            if assignr is not None:
+                assignr.checkpoint = None
+        self.checkpoint = None
+
+    def clear(self) -> None:
+        """
+        Forgets the fetched Assignr responses, so the next report run
+        sees current data. The client, token and site id are kept.
+        """
+        response_cache = {}
+        for assignr in [self.assignr] + (self.sites or []):
+            if assignr is not None:
+                assignr.response_cache = response_cache
+
+    def close(self) -> None:
+        if self.coach_cache is not None:
+            self.coach_cache.wait()
+        if self.assignr is not None and self.assignr.session is not None:
+            self.assignr.session.close()
@@ -0,0 +1,173 @@
+from datetime import (datetime, timedelta)
+import logging
+
+from helpers.availability_index import (DEFAULT_GAME_MINUTES, get_game_start)
+from helpers.conflicts import (DEFAULT_TURNAROUND_MINUTES, get_assignments,
+                               get_venue_key)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_GAMES_PER_DAY = 3
+# Costs of the matching. Leaving a position open costs more than any
+# crew, so as many positions as possible are filled first.
+GAME_COST = 2
+VENUE_CHANGE_COST = 1
+OPEN_COST = 10 ** 6
+INELIGIBLE_COST = 10 ** 9
+
+
+def get_start(game):
+    day, minutes = get_game_start(game)
+    return datetime.combine(day, datetime.min.time()) + timedelta(minutes=minutes)
+
+def solve_assignment(costs) -> list:
+    """
+    Returns the column matched to each row of the cost matrix, with the
+    least total cost, using the Hungarian algorithm. Needs at least as
+    many columns as rows.
+    """
+    rows = len(costs)
+    columns = len(costs[0]) if rows else 0
+    row_potential = [0] * (rows + 1)
+    column_potential = [0] * (columns + 1)
+    # matched[column] is the 1-based row matched to the 1-based column
+    matched = [0] * (columns + 1)
+    way = [0] * (columns + 1)
+    for row in range(1, rows + 1):
+        matched[0] = row
+        column = 0
+        least = [float('inf')] * (columns + 1)
+        used = [False] * (columns + 1)
+        while matched[column]:
+            used[column] = True
+            current_row = matched[column]
+            delta = float('inf')
+            next_column = 0
+            row_costs = costs[current_row - 1]
+            for candidate in range(1, columns + 1):
+                if used[candidate]:
+                    continue
+                cost = row_costs[candidate - 1] - row_potential[current_row] - \
+                    column_potential[candidate]
+                if cost < least[candidate]:
+                    least[candidate] = cost
+                    way[candidate] = column
+                if least[candidate] < delta:
+                    delta = least[candidate]
+                    next_column = candidate
+            for candidate in range(columns + 1):
+                if used[candidate]:
+                    row_potential[matched[candidate]] += delta
+                    column_potential[candidate] -= delta
+                else:
+                    least[candidate] -= delta
+            column = next_column
+        while column:
+            previous = way[column]
+            matched[column] = matched[previous]
+            column = previous
+
+    result = [None] * rows
+    for column in range(1, columns + 1):
+        if matched[column]:
+            result[matched[column] - 1] = column - 1
+    return result
+
+
+class CrewSolver:
+    """
+    Proposes referees for the open positions of games. Games starting at
+    the same time are solved together as a weighted bipartite matching of
+    positions to the referees available for the whole game, who aren't
+    booked on an overlapping game, or one at another venue less than
+    turnaround_minutes before or after, and have fewer than
+    max_games_per_day games that day. Each start is solved in order, so
+    earlier games are filled first, and referees with fewer games that
+    day, already at the venue, are preferred.
+    """
+    def __init__(self, index, game_minutes=DEFAULT_GAME_MINUTES,
+                 turnaround_minutes=DEFAULT_TURNAROUND_MINUTES,
+                 max_games_per_day=DEFAULT_MAX_GAMES_PER_DAY) -> None:
+        self.index = index
+        self.duration = timedelta(minutes=game_minutes)
+        self.game_minutes = game_minutes
+        self.turnaround = timedelta(minutes=turnaround_minutes)
+        self.max_games_per_day = max_games_per_day
+        self.booked = {}
+
+    def book(self, referee_id, start, end, venue) -> None:
+        self.booked.setdefault((referee_id, start.date()), []).append((start, end, venue))
+
+    def get_cost(self, referee_id, start, end, venue):
+        """
+        Returns the cost of the referee taking a game, or None when they
+        can't.
+        """
+        bookings = self.booked.get((referee_id, start.date()), [])
+        if len(bookings) >= self.max_games_per_day:
+            return None
+        for booked_start, booked_end, booked_venue in bookings:
+            gap = self.turnaround if booked_venue != venue else timedelta(0)
+            if start < booked_end + gap and booked_start < end + gap:
+                return None
+        if bookings and all(booked_venue != venue for _, _, booked_venue in bookings):
+            return len(bookings) * GAME_COST + VENUE_CHANGE_COST
+        return len(bookings) * GAME_COST
+
+    def get_waves(self, games) -> list:
+        """
+        Returns the open games grouped by start, in start order.
+        """
+        waves = {}
+        for game in games:
+            if game.get('cancelled') or not game.get('open_positions'):
+                continue
+            try:
+                start = get_start(game)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                logger.warning(f"Game {game.get('id')} has no start, not staffed")
+                continue
+            waves.setdefault(start, []).append(game)
+        return [(start, waves[start]) for start in sorted(waves)]
+
+    def solve(self, games) -> list:
+        """
+        Returns a proposal per open position: the game, the position and
+        the referee id, None when no referee can take it.
+        """
+        games = list(games)
+        for referee_id, assignments in get_assignments(games, self.game_minutes).items():
+            for start, end, game in assignments:
+                self.book(referee_id, start, end, get_venue_key(game))
+
+        available = self.index.query_bits(games, self.game_minutes)
+        proposals = []
+        for start, wave in self.get_waves(games):
+            end = start + self.duration
+            positions = [(game, position) for game in wave
+                         for position in game['open_positions']]
+            candidates = set()
+            for game in wave:
+                candidates.update(self.index.get_referees(available[game['id']]))
+            candidates = sorted(candidates, key=str)
+
+            costs = []
+            for game, _ in positions:
+                venue = get_venue_key(game)
+                available_ids = set(self.index.get_referees(available[game['id']]))
+                row = []
+                for referee_id in candidates:
+                    cost = self.get_cost(referee_id, start, end, venue) \
+                        if referee_id in available_ids else None
+                    row.append(INELIGIBLE_COST if cost is None else cost)
+                costs.append(row + [OPEN_COST] * len(positions))
+
+            for row, column in enumerate(solve_assignment(costs)):
+                game, position = positions[row]
+                referee_id = None
+                if costs[row][column] < OPEN_COST:
+                    referee_id = candidates[column]
+                    self.book(referee_id, start, end, get_venue_key(game))
+                proposals.append({'game': game, 'position': position,
+                                  'referee_id': referee_id})
+        return proposals
@@ -19,15 +19,17 @@ def get_email_components(email_address):
 
 class EMailClient():
     def __init__(self, smtp_server, smtp_port, sender_email,
-                 sender_name, password) -> None:
+                 sender_name, password, starttls=True) -> None:
         self.context = ssl.create_default_context()
         self.smtp_server = smtp_server
         self.sender_email = sender_email
         self.sender_name = sender_name
         self.password = password
         self.smtp_port = smtp_port
+        self.starttls = starttls
 
-    def create_email(self, subject, message, send_to, html=True):
+    def create_email(self, subject, message, send_to, html=True, text=None,
+                     attachments=None):
         logger.debug('Starting create email ...')
 
         email = EmailMessage()
@@ -51,15 +53,21 @@ class EMailClient():
                                   )]
 
         email["Subject"] = subject
-        email.set_content(message)
+        email.set_content(text if text else message)
         if html:
             email.add_alternative(message, subtype="html")
 
+        for attachment in attachments or []:
+            email.add_attachment(attachment['data'],
+                                 maintype=attachment['maintype'],
+                                 subtype=attachment['subtype'],
+                                 filename=attachment['file_name'])
+
         logger.debug('Completed create email ...')
         return email
 
     def send_email(self, subject, message, send_to,
-                   html=False) -> int:
+                   html=False, text=None, attachments=None) -> int:
         rc = 0
         logger.debug('Starting send email ...')
     
@@ -78,7 +86,8 @@ class EMailClient():
         if rc:
             return rc
 
-        email = self.create_email(subject, message, send_to, html)
+        email = self.create_email(subject, message, send_to, html, text,
+                                  attachments)
 
         if email is None:
             logger.error("Unable to create email")
@@ -89,10 +98,12 @@ class EMailClient():
                 server = smtplib.SMTP_SSL(self.smtp_server)
             else:
                 server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-                server.starttls(context=self.context)
+                if self.starttls:
+                    server.starttls(context=self.context)
 
             server.login(self.sender_email, self.password)
             server.send_message(email)
+            server.quit()
 #            server.sendmail(self.sender_email, self.sender_email,
 #                            email.as_string())
             logger.debug('Completed send email ...')
@@ -0,0 +1,224 @@
+from sys import (stderr, stdout)
+from importlib.util import find_spec
+import csv
+import json
+import logging
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+PARQUET = 'parquet'
+FORMATS = (CSV, NDJSON, PARQUET)
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns exported, with their type in columnar formats
+AVAILABILITY_FIELDS = (
+    ('referee', str),
+    ('referee_id', str),
+    ('date', str),
+    ('availability', str)
+)
+COVERAGE_FIELDS = (
+    ('id', int),
+    ('game_date', str),
+    ('game_time', str),
+    ('league', str),
+    ('home_team', str),
+    ('away_team', str),
+    ('available', int),
+    ('referees', str)
+)
+BULK_FIELDS = (
+    ('id', int),
+    ('game_date', str),
+    ('game_time', str),
+    ('league', str),
+    ('home_team', str),
+    ('away_team', str),
+    ('action', str),
+    ('status', str),
+    ('status_code', int),
+    ('error', str)
+)
+CONFLICT_FIELDS = (
+    ('conflict', str),
+    ('referee_id', int),
+    ('referee', str),
+    ('game_date', str),
+    ('first_game', int),
+    ('first_time', str),
+    ('first_venue', str),
+    ('second_game', int),
+    ('second_time', str),
+    ('second_venue', str),
+    ('gap_minutes', int)
+)
+CREW_FIELDS = (
+    ('id', int),
+    ('game_date', str),
+    ('game_time', str),
+    ('league', str),
+    ('home_team', str),
+    ('away_team', str),
+    ('venue', str),
+    ('position', str),
+    ('referee_id', int),
+    ('referee', str)
+)
+GAME_FIELDS = (
+    ('id', int),
+    ('game_date', str),
+    ('game_time', str),
+    ('start_time', str),
+    ('league', str),
+    ('game_type', str),
+    ('age_group', str),
+    ('gender', str),
+    ('home_team', str),
+    ('away_team', str),
+    ('venue', str),
+    ('sub_venue', str),
+    ('cancelled', bool),
+    ('referees', str),
+    ('assignor', str)
+)
+
+
+def get_game_row(game) -> dict:
+    """
+    Flattens a game from get_game_information into one row, listing the
+    referees as "position: name" separated by semicolons.
+    """
+    row = {name: game.get(name) for name, _ in GAME_FIELDS}
+    row['referees'] = '; '.join(
+        f"{referee['position']}: {referee['first_name']} {referee['last_name']}"
+        for referee in game.get('referees') or [])
+    assignor = game.get('assignor')
+    row['assignor'] = f"{assignor['first_name']} {assignor['last_name']}" \
+        if assignor else None
+    return row
+
+def check_export_arguments(export_format, output_file):
+    """
+    Returns why the format can't be exported to the output file, or None.
+    """
+    if export_format not in FORMATS:
+        return f"Format value, {export_format} is invalid"
+    if export_format == PARQUET:
+        if not output_file:
+            return "Parquet exports need an output file, use -o"
+        if find_spec('pyarrow') is None:
+            return "Parquet exports need pyarrow, run pip install pyarrow"
+    return None
+
+def log_to_stderr() -> None:
+    """
+    Moves log output from stdout to stderr, so an export written to stdout
+    only holds its rows.
+    """
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler) and handler.stream is stdout:
+            handler.setStream(stderr)
+
+def get_exporter(export_format, output_file, fields, batch_size=DEFAULT_BATCH_SIZE):
+    if export_format == CSV:
+        return CsvExporter(output_file, fields)
+    if export_format == NDJSON:
+        return NdjsonExporter(output_file, fields)
+    if export_format == PARQUET:
+        return ParquetExporter(output_file, fields, batch_size)
+    raise ValueError(f'Export format {export_format} is invalid')
+
+
+class Exporter:
+    """
+    Writes rows to a file, or stdout when no file is given, as they're
+    passed in, so an export of any size holds at most one row, or one
+    batch for columnar formats, in memory.
+    """
+    def __init__(self, output_file, fields) -> None:
+        self.output_file = output_file
+        self.fields = fields
+        self.field_names = [name for name, _ in fields]
+        self.count = 0
+        self.output = self.open_output(output_file)
+
+    def open_output(self, output_file):
+        return open(output_file, 'w', newline='') if output_file else stdout
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def write(self, row) -> None:
+        self.write_row(row)
+        self.count += 1
+
+    def write_row(self, row) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        if self.output is stdout:
+            self.output.flush()
+        elif self.output is not None:
+            self.output.close()
+
+
+class CsvExporter(Exporter):
+    def __init__(self, output_file, fields) -> None:
+        super().__init__(output_file, fields)
+        self.writer = csv.DictWriter(self.output, fieldnames=self.field_names,
+                                     extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write_row(self, row) -> None:
+        self.writer.writerow(row)
+
+
+class NdjsonExporter(Exporter):
+    def write_row(self, row) -> None:
+        self.output.write(json.dumps({name: row.get(name) for name in self.field_names},
+                                     default=str))
+        self.output.write('\n')
+
+
+class ParquetExporter(Exporter):
+    """
+    Writes a row group every batch_size rows. pyarrow is only imported
+    by parquet exports.
+    """
+    def __init__(self, output_file, fields, batch_size=DEFAULT_BATCH_SIZE) -> None:
+        import pyarrow
+        import pyarrow.parquet
+
+        if not output_file:
+            raise ValueError('Parquet exports need an output file')
+        super().__init__(output_file, fields)
+        types = {str: pyarrow.string(), int: pyarrow.int64(), bool: pyarrow.bool_()}
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([(name, types[field_type])
+                                      for name, field_type in fields])
+        self.writer = pyarrow.parquet.ParquetWriter(output_file, self.schema)
+        self.batch_size = batch_size
+        self.batch = []
+
+    def open_output(self, output_file):
+        # The parquet writer opens the file itself
+        return None
+
+    def write_row(self, row) -> None:
+        self.batch.append({name: row.get(name) for name in self.field_names})
+        if len(self.batch) >= self.batch_size:
+            self.write_batch()
+
+    def write_batch(self) -> None:
+        if self.batch:
+            self.writer.write_table(self.pyarrow.Table.from_pylist(self.batch,
+                                                                   schema=self.schema))
+            self.batch = []
+
+    def close(self) -> None:
+        self.write_batch()
+        self.writer.close()
+        super().close()
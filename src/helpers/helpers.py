@@ -1,13 +1,13 @@
-from os import (environ, path)
+from os import environ
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+import hashlib
+import json
 import re
 
-from dateutil import parser
 import logging
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 import csv
-from google import auth
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from helpers.constants import ADMIN_EMAIL, ADMIN_NARRATIVE, ADMIN_REVIEW, \
     AUTH_URL, ASSIGNOR_CSV_FILE, BASE_URL, CLIENT_ID, CLIENT_SECRET, \
     CLIENT_SCOPE, CREW_CHANGES, EMAIL_PASSWORD, EMAIL_PORT, \
@@ -32,6 +32,8 @@ def format_date_yyyy_mm_dd(date) -> str:
     
 # Jinja template formatters
 def format_str_mm_dd_yyyy(date_str) -> str:
+    from dateutil import parser
+
     formatted_date = None
     try:
         dt = parser.parse(date_str)
@@ -45,6 +47,8 @@ def format_str_mm_dd_yyyy(date_str) -> str:
     return formatted_date
 
 def format_str_hh_mm(date_str) -> str:
+    from dateutil import parser
+
     formatted_time = None
     try:
         dt = parser.parse(date_str)
@@ -58,6 +62,8 @@ def format_str_hh_mm(date_str) -> str:
     return formatted_time
 
 def format_date_mm_dd_yyyy(date) -> str:
+    from dateutil import parser
+
     formatted_date = None
     try:
         formatted_date = date.strftime("%m/%d/%Y")
@@ -70,6 +76,8 @@ def format_date_mm_dd_yyyy(date) -> str:
     return formatted_date
 
 def format_date_hh_mm(date) -> str:
+    from dateutil import parser
+
     formatted_time = None
     try:
         formatted_time = date.strftime("%I:%M %p")
@@ -81,20 +89,53 @@ def format_date_hh_mm(date) -> str:
         logger.error(f"Unknown error: {e}")
     return formatted_time
 
-def create_message(content, template_name):
-    logger.debug('Starting create message ...')
-    message = None
-    template_dir = path.join(
-            path.dirname(path.realpath(__file__)),
-            "templates/")
+RENDER_CACHE_SIZE = 128
+_render_cache = OrderedDict()
+_render_cache_lock = Lock()
+
+@lru_cache(maxsize=None)
+def get_jinja_environment():
+    from jinja2 import (Environment, PackageLoader, select_autoescape)
+
     jinja_env = Environment(
-        autoescape=True,
-        loader=FileSystemLoader(template_dir))
+        autoescape=select_autoescape(enabled_extensions=('html.jinja',),
+                                     disabled_extensions=('text.jinja',),
+                                     default=True),
+        loader=PackageLoader('helpers', 'templates'))
     jinja_env.filters['format_mm_dd_yyyy'] = format_date_mm_dd_yyyy
     jinja_env.filters['format_hh_mm'] = format_date_hh_mm
+    return jinja_env
+
+def get_content_hash(template_name, content) -> str:
+    normalized = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f'{template_name}\n{normalized}'.encode('utf-8')).hexdigest()
+
+def create_message(content, template_name):
+    from jinja2 import TemplateNotFound
+
+    logger.debug('Starting create message ...')
+    message = None
     try:
-        template = jinja_env.get_template(template_name)
+        content_hash = get_content_hash(template_name, content)
+    except TypeError as te:
+        # Keys json can't sort, such as tuples, are rendered without the cache
+        logger.debug(f'Content not hashed, rendering uncached: {te}')
+        content_hash = None
+    with _render_cache_lock:
+        if content_hash in _render_cache:
+            _render_cache.move_to_end(content_hash)
+            logger.debug('Completed create message, reused cached render ...')
+            return _render_cache[content_hash]
+
+    try:
+        template = get_jinja_environment().get_template(template_name)
         message = template.render(content)
+        if content_hash is not None:
+            with _render_cache_lock:
+                _render_cache[content_hash] = message
+                if len(_render_cache) > RENDER_CACHE_SIZE:
+                    _render_cache.popitem(last=False)
     except TemplateNotFound as tf:
         logger.error(f"Missing File: {tf}")
 
@@ -104,43 +145,6 @@ def create_message(content, template_name):
     logger.debug('Completed create message ...')
     return message
 
-def load_sheet(sheet_id, sheet_range) -> list:
-    credentials, _ = auth.default()
-    sheet_values = []
-
-    try:
-        service = build('sheets', 'v4', credentials=credentials, cache_discovery=False)
-        sheet = service.spreadsheets()
-        result = sheet.values().get(
-            spreadsheetId=sheet_id, range=sheet_range).execute()
-        sheet_values = result.get('values', [])
-        logger.info(f"{len(sheet_values)} rows retrieved")
-    except HttpError as error:
-        logger.error(f"An error occurred: {error}")
-    
-    return sheet_values
-
-def rows_to_dict(rows):
-    result = {}
-
-    for row in rows:
-        current_level = result
-        for key in row[:-2]:
-            current_level = current_level.setdefault(key, {})
-        current_level[row[-2]] = row[-1]
-
-    return result
-
-def get_coach_information(spreadsheet_id, sheet_range) -> dict:
-    rows =  []
-
-    temp_values = load_sheet(spreadsheet_id, sheet_range)
-    for row in temp_values:
-        if row and 'grade' in row[0].lower():
-            rows.append(row)
-
-    return rows_to_dict(rows)
-
 def get_assignor_information():
     results = {}
 
@@ -310,12 +314,6 @@ def get_match_count(data, match):
 
     return sum(1 for key in data.keys() if pattern.match(key))
 
-def get_coaches_name(coaches, age_group, gender, team):
-    try:
-        return coaches[age_group][gender][team]
-    except KeyError:
-        return 'Unknown' 
-
 def get_referees(payload):
     pattern = r'\.officials\.\d+\.position'
     found_cnt = get_match_count(payload, pattern)
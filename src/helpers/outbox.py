@@ -0,0 +1,356 @@
+from os import (environ, listdir, makedirs, path, remove, replace)
+from datetime import (datetime, timedelta)
+from threading import RLock
+from time import sleep
+import base64
+import hashlib
+import json
+import logging
+import smtplib
+
+from helpers.constants import (EMAIL_DAILY_QUOTA, EMAIL_QUOTA_RESERVE,
+                               OUTBOX_DIR)
+from helpers.email import get_email_components
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_DIR = 'outbox'
+PENDING = 'pending'
+SENT = 'sent'
+QUOTA_FILE = 'quota.state'
+
+# Lower values are sent first. Priorities at or above PRIORITY_BULK can't
+# use the quota reserved for the more urgent emails.
+PRIORITY_MISCONDUCT = 0
+PRIORITY_ASSIGNOR = 1
+PRIORITY_ADMIN = 2
+PRIORITY_REFEREE_REMINDER = 3
+PRIORITY_BULK = PRIORITY_ADMIN
+PRIORITIES = {
+    'misconduct': PRIORITY_MISCONDUCT,
+    'assignor': PRIORITY_ASSIGNOR,
+    'administrator': PRIORITY_ADMIN,
+    'missing_reports': PRIORITY_ADMIN,
+    'referee_reminder': PRIORITY_REFEREE_REMINDER,
+    'referee_digest': PRIORITY_REFEREE_REMINDER
+}
+
+
+def get_idempotency_key(report_type, start_date, end_date, item_id=None):
+    return f'{report_type}:{item_id or ""}:{start_date}:{end_date}'
+
+
+def get_priority(key) -> int:
+    return PRIORITIES.get(key.split(':', 1)[0], PRIORITY_ADMIN)
+
+
+def get_body_hash(subject, message, text=None, attachments=None) -> str:
+    body_hash = hashlib.sha256(f'{subject}\n{message}\n{text or ""}'.encode('utf-8'))
+    for attachment in attachments or []:
+        body_hash.update(attachment['data'])
+    return body_hash.hexdigest()
+
+
+def encode_attachments(attachments):
+    return [dict(attachment, data=base64.b64encode(attachment['data']).decode('ascii'))
+            for attachment in attachments or []]
+
+
+def decode_attachments(attachments):
+    return [dict(attachment, data=base64.b64decode(attachment['data']))
+            for attachment in attachments or []]
+
+
+def split_recipients(send_to):
+    recipients = {}
+    for recipient in send_to.split(','):
+        recipient = recipient.strip()
+        if recipient:
+            address = get_email_components(recipient)['address'].lower()
+            recipients.setdefault(address, recipient)
+    return recipients
+
+
+def merge_recipients(send_to, other_send_to) -> str:
+    recipients = split_recipients(send_to)
+    for address, recipient in split_recipients(other_send_to).items():
+        recipients.setdefault(address, recipient)
+    return ','.join(recipients.values())
+
+
+def remove_recipients(send_to, sent_to) -> str:
+    sent_addresses = split_recipients(sent_to)
+    return ','.join(recipient for address, recipient
+                    in split_recipients(send_to).items()
+                    if address not in sent_addresses)
+
+
+def get_outbox():
+    daily_quota = None
+    quota_reserve = 0
+    try:
+        if environ.get(EMAIL_DAILY_QUOTA):
+            daily_quota = int(environ[EMAIL_DAILY_QUOTA])
+        quota_reserve = int(environ.get(EMAIL_QUOTA_RESERVE, 0))
+    except ValueError:
+        logger.error(f'{EMAIL_DAILY_QUOTA} and {EMAIL_QUOTA_RESERVE} must be integers, ignoring quota')
+        daily_quota = None
+        quota_reserve = 0
+
+    return Outbox(environ.get(OUTBOX_DIR, DEFAULT_OUTBOX_DIR),
+                  daily_quota=daily_quota, quota_reserve=quota_reserve)
+
+
+class Quota:
+    """
+    Number of recipients emailed today, kept on disk so the daily limit
+    applies across runs. Bulk emails stop `reserve` recipients short of
+    the limit so urgent emails can still go out.
+    """
+    def __init__(self, quota_file, daily_limit=None, reserve=0) -> None:
+        self.quota_file = quota_file
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self.day = None
+        self.sent = 0
+        self.load()
+
+    def load(self) -> None:
+        today = datetime.now().date().isoformat()
+        try:
+            with open(self.quota_file, 'r') as quota_file:
+                state = json.load(quota_file)
+            self.day = state['date']
+            self.sent = state['sent']
+        except (FileNotFoundError, ValueError, KeyError):
+            self.day = today
+            self.sent = 0
+
+        if self.day != today:
+            self.day = today
+            self.sent = 0
+
+    def save(self) -> None:
+        temp_file = f'{self.quota_file}.tmp'
+        with open(temp_file, 'w') as quota_file:
+            json.dump({'date': self.day, 'sent': self.sent}, quota_file)
+        replace(temp_file, self.quota_file)
+
+    def remaining(self, priority):
+        if self.daily_limit is None:
+            return None
+        limit = self.daily_limit
+        if priority >= PRIORITY_BULK:
+            limit -= self.reserve
+        return max(limit - self.sent, 0)
+
+    def allows(self, recipients, priority) -> bool:
+        self.load()
+        remaining = self.remaining(priority)
+        return remaining is None or recipients <= remaining
+
+    def record(self, recipients) -> None:
+        if self.daily_limit is None:
+            return
+        self.load()
+        self.sent += recipients
+        self.save()
+
+
+class Outbox:
+    """
+    On-disk spool of rendered emails. Each message is stored in its own
+    json file named after the hash of its idempotency key, so a rerun
+    only resends messages that are still pending. Messages with the same
+    subject and body are merged into one message, and recipients who
+    already received an identical message aren't sent it again. Pending
+    messages are sent in priority order, misconducts first, within the
+    daily quota.
+    """
+    def __init__(self, spool_dir, retention_days=30, daily_quota=None,
+                 quota_reserve=0) -> None:
+        self.spool_dir = spool_dir
+        self.retention_days = retention_days
+        self.body_index = None
+        # Report stages and league workers use the outbox from several threads
+        self.lock = RLock()
+        makedirs(self.spool_dir, exist_ok=True)
+        self.quota = Quota(path.join(self.spool_dir, QUOTA_FILE), daily_quota,
+                           quota_reserve)
+
+    def get_entry_file(self, key):
+        file_name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return path.join(self.spool_dir, f'{file_name}.json')
+
+    def read_entry(self, file_name):
+        try:
+            with open(file_name, 'r') as entry_file:
+                return json.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.error(f"Outbox entry {file_name} is corrupt, ignoring")
+            return None
+
+    def write_entry(self, entry):
+        file_name = self.get_entry_file(entry['key'])
+        temp_file = f'{file_name}.tmp'
+        with self.lock:
+            with open(temp_file, 'w') as entry_file:
+                json.dump(entry, entry_file)
+            replace(temp_file, file_name)
+            if self.body_index is not None and entry.get('body_hash'):
+                self.body_index.setdefault(entry['body_hash'], {})[entry['key']] = entry
+
+    def get_body_entries(self, body_hash):
+        if self.body_index is None:
+            self.body_index = {}
+            for entry in self.entries():
+                if entry.get('body_hash'):
+                    self.body_index.setdefault(
+                        entry['body_hash'], {})[entry['key']] = entry
+        return list(self.body_index.get(body_hash, {}).values())
+
+    def merge_duplicate(self, key, body_hash, send_to):
+        """
+        Returns the recipients still needing the message, or None when a
+        pending duplicate absorbed them.
+        """
+        for duplicate in self.get_body_entries(body_hash):
+            if duplicate['key'] == key:
+                continue
+            if duplicate['status'] == SENT:
+                send_to = remove_recipients(send_to, duplicate['send_to'])
+            else:
+                duplicate['send_to'] = merge_recipients(duplicate['send_to'],
+                                                        send_to)
+                self.write_entry(duplicate)
+                logger.info(f"Merged {key} into {duplicate['key']}, same content")
+                return None
+        return send_to
+
+    def add(self, key, subject, message, send_to, text=None,
+            attachments=None, priority=None) -> bool:
+        with self.lock:
+            entry = self.read_entry(self.get_entry_file(key))
+            if entry and entry['status'] == SENT:
+                logger.info(f"Skipping {key}, already sent on {entry['sent_at']}")
+                return False
+
+            body_hash = get_body_hash(subject, message, text, attachments)
+            send_to = self.merge_duplicate(key, body_hash, send_to)
+            if send_to is None:
+                return True
+            if not send_to:
+                logger.info(f"Skipping {key}, identical content already sent")
+                return False
+
+            if entry is None:
+                entry = {
+                    'key': key,
+                    'status': PENDING,
+                    'created': datetime.now().isoformat(),
+                    'attempts': 0,
+                    'last_error': None,
+                    'sent_at': None
+                }
+
+            entry['subject'] = subject
+            entry['message'] = message
+            entry['send_to'] = send_to
+            entry['text'] = text
+            entry['attachments'] = encode_attachments(attachments)
+            entry['body_hash'] = body_hash
+            entry['priority'] = get_priority(key) if priority is None else priority
+            self.write_entry(entry)
+            logger.debug(f"Queued {key}")
+            return True
+
+    def entries(self):
+        results = []
+        for file_name in listdir(self.spool_dir):
+            if not file_name.endswith('.json'):
+                continue
+            entry = self.read_entry(path.join(self.spool_dir, file_name))
+            if entry:
+                results.append(entry)
+        return sorted(results, key=lambda entry: entry['created'])
+
+    def pending(self):
+        pending = [entry for entry in self.entries()
+                   if entry['status'] == PENDING]
+        return sorted(pending, key=lambda entry: entry.get('priority',
+                                                           PRIORITY_ADMIN))
+
+    def send_entry(self, entry, send, retries, backoff) -> int:
+        rc = 0
+        extras = {}
+        if entry.get('text'):
+            extras['text'] = entry['text']
+        if entry.get('attachments'):
+            extras['attachments'] = decode_attachments(entry['attachments'])
+
+        for attempt in range(1, retries + 1):
+            entry['attempts'] += 1
+            try:
+                rc = send(entry['subject'], entry['message'],
+                          entry['send_to'], **extras)
+            except (smtplib.SMTPException, OSError) as se:
+                logger.error(f"Attempt {attempt} for {entry['key']} failed: {se}")
+                rc = 44
+                entry['last_error'] = str(se)
+
+            if not rc:
+                entry['status'] = SENT
+                entry['sent_at'] = datetime.now().isoformat()
+                entry['last_error'] = None
+                break
+
+            if attempt < retries:
+                sleep(backoff * attempt)
+
+        self.write_entry(entry)
+        return rc
+
+    def flush(self, send, retries=3, backoff=2) -> int:
+        """
+        Sends every pending message using `send(subject, message, send_to)`,
+        which returns 0 on success. The text part and attachments, when
+        present, are passed as the `text` and `attachments` keywords.
+        Returns the number of messages still pending after the retries are
+        exhausted, emails deferred by the daily quota aren't counted.
+        """
+        failed = 0
+        deferred = 0
+        for entry in self.pending():
+            recipients = len(split_recipients(entry['send_to']))
+            # Recipients are counted before sending, so concurrent flushes
+            # can't go over the quota together
+            with self.lock:
+                allowed = self.quota.allows(recipients,
+                                            entry.get('priority', PRIORITY_ADMIN))
+                if allowed:
+                    self.quota.record(recipients)
+            if not allowed:
+                deferred += 1
+                continue
+
+            if self.send_entry(entry, send, retries, backoff):
+                logger.error(f"Unable to send {entry['key']}, leaving it in the outbox")
+                failed += 1
+                with self.lock:
+                    self.quota.record(-recipients)
+            else:
+                logger.info(f"Sent {entry['key']}")
+
+        if deferred:
+            logger.warning(f"Daily email quota reached, {deferred} email(s) deferred")
+        self.purge()
+        return failed
+
+    def purge(self) -> None:
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        for entry in self.entries():
+            if entry['status'] == SENT and entry['sent_at'] < cutoff:
+                remove(self.get_entry_file(entry['key']))
+                self.body_index = None
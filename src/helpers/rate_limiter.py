@@ -0,0 +1,40 @@
+from os import environ
+from threading import Lock
+from time import (monotonic, sleep)
+import logging
+
+from helpers.constants import ASSIGNR_RATE_LIMIT
+
+logger = logging.getLogger(__name__)
+
+
+def get_rate_limiter():
+    """
+    Returns the limiter for ASSIGNR_RATE_LIMIT requests a second, or None
+    when requests aren't limited.
+    """
+    try:
+        rate = float(environ.get(ASSIGNR_RATE_LIMIT) or 0)
+    except ValueError:
+        logger.error(f'{ASSIGNR_RATE_LIMIT} environment variable is not a number, requests are not limited')
+        return None
+    return RateLimiter(rate) if rate > 0 else None
+
+
+class RateLimiter:
+    """
+    Spaces out the requests of every thread sharing the limiter to at most
+    rate a second.
+    """
+    def __init__(self, rate) -> None:
+        self.interval = 1 / rate
+        self.next_time = 0.0
+        self.lock = Lock()
+
+    def acquire(self) -> None:
+        with self.lock:
+            now = monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            sleep(wait)
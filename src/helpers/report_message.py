@@ -0,0 +1,110 @@
+from os import environ
+from io import (BytesIO, TextIOWrapper)
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from zipfile import (ZipFile, ZIP_DEFLATED)
+import csv
+import json
+import logging
+
+from helpers.constants import REPORT_BYTE_THRESHOLD, REPORT_ROW_THRESHOLD
+from helpers.helpers import (create_message, get_jinja_environment)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROW_THRESHOLD = 25
+DEFAULT_BYTE_THRESHOLD = 1000000
+
+
+def get_threshold(name, default) -> int:
+    try:
+        return int(environ.get(name, default))
+    except ValueError:
+        logger.error(f'{name} environment variable is not an integer, defaulting to {default}')
+        return default
+
+@lru_cache(maxsize=None)
+def get_text_template_name(template_name):
+    text_name = template_name.replace('.html.', '.text.')
+    if text_name != template_name and \
+        text_name in get_jinja_environment().list_templates():
+        return text_name
+    return None
+
+def flatten_value(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        if 'name' in value and len(value) <= 2:
+            if 'position' in value:
+                return f"{value['position']}: {value['name']}"
+            return value['name']
+        return json.dumps(value, default=str)
+    if isinstance(value, list):
+        return '; '.join(flatten_value(item) for item in value)
+    return value
+
+def write_rows_archive(rows, csv_name) -> bytes:
+    """
+    Writes the rows as csv straight into a compressed zip entry, one row
+    at a time, and returns the zip file contents.
+    """
+    buffer = BytesIO()
+    with ZipFile(buffer, 'w', ZIP_DEFLATED) as archive:
+        with TextIOWrapper(archive.open(csv_name, 'w'), encoding='utf-8',
+                           newline='') as csv_file:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(csv_file, fieldnames=list(row.keys()),
+                                            extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow({key: flatten_value(value)
+                                 for key, value in row.items()})
+    return buffer.getvalue()
+
+def build_report_message(content, template_name, rows_key=None, title=None):
+    """
+    Renders the html and text parts of a report email. When the report
+    has more rows than REPORT_ROW_THRESHOLD, or the html is larger than
+    REPORT_BYTE_THRESHOLD bytes, the email only carries a summary and the
+    rows are attached as a zipped csv file.
+    """
+    rows = content.get(rows_key) or [] if rows_key else []
+    row_threshold = get_threshold(REPORT_ROW_THRESHOLD, DEFAULT_ROW_THRESHOLD)
+    byte_threshold = get_threshold(REPORT_BYTE_THRESHOLD, DEFAULT_BYTE_THRESHOLD)
+
+    if len(rows) <= row_threshold:
+        message = create_message(content, template_name)
+        if message is None or len(message.encode('utf-8')) <= byte_threshold:
+            text_template = get_text_template_name(template_name)
+            return {
+                'message': message,
+                'text': create_message(content, text_template) if text_template else None,
+                'attachments': []
+            }
+
+    report_name = template_name.split('.')[0]
+    file_name = f'{report_name}.zip'
+    summary = {
+        'title': title or report_name.replace('_', ' ').title(),
+        'start_date': content.get('start_date'),
+        'end_date': content.get('end_date'),
+        'row_count': len(rows),
+        'file_name': file_name,
+        'leagues': sorted(Counter(row.get('league') for row in rows
+                                  if row.get('league')).items())
+    }
+    logger.info(f"{summary['title']} has {len(rows)} rows, sending summary with {file_name}")
+
+    return {
+        'message': create_message(summary, 'summary.html.jinja'),
+        'text': create_message(summary, 'summary.text.jinja'),
+        'attachments': [{
+            'file_name': file_name,
+            'maintype': 'application',
+            'subtype': 'zip',
+            'data': write_rows_archive(rows, f'{report_name}.csv')
+        }]
+    }
@@ -0,0 +1,84 @@
+from datetime import (datetime, timedelta)
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+DEFAULT_REFRESH = 24 * 3600
+
+
+class Job:
+    """
+    A command run on a schedule, either every `every` seconds or daily at
+    `at` ("HH:MM"), optionally only on some `days` ("mon" to "sun"). The
+    arguments are parsed again before every run, so commands whose dates
+    default to today cover the current week.
+    """
+    def __init__(self, name, command, args=None, every=None, at=None,
+                 days=None) -> None:
+        if (every is None) == (at is None):
+            raise ValueError(f'Job {name} needs one of "every" or "at"')
+        if every is not None and int(every) <= 0:
+            raise ValueError(f'Job {name} "every" must be a positive number of seconds')
+        self.name = name
+        self.command = command
+        self.args = list(args or [])
+        self.every = timedelta(seconds=int(every)) if every is not None else None
+        self.at = datetime.strptime(at, '%H:%M').time() if at is not None else None
+        self.days = set()
+        for day in days or []:
+            if day.lower()[:3] not in DAYS:
+                raise ValueError(f'Job {name} day, {day} is invalid')
+            self.days.add(DAYS.index(day.lower()[:3]))
+
+    def next_run(self, after) -> datetime:
+        if self.every is not None:
+            return after + self.every
+
+        candidate = datetime.combine(after.date(), self.at)
+        if candidate <= after:
+            candidate += timedelta(days=1)
+        while self.days and candidate.weekday() not in self.days:
+            candidate += timedelta(days=1)
+        return candidate
+
+
+def load_schedule(schedule_file, commands):
+    """
+    Reads the schedule file. Returns the jobs and how many seconds the
+    loaded settings, token, users and coaches are kept between runs.
+    Raises ValueError when the file or a job is invalid.
+    """
+    try:
+        with open(schedule_file, 'r') as schedule:
+            settings = json.load(schedule)
+    except OSError as error:
+        raise ValueError(f'Unable to read {schedule_file}: {error}') from error
+
+    jobs = []
+    for item in settings.get('jobs', []):
+        command = item.get('command')
+        if command not in commands:
+            raise ValueError(f'Job command, {command} is invalid')
+        try:
+            jobs.append(Job(item.get('name', command), command, item.get('args'),
+                            item.get('every'), item.get('at'), item.get('days')))
+        except TypeError as error:
+            raise ValueError(f'Job {item.get("name", command)} is invalid: {error}') from error
+
+    names = [job.name for job in jobs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f'Job names must be unique: {", ".join(duplicates)}')
+    if not jobs:
+        raise ValueError(f'No jobs found in {schedule_file}')
+
+    try:
+        refresh = int(settings.get('refresh', DEFAULT_REFRESH))
+    except (TypeError, ValueError) as error:
+        raise ValueError(f'Schedule "refresh" is invalid: {error}') from error
+    if refresh <= 0:
+        raise ValueError('Schedule "refresh" must be a positive number of seconds')
+
+    return jobs, refresh
@@ -0,0 +1,134 @@
+from os import (makedirs, path, replace)
+from concurrent.futures import (ProcessPoolExecutor, as_completed)
+from zipfile import (ZipFile, ZIP_DEFLATED)
+import json
+import logging
+
+from helpers.helpers import (get_content_hash, get_jinja_environment)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = 'score_sheet.html.jinja'
+MANIFEST_FILE = 'manifest.json'
+
+
+def get_sheet_name(game) -> str:
+    return f"score_sheet_{game['id']}"
+
+def get_sheet_files(name, pdf=False) -> list:
+    return [f'{name}.html'] + ([f'{name}.pdf'] if pdf else [])
+
+def write_file(file_name, content) -> None:
+    temp_file = f'{file_name}.tmp'
+    with open(temp_file, 'wb') as output:
+        output.write(content)
+    replace(temp_file, file_name)
+
+def render_sheet(sheet_dir, name, game, pdf=False) -> str:
+    """
+    Renders one game's score sheet to html, and pdf when asked. Runs in a
+    worker process, so it only takes and returns plain values.
+    """
+    html = get_jinja_environment().get_template(TEMPLATE_NAME).render(game)
+    write_file(path.join(sheet_dir, f'{name}.html'), html.encode('utf-8'))
+    if pdf:
+        from weasyprint import HTML
+
+        write_file(path.join(sheet_dir, f'{name}.pdf'), HTML(string=html).write_pdf())
+    return name
+
+
+class ScoreSheetGenerator:
+    """
+    Renders a score sheet per game across a pool of processes. The
+    manifest in the sheet directory keeps the content hash of each sheet,
+    made of the template and the game, so sheets whose game and template
+    haven't changed since the last run aren't rendered again.
+    """
+    def __init__(self, sheet_dir, workers=None, pdf=False) -> None:
+        self.sheet_dir = sheet_dir
+        self.workers = workers
+        self.pdf = pdf
+        self.manifest_file = path.join(sheet_dir, MANIFEST_FILE)
+        self.manifest = {}
+
+    def load_manifest(self) -> None:
+        try:
+            with open(self.manifest_file, 'r') as manifest:
+                self.manifest = json.load(manifest)
+        except FileNotFoundError:
+            self.manifest = {}
+        except ValueError:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_file}")
+            self.manifest = {}
+
+    def save_manifest(self) -> None:
+        write_file(self.manifest_file,
+                   json.dumps(self.manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    def get_template_source(self) -> str:
+        jinja_env = get_jinja_environment()
+        return jinja_env.loader.get_source(jinja_env, TEMPLATE_NAME)[0]
+
+    def is_current(self, name, content_hash) -> bool:
+        entry = self.manifest.get(name)
+        return entry is not None and entry['hash'] == content_hash and \
+            all(path.isfile(path.join(self.sheet_dir, file_name))
+                for file_name in get_sheet_files(name, self.pdf))
+
+    def generate(self, games):
+        """
+        Renders the games' sheets that changed. Returns the names of the
+        games' current sheets and the number rendered and failed.
+        """
+        makedirs(self.sheet_dir, exist_ok=True)
+        self.load_manifest()
+        template_source = self.get_template_source()
+
+        names = []
+        pending = {}
+        for game in games:
+            name = get_sheet_name(game)
+            content_hash = get_content_hash(TEMPLATE_NAME, [template_source, game])
+            names.append(name)
+            if not self.is_current(name, content_hash):
+                pending[name] = (game, content_hash)
+
+        rendered = 0
+        failed = set()
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(render_sheet, self.sheet_dir, name, game,
+                                           self.pdf): name
+                           for name, (game, _) in pending.items()}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                    except Exception as error:
+                        logger.error(f"Score sheet {name} not rendered: {error}")
+                        self.manifest.pop(name, None)
+                        failed.add(name)
+                        continue
+                    self.manifest[name] = {
+                        'hash': pending[name][1],
+                        'files': get_sheet_files(name, self.pdf)
+                    }
+                    rendered += 1
+            self.save_manifest()
+
+        return [name for name in names if name not in failed], rendered, len(failed)
+
+    def bundle(self, archive_file, names) -> None:
+        """
+        Zips the named sheets, in name order, into one archive.
+        """
+        archive_dir = path.dirname(archive_file)
+        if archive_dir:
+            makedirs(archive_dir, exist_ok=True)
+        temp_file = f'{archive_file}.tmp'
+        with ZipFile(temp_file, 'w', ZIP_DEFLATED) as archive:
+            for name in sorted(names):
+                for file_name in get_sheet_files(name, self.pdf):
+                    archive.write(path.join(self.sheet_dir, file_name), file_name)
+        replace(temp_file, archive_file)
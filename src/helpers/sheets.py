@@ -0,0 +1,128 @@
+from functools import lru_cache
+import logging
+import pkgutil
+
+from google import auth
+from googleapiclient.discovery import (build, build_from_document)
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+
+def build_service(service_name, version, credentials):
+    """
+    Builds a Google API client from the discovery document shipped with
+    googleapiclient. The document is read with pkgutil so it's also found
+    when running from the zipapp, where it isn't a file on disk.
+    """
+    try:
+        document = pkgutil.get_data('googleapiclient.discovery_cache',
+                                    f'documents/{service_name}.{version}.json')
+    except OSError:
+        document = None
+    # None when the loader can't read package data
+    if document is None:
+        return build(service_name, version, credentials=credentials,
+                     cache_discovery=False)
+    return build_from_document(document.decode('utf-8'), credentials=credentials)
+
+def build_sheets_service(credentials):
+    return build_service('sheets', 'v4', credentials)
+
+def build_drive_service(credentials):
+    return build_service('drive', 'v3', credentials)
+
+@lru_cache(maxsize=None)
+def get_credentials():
+    credentials, _ = auth.default()
+    return credentials
+
+@lru_cache(maxsize=None)
+def get_sheets_service():
+    return build_sheets_service(get_credentials())
+
+@lru_cache(maxsize=None)
+def get_drive_service():
+    return build_drive_service(get_credentials())
+
+def split_ranges(sheet_range) -> list:
+    """
+    SPREADSHEET_RANGE can list several ranges, one per tab, separated by
+    semicolons, e.g. "Grade 5/6!A:D;Grade 7/8!A:D".
+    """
+    return [item.strip() for item in sheet_range.split(';') if item.strip()]
+
+def get_modified_time(service, file_id) -> str:
+    """
+    Returns the time the spreadsheet was last changed, from its Drive
+    metadata, without downloading any of its cells.
+    """
+    result = service.files().get(fileId=file_id, fields='modifiedTime',
+                                 supportsAllDrives=True).execute()
+    return result['modifiedTime']
+
+def rows_to_dict(rows):
+    result = {}
+
+    for row in rows:
+        current_level = result
+        for key in row[:-2]:
+            current_level = current_level.setdefault(key, {})
+        current_level[row[-2]] = row[-1]
+
+    return result
+
+def get_coach_rows(sheet_values) -> list:
+    return [row for row in sheet_values if row and 'grade' in row[0].lower()]
+
+class SheetsReader:
+    """
+    Reads several ranges of a spreadsheet with a single batchGet request.
+    The Sheets client is built once per process and shared by every
+    reader unless a service is passed in.
+    """
+    def __init__(self, service=None) -> None:
+        self._service = service
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = get_sheets_service()
+        return self._service
+
+    def read_ranges(self, sheet_id, sheet_ranges) -> dict:
+        """
+        Returns the rows of each range, keyed by the range as requested.
+        The response lists the ranges in request order, named in A1
+        notation, so they're matched by position.
+        """
+        sheet_ranges = list(sheet_ranges)
+        if not sheet_ranges:
+            return {}
+        result = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=sheet_id, ranges=sheet_ranges).execute()
+        value_ranges = result.get('valueRanges', [])
+        rows = {sheet_range: value_range.get('values', [])
+                for sheet_range, value_range in zip(sheet_ranges, value_ranges)}
+        logger.info(f"{sum(len(values) for values in rows.values())} rows retrieved"
+                    f" from {len(rows)} range(s)")
+        return rows
+
+    def read_coach_rows(self, sheet_id, sheet_ranges) -> dict:
+        return {sheet_range: get_coach_rows(values) for sheet_range, values
+                in self.read_ranges(sheet_id, sheet_ranges).items()}
+
+    def read_coaches(self, sheet_id, sheet_range) -> dict:
+        rows = []
+        for coach_rows in self.read_coach_rows(sheet_id,
+                                               split_ranges(sheet_range)).values():
+            rows.extend(coach_rows)
+        return rows_to_dict(rows)
+
+
+def get_coach_information(spreadsheet_id, sheet_range) -> dict:
+    try:
+        return SheetsReader().read_coaches(spreadsheet_id, sheet_range)
+    except HttpError as error:
+        logger.error(f"An error occurred: {error}")
+    return {}
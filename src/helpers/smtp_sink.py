@@ -0,0 +1,131 @@
+from socket import (IPPROTO_TCP, TCP_NODELAY)
+from socketserver import (StreamRequestHandler, ThreadingTCPServer)
+from threading import (Lock, Thread)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPSinkStats:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.connections = 0
+        self.handshakes = 0
+        self.logins = 0
+        self.messages = 0
+        self.recipients = 0
+        self.bytes = 0
+
+    def increment(self, name, value=1) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'connections': self.connections,
+                'handshakes': self.handshakes,
+                'logins': self.logins,
+                'messages': self.messages,
+                'recipients': self.recipients,
+                'bytes': self.bytes
+            }
+
+
+class SMTPSinkHandler(StreamRequestHandler):
+    """
+    Speaks just enough SMTP for smtplib to deliver a message. Every
+    message is accepted and discarded, only the counters are kept.
+    """
+    def reply(self, *lines):
+        self.wfile.write(''.join(f'{line}\r\n' for line in lines).encode('ascii'))
+
+    def read_data(self):
+        size = 0
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                return size
+            size += len(line)
+
+    def handle(self):
+        stats = self.server.stats
+        stats.increment('connections')
+        self.connection.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        self.reply('220 localhost SMTP sink ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', errors='replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb == 'EHLO':
+                stats.increment('handshakes')
+                self.reply('250-localhost', '250-AUTH PLAIN LOGIN',
+                           '250 8BITMIME')
+            elif verb == 'HELO':
+                stats.increment('handshakes')
+                self.reply('250 localhost')
+            elif verb == 'AUTH':
+                self.authenticate(command)
+            elif verb in ('MAIL', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                stats.increment('recipients')
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                stats.increment('bytes', self.read_data())
+                stats.increment('messages')
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def authenticate(self, command):
+        parts = command.split(' ')
+        mechanism = parts[1].upper() if len(parts) > 1 else ''
+        if mechanism == 'PLAIN' and len(parts) == 2:
+            self.reply('334 ')
+            self.rfile.readline()
+        elif mechanism == 'LOGIN':
+            if len(parts) == 2:
+                self.reply('334 VXNlcm5hbWU6')
+                self.rfile.readline()
+            self.reply('334 UGFzc3dvcmQ6')
+            self.rfile.readline()
+        self.server.stats.increment('logins')
+        self.reply('235 Authentication successful')
+
+
+class SMTPSink(ThreadingTCPServer):
+    """
+    Local SMTP server that accepts and discards every message. Used to
+    measure email throughput without a network connection.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0) -> None:
+        super().__init__((host, port), SMTPSinkHandler)
+        self.stats = SMTPSinkStats()
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self.thread = Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        logger.debug(f'SMTP sink listening on port {self.port}')
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread:
+            self.thread.join()
@@ -0,0 +1,118 @@
+from concurrent.futures import (FIRST_COMPLETED, ThreadPoolExecutor, wait)
+from time import perf_counter
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Stage:
+    def __init__(self, name, func, requires=()) -> None:
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+class StageExecutor:
+    """
+    Runs stages in threads as soon as the stages they require have
+    completed. Each stage is called with the results of the stages it
+    requires, in the order they're listed. When a stage raises, no new
+    stages are started, the running ones are waited for, and the exception
+    is raised again.
+
+    After a run, each stage's time and the critical path, the chain of
+    stages that decided the wall time, are logged.
+    """
+    def __init__(self, max_workers=None) -> None:
+        self.max_workers = max_workers
+        self.stages = {}
+        self.results = {}
+        self.wall_time = 0.0
+
+    def add(self, name, func, requires=()) -> None:
+        if name in self.stages:
+            raise ValueError(f'Stage {name} already added')
+        for required in requires:
+            if required not in self.stages:
+                raise ValueError(f'Stage {name} requires unknown stage {required}')
+        self.stages[name] = Stage(name, func, requires)
+
+    def run_stage(self, stage):
+        stage.started = perf_counter()
+        try:
+            return stage.func(*(self.results[required] for required in stage.requires))
+        finally:
+            stage.finished = perf_counter()
+
+    def run(self) -> dict:
+        self.results = {}
+        waiting = dict(self.stages)
+        running = {}
+        error = None
+        start = perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='stage') as executor:
+            while waiting or running:
+                if error is None:
+                    for name, stage in list(waiting.items()):
+                        if all(required in self.results for required in stage.requires):
+                            running[executor.submit(self.run_stage, stage)] = name
+                            del waiting[name]
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as stage_error:
+                        logger.error(f"Stage {name} failed: {stage_error}")
+                        if error is None:
+                            error = stage_error
+
+        self.wall_time = perf_counter() - start
+        self.log_timings()
+        if error is not None:
+            raise error
+        return self.results
+
+    def get_critical_path(self) -> list:
+        """
+        Returns the names of the stages on the longest chain of stage
+        times through the dependencies, first stage first.
+        """
+        lengths = {}
+        previous = {}
+        for name, stage in self.stages.items():
+            longest = max(stage.requires, key=lambda required: lengths[required],
+                          default=None)
+            previous[name] = longest
+            lengths[name] = stage.duration + (lengths[longest] if longest else 0.0)
+
+        if not lengths:
+            return []
+        name = max(lengths, key=lengths.get)
+        path = []
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1]
+
+    def log_timings(self) -> None:
+        for stage in self.stages.values():
+            if stage.finished is not None:
+                logger.info(f"Stage {stage.name} took {stage.duration:.3f}s")
+        critical_path = self.get_critical_path()
+        critical_time = sum(self.stages[name].duration for name in critical_path)
+        logger.info(f"Critical path {' -> '.join(critical_path)}: {critical_time:.3f}s"
+                    f" of {self.wall_time:.3f}s wall time")
@@ -0,0 +1,129 @@
+from os import (environ, path)
+from sys import (argv, executable, exit, stdout)
+import logging
+import subprocess
+from getopt import (getopt, GetoptError)
+
+ENTRY_POINTS = ['availability', 'email_benchmark', 'flush_outbox', 'game_report',
+                'missing_game_reports', 'score_sheet']
+ENTRY_POINT = "entry_point"
+RUNS = "runs"
+TOP = "top"
+
+log_level = environ.get('LOG_LEVEL', logging.WARNING)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        ENTRY_POINT: None, RUNS: 5, TOP: 5
+    }
+
+    rc = 0
+    USAGE='USAGE: import_benchmark.py -e <entry point> -n <runs>' \
+    ' -t <slowest imports listed>'
+
+    try:
+        opts, args = getopt(args,"he:n:t:",
+                            ["entry-point=","runs=","top="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-e", "--entry-point"):
+            arguments[ENTRY_POINT] = arg
+        elif opt in ("-n", "--runs"):
+            arguments[RUNS] = arg
+        elif opt in ("-t", "--top"):
+            arguments[TOP] = arg
+
+    for key in (RUNS, TOP):
+        try:
+            arguments[key] = int(arguments[key])
+        except ValueError:
+            logger.error(f"{key.capitalize()} value, {arguments[key]} is invalid")
+            rc = 88
+
+    if arguments[ENTRY_POINT] and arguments[ENTRY_POINT] not in ENTRY_POINTS:
+        logger.error(f"Entry point value, {arguments[ENTRY_POINT]} is invalid")
+        rc = 88
+
+    return rc, arguments
+
+def parse_import_times(output):
+    """
+    Parses the `python -X importtime` report. Returns a dictionary of top
+    level module name to its cumulative import time in microseconds and
+    the cumulative time of each module it imported directly.
+    """
+    results = {}
+    imports = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            results[name.strip()] = {'cumulative': int(cumulative),
+                                     'imports': imports}
+            imports = {}
+        elif depth == 1:
+            imports[name.strip()] = int(cumulative)
+    return results
+
+def measure_imports(entry_point):
+    result = subprocess.run(
+        [executable, '-X', 'importtime', '-c', f'import {entry_point}'],
+        cwd=path.dirname(path.realpath(__file__)), capture_output=True,
+        text=True, check=False)
+    if result.returncode:
+        logger.error(f"Failed to import {entry_point}: {result.stderr.splitlines()[-1:]}")
+        return None
+    return parse_import_times(result.stderr)
+
+def run_benchmark(entry_point, runs):
+    """
+    Imports the entry point in a fresh interpreter `runs` times and returns
+    the fastest run, which is the least affected by a cold file cache.
+    """
+    best = None
+    for _ in range(runs):
+        import_times = measure_imports(entry_point)
+        if import_times is None:
+            return None
+        if entry_point not in import_times:
+            logger.error(f"{entry_point} not found in the import time report")
+            return None
+        if best is None or \
+            import_times[entry_point]['cumulative'] < best['cumulative']:
+            best = import_times[entry_point]
+    return best
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    entry_points = [args[ENTRY_POINT]] if args[ENTRY_POINT] else ENTRY_POINTS
+    for entry_point in entry_points:
+        import_time = run_benchmark(entry_point, args[RUNS])
+        if import_time is None:
+            continue
+        print(f"{entry_point + ':':24} {import_time['cumulative'] / 1000:8.1f} ms")
+        slowest = sorted(import_time['imports'].items(),
+                         key=lambda item: item[1], reverse=True)
+        for name, cumulative in slowest[:args[TOP]]:
+            print(f"    {name:20} {cumulative / 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
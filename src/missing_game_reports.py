@@ -4,17 +4,21 @@ import logging
 from dotenv import load_dotenv
 from getopt import (getopt, GetoptError)
 from datetime import (datetime, timedelta)
+from functools import partial
 
-from assignr.assignr import Assignr
-from helpers.helpers import (get_environment_vars, get_email_vars,
-                             create_message, get_center_referee_info,
-                             get_assignor_information)
+from helpers.checkpoint import get_run_id
+from helpers.context import RunContext
+from helpers.helpers import get_center_referee_info
 from helpers.email import EMailClient
+from helpers.outbox import get_idempotency_key
+from helpers.report_message import build_report_message
 from helpers import constants
 
 START_DATE = "start_date"
 END_DATE = "end_date"
 REFEREE_REMINDER = "referee_reminder"
+REFEREE_DIGEST = "referee_digest"
+RESUME = "resume"
 
 env_file = environ.get('ENV_FILE', '.env')
 load_dotenv(env_file)
@@ -29,16 +33,17 @@ logger = logging.getLogger(__name__)
 
 def get_arguments(args):
     arguments = {
-        START_DATE: None, END_DATE: None, REFEREE_REMINDER: False
+        START_DATE: None, END_DATE: None, REFEREE_REMINDER: False,
+        REFEREE_DIGEST: False, RESUME: False
     }
 
     rc = 0
     USAGE='USAGE: missing_game_reports.py -s <start-date> -e <end-date>' \
-    ' DATE FORMAT=MM/DD/YYYY -r'
+    ' DATE FORMAT=MM/DD/YYYY -r -d --resume'
 
     try:
-        opts, args = getopt(args,"hrs:e:",
-                            ["start-date=","end-date="])
+        opts, args = getopt(args,"hrds:e:",
+                            ["start-date=","end-date=","resume"])
     except GetoptError:
         logger.error(USAGE)
         return 77, arguments
@@ -49,10 +54,15 @@ def get_arguments(args):
             return 99, arguments
         elif opt == '-r':
             arguments[REFEREE_REMINDER] = True
+        elif opt == '-d':
+            arguments[REFEREE_REMINDER] = True
+            arguments[REFEREE_DIGEST] = True
         elif opt in ("-s", "--start-date"):
             arguments[START_DATE] = arg
         elif opt in ("-e", "--end-date"):
             arguments[END_DATE] = arg
+        elif opt == "--resume":
+            arguments[RESUME] = True
 
     try:
         if arguments[END_DATE]:
@@ -86,61 +96,87 @@ def get_arguments(args):
 
     return rc, arguments
 
-def send_email(email_vars, subject, message, send_to):
+def send_email(email_vars, subject, message, send_to, text=None,
+               attachments=None):
     email_client = EMailClient(
         email_vars[constants.EMAIL_SERVER], email_vars[constants.EMAIL_PORT],
         email_vars[constants.EMAIL_USERNAME], 'Game Report',
         email_vars[constants.EMAIL_PASSWORD])
 
     return email_client.send_email(subject, message,
-                                   send_to, True)
+                                   send_to, True, text, attachments)
 
-def send_referee_reminder(game, email_vars, subject):
+def send_referee_reminder(game, outbox, subject, key):
     center_referee = get_center_referee_info(game['referees'])
     assignor_addresses = game['assignor']['email_addresses']
     email_addresses = ",".join(center_referee['email_addresses'] + assignor_addresses)
-    message = create_message(game, 'missing_referee_report.html.jinja')
-
-    response = send_email(email_vars, subject, message,
-                          email_addresses)
-    if response:
-        logger.error(response)
-    else:
-        logger.info(f'Sent an email to {game['league']}')
-
-def main():
-    logger.info("Starting Missing Game Report")
-    rc, args = get_arguments(argv[1:])
+    report = build_report_message(game, 'missing_referee_report.html.jinja')
+
+    if outbox.add(key, subject, send_to=email_addresses, **report):
+        logger.info(f'Queued an email to {game["league"]}')
+
+def group_games_by_recipient(games):
+    groups = {}
+    for game in games:
+        center_referee = get_center_referee_info(game['referees'])
+        recipients = tuple(center_referee['email_addresses'] +
+                           game['assignor']['email_addresses'])
+        if recipients not in groups:
+            groups[recipients] = {
+                'referee': center_referee,
+                'games': []
+            }
+        groups[recipients]['games'].append(game)
+
+    return groups
+
+def send_referee_digests(games, outbox, subject, start_date, end_date):
+    groups = group_games_by_recipient(games)
+    for recipients, content in groups.items():
+        report = build_report_message(content, 'missing_referee_digest.html.jinja')
+        game_ids = '-'.join(str(game['id']) for game in content['games'])
+        outbox.add(get_idempotency_key('referee_digest', start_date,
+                                       end_date, game_ids),
+                   subject, send_to=','.join(recipients), **report)
+
+    logger.info(f"Queued {len(groups)} referee digest(s) for {len(games)} game(s)")
+
+def run(args, context):
+    """
+    Runs the report with the client and outbox shared through the
+    context. Returns 0, or the return code of the missing setting.
+    """
+    rc, _ = context.get_environment_vars()
     if rc:
-        exit(rc)
+        return rc
 
-    rc, env_vars = get_environment_vars()
+    rc, email_vars = context.get_email_vars()
     if rc:
-        exit(rc)
+        return rc
 
-    rc, email_vars = get_email_vars()
+    rc, _ = context.get_assignr()
     if rc:
-        exit(rc)
-
-    assignr = Assignr(env_vars[constants.CLIENT_ID],
-                      env_vars[constants.CLIENT_SECRET],
-                      env_vars[constants.CLIENT_SCOPE],
-                      env_vars[constants.BASE_URL],
-                      env_vars[constants.AUTH_URL])
-    
-    assignors = get_assignor_information()
-    assignor_emails = []
-    for association in assignors:
-        for assignor in assignors[association]:
-            assignor_emails.append(assignor['email'])
-
-    assignr.load_referees_assignors()
-
-    games = assignr.get_game_ids(args[START_DATE],
-                                    args[END_DATE])
-    games = assignr.match_games_to_reports(args[START_DATE],
-                                    args[END_DATE], games)
-
+        return rc
+    context.start_checkpoint(get_run_id('missing_game_reports', args[START_DATE],
+                                        args[END_DATE]), args[RESUME])
+    completed = False
+    try:
+        _, assignr = context.load_users()
+        assignors = context.get_assignors()
+        assignor_emails = []
+        for association in assignors:
+            for assignor in assignors[association]:
+                assignor_emails.append(assignor['email'])
+
+        games = assignr.get_game_ids(args[START_DATE],
+                                        args[END_DATE])
+        games = assignr.match_games_to_reports(args[START_DATE],
+                                        args[END_DATE], games)
+        completed = True
+    finally:
+        context.finish_checkpoint(completed)
+
+    outbox = context.get_outbox()
     game_reports = []
     subject = f'Game Reports Needing Attention: {args[START_DATE].strftime("%m/%d/%Y")}' \
              f' - {args[END_DATE].strftime("%m/%d/%Y")}'
@@ -149,16 +185,44 @@ def main():
         if not game['cancelled'] and (game['game_report_url'] is None or \
             not game['home_roster'] or not game['away_roster']): 
             game_reports.append(game)
-            if args[REFEREE_REMINDER]:
-                send_referee_reminder(game, email_vars, subject)
+            if args[REFEREE_REMINDER] and not args[REFEREE_DIGEST]:
+                send_referee_reminder(
+                    game, outbox, subject,
+                    get_idempotency_key('referee_reminder', args[START_DATE],
+                                        args[END_DATE], game['id']))
+
+    if args[REFEREE_DIGEST]:
+        send_referee_digests(game_reports, outbox, subject,
+                             args[START_DATE], args[END_DATE])
+
+    content = {
+        START_DATE: args[START_DATE],
+        END_DATE: args[END_DATE],
+        'reports': game_reports
+    }
+    report = build_report_message(content, 'missing_report.html.jinja',
+                                  'reports', 'Game Report Issues')
+
+    outbox.add(get_idempotency_key('missing_reports', args[START_DATE],
+                                   args[END_DATE]),
+               subject, send_to=email_vars[constants.ADMIN_EMAIL], **report)
 
-    content = {'reports': game_reports}
-    message = create_message(content, 'missing_report.html.jinja')
+    failed = outbox.flush(partial(send_email, email_vars))
+    if failed:
+        logger.error(f"{failed} email(s) left in the outbox, run flush_outbox.py to resend")
+    return 0
 
-    response = send_email(email_vars, subject, message,
-                          email_vars[constants.ADMIN_EMAIL])
-    if response:
-        logger.error(response)
+def main():
+    logger.info("Starting Missing Game Report")
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
     logger.info("Completed Missing Game Report")
 
 if __name__ == "__main__":
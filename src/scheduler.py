@@ -0,0 +1,299 @@
+from os import environ
+from sys import (argv, exit, stdout)
+from datetime import datetime
+from http.server import (BaseHTTPRequestHandler, ThreadingHTTPServer)
+from importlib import import_module
+from threading import (Event, Thread)
+from time import perf_counter
+import json
+import logging
+import signal
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+
+from assignr_tools import COMMANDS
+from helpers.context import RunContext
+from helpers.schedule import load_schedule
+
+SCHEDULE_FILE = "schedule_file"
+PORT = "port"
+DEFAULT_PORT = 8089
+SCHEDULED_COMMANDS = ('availability', 'conflict_report', 'flush_outbox',
+                      'game_report', 'missing_game_reports', 'score_sheet')
+
+env_file = environ.get('ENV_FILE', '.env')
+load_dotenv(env_file)
+
+log_level = environ.get('LOG_LEVEL', logging.INFO)
+logging.basicConfig(stream=stdout,
+                    format='%(asctime)s %(levelname)s %(message)s',
+                    level=int(log_level),
+                    datefmt='%Y-%m-%d %H:%M:%S')
+logger = logging.getLogger(__name__)
+
+
+def get_arguments(args):
+    arguments = {
+        SCHEDULE_FILE: 'schedule.json', PORT: DEFAULT_PORT
+    }
+
+    rc = 0
+    USAGE='USAGE: scheduler.py -c <schedule file> -p <health port, 0 to disable>'
+
+    try:
+        opts, args = getopt(args,"hc:p:",
+                            ["schedule=","port="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-c", "--schedule"):
+            arguments[SCHEDULE_FILE] = arg
+        elif opt in ("-p", "--port"):
+            arguments[PORT] = arg
+
+    try:
+        arguments[PORT] = int(arguments[PORT])
+    except ValueError:
+        logger.error(f"Port value, {arguments[PORT]} is invalid")
+        rc = 88
+
+    return rc, arguments
+
+
+class Scheduler:
+    """
+    Runs the scheduled commands one at a time in this process. The
+    RunContext is kept between runs, so the Assignr token, site id and
+    users, the coach index and the compiled templates stay loaded. The
+    Assignr responses are cleared before each run, and the whole context is
+    reloaded once it's older than the schedule's refresh seconds.
+
+    SIGHUP reloads the .env file and the schedule. SIGTERM and SIGINT stop
+    the scheduler once the running command completes.
+    """
+    def __init__(self, schedule_file, context=None, clock=datetime.now) -> None:
+        self.schedule_file = schedule_file
+        self.context = context if context is not None else RunContext()
+        self.clock = clock
+        self.started_at = clock()
+        self.jobs = []
+        self.refresh = None
+        self.next_runs = {}
+        self.metrics = {}
+        self.wake = Event()
+        self.stopping = False
+        self.reload_requested = False
+
+    def load(self) -> int:
+        try:
+            jobs, refresh = load_schedule(self.schedule_file, SCHEDULED_COMMANDS)
+        except ValueError as error:
+            logger.error(f"Schedule not loaded: {error}")
+            return 88
+
+        now = self.clock()
+        self.jobs = jobs
+        self.refresh = refresh
+        self.next_runs = {job.name: job.next_run(now) for job in jobs}
+        for job in jobs:
+            self.metrics.setdefault(job.name, {
+                'runs': 0, 'failures': 0, 'last_rc': None,
+                'last_run': None, 'last_duration': 0.0
+            })
+            logger.info(f"{job.name} next runs at {self.next_runs[job.name]}")
+        return 0
+
+    def reload(self) -> None:
+        self.reload_requested = False
+        load_dotenv(env_file, override=True)
+        if self.load():
+            logger.error("Keeping the previous schedule")
+            return
+        self.reset_context()
+        logger.info(f"Reloaded schedule, {len(self.jobs)} job(s)")
+
+    def reset_context(self) -> None:
+        from helpers.helpers import get_jinja_environment
+
+        self.context.close()
+        self.context.reset()
+        get_jinja_environment.cache_clear()
+
+    def request_reload(self, *_) -> None:
+        self.reload_requested = True
+        self.wake.set()
+
+    def request_stop(self, *_) -> None:
+        self.stopping = True
+        self.wake.set()
+
+    def run_job(self, job) -> int:
+        module = import_module(COMMANDS[job.command])
+        rc, args = module.get_arguments(job.args)
+        if not rc:
+            if (self.clock() - self.context.created_at).total_seconds() > self.refresh:
+                logger.info("Reloading settings, token, users and coaches")
+                self.reset_context()
+            self.context.clear()
+            logger.info(f"Running {job.name}")
+            start = perf_counter()
+            try:
+                rc = module.run(args, self.context)
+            except Exception:
+                logger.exception(f"{job.name} raised an exception")
+                rc = 1
+            duration = perf_counter() - start
+        else:
+            duration = 0.0
+
+        metrics = self.metrics[job.name]
+        metrics['runs'] += 1
+        metrics['last_rc'] = rc
+        metrics['last_run'] = self.clock()
+        metrics['last_duration'] = duration
+        if rc:
+            metrics['failures'] += 1
+            logger.error(f"{job.name} failed with return code {rc}")
+        return rc
+
+    def run_pending(self) -> None:
+        due = sorted((run_at, job.name, job) for job in self.jobs
+                     if (run_at := self.next_runs[job.name]) <= self.clock())
+        for _, name, job in due:
+            if self.stopping or self.reload_requested:
+                return
+            self.run_job(job)
+            self.next_runs[name] = job.next_run(self.clock())
+            logger.info(f"{name} next runs at {self.next_runs[name]}")
+
+    def seconds_until_next_run(self) -> float:
+        if not self.next_runs:
+            return 60.0
+        next_run = min(self.next_runs.values())
+        return max((next_run - self.clock()).total_seconds(), 0.0)
+
+    def run_forever(self) -> None:
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload()
+            self.run_pending()
+            self.wake.wait(self.seconds_until_next_run())
+            self.wake.clear()
+        self.context.close()
+        logger.info("Scheduler stopped")
+
+    def get_health(self) -> dict:
+        return {
+            'status': 'stopping' if self.stopping else 'ok',
+            'started_at': self.started_at.isoformat(),
+            'uptime_seconds': round((self.clock() - self.started_at).total_seconds()),
+            'jobs': {
+                job.name: {
+                    'next_run': self.next_runs[job.name].isoformat(),
+                    'last_run': self.metrics[job.name]['last_run'].isoformat()
+                        if self.metrics[job.name]['last_run'] else None,
+                    'last_rc': self.metrics[job.name]['last_rc']
+                } for job in self.jobs
+            }
+        }
+
+    def get_metrics(self) -> str:
+        """
+        Returns the metrics in the Prometheus text format.
+        """
+        lines = [
+            '# TYPE assignr_scheduler_uptime_seconds gauge',
+            f'assignr_scheduler_uptime_seconds {(self.clock() - self.started_at).total_seconds():.0f}'
+        ]
+        series = (
+            ('assignr_job_runs_total', 'counter', lambda job, metrics: metrics['runs']),
+            ('assignr_job_failures_total', 'counter', lambda job, metrics: metrics['failures']),
+            ('assignr_job_last_duration_seconds', 'gauge',
+             lambda job, metrics: f"{metrics['last_duration']:.3f}"),
+            ('assignr_job_last_return_code', 'gauge',
+             lambda job, metrics: metrics['last_rc'] if metrics['last_rc'] is not None else 'NaN'),
+            ('assignr_job_next_run_timestamp_seconds', 'gauge',
+             lambda job, metrics: f"{self.next_runs[job.name].timestamp():.0f}")
+        )
+        for name, metric_type, value in series:
+            lines.append(f'# TYPE {name} {metric_type}')
+            for job in self.jobs:
+                lines.append(f'{name}{{job="{job.name}"}} {value(job, self.metrics[job.name])}')
+        return '\n'.join(lines) + '\n'
+
+
+def get_health_handler(scheduler):
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                body = json.dumps(scheduler.get_health()).encode('utf-8')
+                content_type = 'application/json'
+                status = 503 if scheduler.stopping else 200
+            elif self.path == '/metrics':
+                body = scheduler.get_metrics().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4'
+                status = 200
+            else:
+                self.send_error(404)
+                return
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return HealthHandler
+
+def start_health_server(scheduler, port):
+    """
+    Serves /health and /metrics on localhost from a background thread.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), get_health_handler(scheduler))
+    Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Health and metrics on http://127.0.0.1:{server.server_address[1]}")
+    return server
+
+def run(args, context):
+    scheduler = Scheduler(args[SCHEDULE_FILE], context)
+    rc = scheduler.load()
+    if rc:
+        return rc
+
+    server = None
+    if args[PORT]:
+        try:
+            server = start_health_server(scheduler, args[PORT])
+        except OSError as error:
+            logger.error(f"Unable to serve health on port {args[PORT]}: {error}")
+            return 88
+
+    signal.signal(signal.SIGHUP, scheduler.request_reload)
+    signal.signal(signal.SIGTERM, scheduler.request_stop)
+    signal.signal(signal.SIGINT, scheduler.request_stop)
+    scheduler.run_forever()
+    if server:
+        server.shutdown()
+    return 0
+
+def main():
+    logger.info("Starting Scheduler")
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
-from os import environ
+from os import (environ, path)
+from importlib.util import find_spec
 from sys import (argv, exit, stdout)
 import logging
 import csv
 from dotenv import load_dotenv
 from getopt import (getopt, GetoptError)
 from datetime import datetime
-from assignr.assignr import Assignr
-from helpers.helpers import get_environment_vars
+from helpers.context import RunContext
+from helpers.exporters import (CSV, GAME_FIELDS, check_export_arguments,
+                               get_exporter, get_game_row, log_to_stderr)
 
 load_dotenv()
 
@@ -18,16 +20,20 @@ logger = logging.getLogger(__name__)
 def get_arguments(args):
     arguments = {
         'start_date': None, 'end_date': None, 
-        'game_type': None
+        'game_type': None, 'format': CSV, 'output': None,
+        'sheet_dir': None, 'archive': None, 'workers': None, 'pdf': False
     }
 
     rc = 0
     USAGE='USAGE: score_sheet.py -s <start-date> (MM/DD/YYYY) '\
-        '-e <end-date> (MM/DD/YYYY) -g <game type, default "Futsal">' 
+        '-e <end-date> (MM/DD/YYYY) -g <game type, default "Futsal">' \
+        ' -f <csv|ndjson|parquet> -o <output file>' \
+        ' -d <score sheet directory> -z <archive> -j <workers> -p'
     try:
-        opts, args = getopt(args,"hs:e:g:",
+        opts, args = getopt(args,"hs:e:g:f:o:d:z:j:p",
                             ["start-date=","end-date=",
-                             "game-type="])
+                             "game-type=","format=","output=",
+                             "sheet-dir=","archive=","workers=","pdf"])
     except GetoptError:
         logger.error(USAGE)
         return 77, arguments
@@ -42,6 +48,18 @@ def get_arguments(args):
             arguments['end_date'] = arg
         elif opt in ("-g", "--game-type"):
             arguments['game_type'] = arg
+        elif opt in ("-f", "--format"):
+            arguments['format'] = arg
+        elif opt in ("-o", "--output"):
+            arguments['output'] = arg
+        elif opt in ("-d", "--sheet-dir"):
+            arguments['sheet_dir'] = arg
+        elif opt in ("-z", "--archive"):
+            arguments['archive'] = arg
+        elif opt in ("-j", "--workers"):
+            arguments['workers'] = arg
+        elif opt in ("-p", "--pdf"):
+            arguments['pdf'] = True
     if arguments['start_date'] is None or arguments['end_date'] is None:
         logger.error(USAGE)
         return 99, arguments
@@ -64,25 +82,84 @@ def get_arguments(args):
         arguments['game_type'] = 'Futsal'
         logger.info('Game Type not provided, defaulting to "Futsal"')
 
+    error = check_export_arguments(arguments['format'], arguments['output'])
+    if error:
+        logger.error(error)
+        rc = 88
+
+    if arguments['workers'] is not None:
+        try:
+            arguments['workers'] = int(arguments['workers'])
+            if arguments['workers'] < 1:
+                raise ValueError
+        except ValueError:
+            logger.error(f"Workers value, {arguments['workers']} is invalid")
+            rc = 88
+
+    if arguments['pdf'] and find_spec('weasyprint') is None:
+        logger.error("PDF score sheets need weasyprint, run pip install weasyprint")
+        rc = 88
+
     return rc, arguments
 
 
+def generate_score_sheets(args, games):
+    """
+    Renders the games' score sheets and bundles them into one archive.
+    """
+    from helpers.score_sheets import ScoreSheetGenerator
+
+    generator = ScoreSheetGenerator(args['sheet_dir'], args['workers'], args['pdf'])
+    names, rendered, failed = generator.generate(games)
+    logger.info(f"{rendered} score sheet(s) rendered, "
+                f"{len(names) - rendered} unchanged")
+
+    archive = args['archive'] or path.join(
+        args['sheet_dir'],
+        f"score_sheets_{args['start_date'].isoformat()}_{args['end_date'].isoformat()}.zip")
+    generator.bundle(archive, names)
+    logger.info(f"{len(names)} score sheet(s) saved to {archive}")
+    if failed:
+        logger.error(f"{failed} score sheet(s) not rendered")
+        return 22
+    return 0
+
+def run(args, context):
+    """
+    Writes each game as its page arrives from Assignr, or renders their
+    score sheets. The users are loaded first so each game lists its
+    referees and assignor. The pages of games aren't kept by the client.
+    """
+    if not args['sheet_dir'] and not args['output']:
+        log_to_stderr()
+
+    rc, assignr = context.load_users()
+    if rc:
+        return rc
+    assignr = assignr.without_response_cache()
+
+    if args['sheet_dir']:
+        return generate_score_sheets(args, assignr.iter_league_games(
+            args['game_type'], args['start_date'], args['end_date']))
+
+    with get_exporter(args['format'], args['output'], GAME_FIELDS) as exporter:
+        for game in assignr.iter_league_games(args['game_type'], args['start_date'],
+                                              args['end_date']):
+            exporter.write(get_game_row(game))
+
+    logger.info(f"Exported {exporter.count} game(s)")
+    return 0
+
 def main():
     rc, args = get_arguments(argv[1:])
     if rc:
         exit(rc)
 
-    rc, env_vars = get_environment_vars()
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
     if rc:
         exit(rc)
 
-    assignr = Assignr(env_vars['CLIENT_ID'], env_vars['CLIENT_SECRET'],
-                      env_vars['CLIENT_SCOPE'], env_vars['BASE_URL'],
-                      env_vars['AUTH_URL'])
-
-    games = assignr.get_league_games(args['game_type'], args['start_date'],
-                                     args['end_date'])
-    print(games)
-
 if __name__ == "__main__":
     main()
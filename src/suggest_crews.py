@@ -0,0 +1,162 @@
+from os import environ
+from sys import (argv, exit, stdout)
+import logging
+from dotenv import load_dotenv
+from getopt import (getopt, GetoptError)
+from datetime import datetime
+from helpers.availability_index import (AvailabilityIndex, DEFAULT_GAME_MINUTES)
+from helpers.conflicts import (DEFAULT_TURNAROUND_MINUTES, get_venue_name)
+from helpers.context import RunContext
+from helpers.crews import (CrewSolver, DEFAULT_MAX_GAMES_PER_DAY)
+from helpers.exporters import (CREW_FIELDS, CSV, check_export_arguments,
+                               get_exporter, log_to_stderr)
+
+load_dotenv()
+
+log_level = environ.get('LOG_LEVEL', 30)
+logging.basicConfig(stream=stdout,
+                    level=int(log_level))
+logger = logging.getLogger(__name__)
+
+def get_arguments(args):
+    arguments = {
+        'start_date': None, 'end_date': None, 'game_type': 'Coastal',
+        'game_minutes': DEFAULT_GAME_MINUTES,
+        'turnaround_minutes': DEFAULT_TURNAROUND_MINUTES,
+        'max_games': DEFAULT_MAX_GAMES_PER_DAY,
+        'format': CSV, 'output': None
+    }
+
+    rc = 0
+    USAGE='USAGE: suggest_crews.py -s <start-date> -e <end-date>' \
+    ' -g <game type, default "Coastal"> -m <game minutes> -t <turnaround minutes>' \
+    ' -x <max games per day> -f <csv|ndjson|parquet> -o <output file> FORMAT=MM/DD/YYYY'
+
+    try:
+        opts, args = getopt(args,"hs:e:g:m:t:x:f:o:",
+                            ["start-date=","end-date=","game-type=",
+                             "game-minutes=","turnaround-minutes=","max-games=",
+                             "format=","output="])
+    except GetoptError:
+        logger.error(USAGE)
+        return 77, arguments
+
+    for opt, arg in opts:
+        if opt == '-h':
+            logger.error(USAGE)
+            return 99, arguments
+        elif opt in ("-s", "--start-date"):
+            arguments['start_date'] = arg
+        elif opt in ("-e", "--end-date"):
+            arguments['end_date'] = arg
+        elif opt in ("-g", "--game-type"):
+            arguments['game_type'] = arg
+        elif opt in ("-m", "--game-minutes"):
+            arguments['game_minutes'] = arg
+        elif opt in ("-t", "--turnaround-minutes"):
+            arguments['turnaround_minutes'] = arg
+        elif opt in ("-x", "--max-games"):
+            arguments['max_games'] = arg
+        elif opt in ("-f", "--format"):
+            arguments['format'] = arg
+        elif opt in ("-o", "--output"):
+            arguments['output'] = arg
+
+    if arguments['start_date'] is None or arguments['end_date'] is None:
+        logger.error(USAGE)
+        return 99, arguments
+
+    try:
+         arguments['start_date'] = datetime.strptime(arguments['start_date'], "%m/%d/%Y").date()
+    except ValueError:
+        logger.error(f"Start Date value, {arguments['start_date']} is invalid")
+        rc = 88
+    try:
+         arguments['end_date'] = datetime.strptime(arguments['end_date'], "%m/%d/%Y").date()
+    except ValueError:
+        logger.error(f"End Date value, {arguments['end_date']} is invalid")
+        rc = 88
+
+    for key, name, least in (('game_minutes', 'Game Minutes', 0),
+                             ('turnaround_minutes', 'Turnaround Minutes', 0),
+                             ('max_games', 'Max Games', 1)):
+        try:
+            arguments[key] = int(arguments[key])
+            if arguments[key] < least:
+                raise ValueError
+        except ValueError:
+            logger.error(f"{name} value, {arguments[key]} is invalid")
+            rc = 88
+
+    error = check_export_arguments(arguments['format'], arguments['output'])
+    if error:
+        logger.error(error)
+        rc = 88
+
+    return rc, arguments
+
+def get_index(assignr, start_date, end_date):
+    """
+    Indexes the availability of every official on the site.
+    """
+    index = AvailabilityIndex()
+    for referee_id in assignr.referees:
+        index.add_availability(referee_id,
+                               assignr.get_availability(referee_id, start_date, end_date))
+    return index
+
+def run(args, context):
+    """
+    Writes a proposed referee for each open position of the games, or
+    none when no available referee can take it.
+    """
+    if not args['output']:
+        log_to_stderr()
+
+    rc, assignr = context.load_users()
+    if rc:
+        return rc
+
+    games = assignr.get_game_ids(args['start_date'], args['end_date'],
+                                 args['game_type'])
+    solver = CrewSolver(get_index(assignr, args['start_date'], args['end_date']),
+                        args['game_minutes'], args['turnaround_minutes'],
+                        args['max_games'])
+    proposals = solver.solve(games.values())
+
+    filled = 0
+    with get_exporter(args['format'], args['output'], CREW_FIELDS) as exporter:
+        for proposal in proposals:
+            game = proposal['game']
+            referee = assignr.referees.get(proposal['referee_id'])
+            filled += referee is not None
+            exporter.write({
+                'id': game['id'],
+                'game_date': game['game_date'],
+                'game_time': game['game_time'],
+                'league': game['league'],
+                'home_team': game['home_team'],
+                'away_team': game['away_team'],
+                'venue': get_venue_name(game),
+                'position': proposal['position'],
+                'referee_id': proposal['referee_id'],
+                'referee': f"{referee['first_name']} {referee['last_name']}"
+                    if referee else None
+            })
+
+    logger.info(f"Proposed referees for {filled} of {exporter.count} open position(s)")
+    return 0
+
+def main():
+    rc, args = get_arguments(argv[1:])
+    if rc:
+        exit(rc)
+
+    context = RunContext()
+    rc = run(args, context)
+    context.close()
+    if rc:
+        exit(rc)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+
+class FakeRequest:
+    def __init__(self, result=None, error=None) -> None:
+        self.result = result
+        self.error = error
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class FakeSheetsService:
+    """
+    Stand-in for the Sheets and Drive clients. Holds the cells of each
+    range and the spreadsheet's modified time, and counts the calls made.
+    """
+    def __init__(self, ranges=None, modified_time='2024-09-01T12:00:00.000Z') -> None:
+        self.ranges = ranges or {}
+        self.modified_time = modified_time
+        self.error = None
+        self.calls = {'get': 0, 'batchGet': 0, 'files.get': 0}
+
+    def set_offline(self, status=503):
+        self.error = HttpError(Response({'status': status}), b'Service Unavailable')
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def files(self):
+        return FakeFiles(self)
+
+    def get(self, spreadsheetId, range):
+        self.calls['get'] += 1
+        return FakeRequest({'range': range, 'values': self.ranges.get(range, [])},
+                           self.error)
+
+    def batchGet(self, spreadsheetId, ranges):
+        self.calls['batchGet'] += 1
+        return FakeRequest({'valueRanges': [
+            {'range': sheet_range, 'values': self.ranges.get(sheet_range, [])}
+            for sheet_range in ranges]}, self.error)
+
+
+class FakeFiles:
+    def __init__(self, service) -> None:
+        self.service = service
+
+    def get(self, fileId, fields=None, supportsAllDrives=False):
+        self.service.calls['files.get'] += 1
+        return FakeRequest({'modifiedTime': self.service.modified_time},
+                           self.service.error)
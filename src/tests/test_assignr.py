@@ -168,12 +168,14 @@ class TestAssignr(TestCase):
         }
         expected_result = [
             {
+                'id': 12656,
                 'accepted': 'false',
                 'position': 'Referee',
                 'first_name': 'Mickey',
                 'last_name': 'Mouse',
                 'email_addresses': ['mickey@disney.mouse']
             }, {
+                'id': 12761,
                 'accepted': 'true',
                 'position': 'Scorekeeper',
                 'first_name': 'Homer',
@@ -423,6 +425,251 @@ class TestAssignr(TestCase):
         self.assertEqual(result, [])
 
 
+class TestResponseCache(TestCase):
+    @patch(ASSIGNR_REQUESTS)
+    def test_no_cache_by_default(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'id': 1}
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.get_requests('games', params={'page': 1})
+        temp.get_requests('games', params={'page': 1})
+        self.assertEqual(mock_requests.get.call_count, 2)
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_cached_responses_reused(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'id': 1}
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.response_cache = {}
+        self.assertEqual(temp.get_requests('games', params={'page': 1, 'limit': 50}),
+                         (200, {'id': 1}))
+        self.assertEqual(temp.get_requests('games', params={'limit': 50, 'page': 1}),
+                         (200, {'id': 1}))
+        temp.get_requests('games', params={'page': 2, 'limit': 50})
+        self.assertEqual(mock_requests.get.call_count, 2)
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_failed_responses_not_cached(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        mock_requests.get.return_value.status_code = 500
+        mock_requests.get.return_value.json.return_value = {}
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.response_cache = {}
+        temp.get_requests('games')
+        temp.get_requests('games')
+        self.assertEqual(mock_requests.get.call_count, 2)
+        self.assertEqual(temp.response_cache, {})
+
+
+class TestReauthentication(TestCase):
+    @patch(ASSIGNR_REQUESTS)
+    def test_expired_token_renewed(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        expired = MagicMock(status_code=401)
+        expired.json.return_value = {'error': 'invalid_token'}
+        valid = MagicMock(status_code=200)
+        valid.json.return_value = {'id': 1}
+        mock_requests.get.side_effect = [expired, valid]
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = 'EXPIRED'
+        with self.assertLogs(level='INFO'):
+            result = temp.get_requests('/games')
+        self.assertEqual(result, (200, {'id': 1}))
+        self.assertEqual(temp.token, ACCESS_TOKEN)
+        self.assertEqual(mock_requests.get.call_args.kwargs['headers']['authorization'],
+                         f'Bearer {ACCESS_TOKEN}')
+        self.assertEqual(mock_requests.get.call_args.args[0], f'{BASE_URL}/games')
+
+
+class TestWrites(TestCase):
+    def setUp(self):
+        self.assignr = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        self.assignr.token = ACCESS_TOKEN
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_delete_game(self, mock_requests):
+        mock_requests.delete.return_value.status_code = 204
+        mock_requests.delete.return_value.json.side_effect = ValueError
+        self.assertEqual(self.assignr.delete_game(101), (204, None))
+        self.assertTrue(mock_requests.delete.call_args.args[0].endswith('games/101'))
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_update_game_after_expired_token(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        expired = MagicMock(status_code=401)
+        expired.json.return_value = {'error': 'invalid_token'}
+        updated = MagicMock(status_code=200)
+        updated.json.return_value = {'id': 101, 'cancelled': True}
+        mock_requests.patch.side_effect = [expired, updated]
+        self.assignr.token = 'EXPIRED'
+
+        with self.assertLogs(level='INFO'):
+            result = self.assignr.update_game(101, {'cancelled': True})
+        self.assertEqual(result, (200, {'id': 101, 'cancelled': True}))
+        self.assertEqual(mock_requests.patch.call_args.kwargs['json'],
+                         {'game': {'cancelled': True}})
+        self.assertEqual(mock_requests.patch.call_args.kwargs['headers']['authorization'],
+                         f'Bearer {ACCESS_TOKEN}')
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_rate_limiter_used(self, mock_requests):
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {}
+        mock_requests.delete.return_value.status_code = 204
+        self.assignr.rate_limiter = MagicMock()
+        self.assignr.get_requests('games')
+        self.assignr.delete_game(101)
+        self.assertEqual(self.assignr.rate_limiter.acquire.call_count, 2)
+
+
+class TestSites(TestCase):
+    @patch(ASSIGNR_REQUESTS)
+    def test_get_sites(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        first = MagicMock(status_code=200)
+        first.json.return_value = {'page': {'pages': 2}, '_embedded': {'sites': [
+            {'id': 100, 'name': 'CYSL', 'time_zone': 'Eastern'}]}}
+        second = MagicMock(status_code=200)
+        second.json.return_value = {'page': {'pages': 2}, '_embedded': {'sites': [
+            {'id': 200, 'name': 'Rec', 'time_zone': 'Eastern'}]}}
+        mock_requests.get.side_effect = [first, second]
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        self.assertEqual(temp.get_sites(), [{'id': 100, 'name': 'CYSL'},
+                                            {'id': 200, 'name': 'Rec'}])
+        self.assertEqual(mock_requests.get.call_args.kwargs['params'], {'page': 2})
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_get_sites_invalid_response(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'page': {}}
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        with self.assertLogs(level='INFO') as cm:
+            self.assertEqual(temp.get_sites(), [])
+        self.assertEqual(cm.output, ['ERROR:root:Sites not found'])
+
+    @patch(ASSIGNR_REQUESTS)
+    def test_get_sites_error_code(self, mock_requests):
+        mock_requests.post.return_value = mock_auth_response
+        mock_requests.get.return_value.status_code = 500
+        mock_requests.get.return_value.json.return_value = {}
+
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        with self.assertLogs(level='INFO') as cm:
+            self.assertEqual(temp.get_sites(), [])
+        self.assertEqual(cm.output,
+                         ['ERROR:root:Response code 500 returned for get_sites'])
+
+    def test_for_site(self):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        temp.site_id = 100
+        temp.referees = {1: {'first_name': 'Homer'}}
+        temp.response_cache = {}
+        temp.session = MagicMock()
+
+        site = temp.for_site({'id': 200, 'name': 'Rec'})
+        self.assertEqual((site.site_id, site.site_name), (200, 'Rec'))
+        self.assertEqual(site.token, ACCESS_TOKEN)
+        self.assertEqual(site.referees, {})
+        self.assertIs(site.response_cache, temp.response_cache)
+        self.assertIs(site.session, temp.session)
+        self.assertEqual(temp.site_id, 100)
+
+    def test_without_response_cache(self):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        temp.response_cache = {}
+        client = temp.without_response_cache()
+        self.assertIsNone(client.response_cache)
+        self.assertEqual(client.token, ACCESS_TOKEN)
+        self.assertEqual(temp.response_cache, {})
+
+    def test_session_used(self):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        temp.session = MagicMock()
+        temp.session.get.return_value.status_code = 200
+        temp.session.get.return_value.json.return_value = {'id': 1}
+        self.assertEqual(temp.get_requests('/games'), (200, {'id': 1}))
+        self.assertEqual(temp.session.get.call_args.args[0], f'{BASE_URL}/games')
+
+
+    def test_site_reports_scoped_to_site(self):
+        def get(end_point, headers=None, params=None):
+            response = MagicMock(status_code=200)
+            if end_point.endswith('/submissions'):
+                response.json.return_value = {'page': {'pages': 1}, '_embedded': {
+                    'form_submissions': [
+                        {'id': 1, '_embedded': {'game': {'id': 10}, 'values': []}},
+                        {'id': 2, '_embedded': {'game': {'id': 20}, 'values': []}}]}}
+            else:
+                game_id = {'/sites/100/games': 10, '/sites/200/games': 20}[
+                    end_point[len(BASE_URL):]]
+                response.json.return_value = {'page': {'pages': 1},
+                                              '_embedded': {'games': [{'id': game_id}]}}
+            return response
+
+        temp = Assignr('123', '234', '345', f'{BASE_URL}/', AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        temp.response_cache = {}
+        temp.session = MagicMock()
+        temp.session.get.side_effect = get
+        sites = [temp.for_site({'id': 100, 'name': 'Rec'}),
+                 temp.for_site({'id': 200, 'name': 'Travel'})]
+
+        start_dt = datetime(2024, 9, 1).date()
+        end_dt = datetime(2024, 9, 8).date()
+        report_ids = [[item['id'] for page in site.get_report_pages(start_dt, end_dt)
+                       for item in page['_embedded']['form_submissions']]
+                      for site in sites]
+        self.assertEqual(report_ids, [[1], [2]])
+
+    def test_site_reports_skipped_without_games(self):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        site = temp.for_site({'id': 100, 'name': 'Rec'})
+        with patch.object(Assignr, 'get_requests', side_effect=[
+                (200, {'page': {'pages': 1}, '_embedded': {'form_submissions': []}}),
+                (500, {})]), self.assertLogs(level='INFO') as cm:
+            self.assertEqual(site.get_report_pages(datetime(2024, 9, 1).date(),
+                                                   datetime(2024, 9, 8).date()), [])
+        self.assertEqual(cm.output[-1], 'ERROR:root:Failed to get the games of'
+                         ' site Rec, skipping its reports')
+
+
+class TestPartitionByLeague(TestCase):
+    def test_partition_by_league(self):
+        def submission(report_id, league):
+            return {'id': report_id, '_embedded': {'values': [
+                {'key': '.homeTeam', 'value': 'Springfield-1'},
+                {'key': '.league', 'value': league}]}}
+
+        pages = [{'_embedded': {'form_submissions': [submission(1, 'Springfield'),
+                                                     submission(2, 'Ogdenville')]}},
+                 {'_embedded': {'form_submissions': [submission(3, 'Springfield')]}}]
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        result = temp.partition_by_league(pages)
+        self.assertEqual(list(result), ['Springfield', 'Ogdenville'])
+        self.assertEqual([item['id'] for item in result['Springfield']], [1, 3])
+
+    def test_partition_by_league_key_error(self):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        with self.assertLogs(level='INFO') as cm:
+            result = temp.partition_by_league([{'page': {}}])
+        self.assertEqual(result, {})
+        self.assertEqual(cm.output,
+                         ["ERROR:root:Key: '_embedded', missing from Game Report response"])
+
+
 class TestGetGameIds(TestCase):
 
     def setUp(self):
@@ -560,19 +807,31 @@ class TestGameInformation(TestCase):
             'game_type': 'Friendly',
             'cancelled': False,
             'referees': [
-                {'accepted': True, 'position': 'Referee',
+                {'id': 12656, 'accepted': True, 'position': 'Referee',
                  'first_name': 'Mickey', 'last_name': 'Mouse',
                  'email_addresses': ['mickey@disney.mouse']},
-                {'accepted': True, 'position': 'Assistant Referee',
+                {'id': 12761, 'accepted': True,
+                 'position': 'Assistant Referee',
                  'first_name': 'Homer', 'last_name': 'Simpson',
                  'email_addresses': ['homer@springfield.simpson']}
             ],
+            'open_positions': [],
             'assignor': {'first_name': 'Marge', 'last_name': 'Simpson',
                          'email_addresses': ['marge@springfield.simpson']}
         }
 
         self.assertEqual(result, expected_result)
 
+    def test_get_open_positions(self):
+        payload = [
+            {'position': 'Referee', 'accepted': True,
+             '_embedded': {'official': {'id': 12656}}},
+            {'position': 'Assistant Referee', 'accepted': False},
+            {'position': 'Assistant Referee', 'accepted': False, '_embedded': {}}
+        ]
+        self.assertEqual(self.instance.get_open_positions(payload),
+                         ['Assistant Referee', 'Assistant Referee'])
+
     def test_get_game_information_keyerror(self):
         temp = Assignr('123', '234', '345', BASE_URL,
                        AUTH_URL)
@@ -620,7 +879,8 @@ class TestGameInformation(TestCase):
             'id': 101, 'game_date': None, 'game_time': None, 'start_time': None,
             'home_team': None, 'away_team': None, 'age_group': None, 'league': None,
             'venue': None, 'sub_venue': None, 'gender': None, 'game_type': None,
-            'cancelled': None, 'referees': None, 'assignor': None
+            'cancelled': None, 'referees': None, 'open_positions': None,
+            'assignor': None
         }
 
         with self.assertLogs(level='INFO') as cm:
@@ -645,6 +905,7 @@ class TestGameInformation(TestCase):
             'game_type': None,
             'cancelled': None,
             'referees': None,
+            'open_positions': None,
             'assignor': None
         }
 
@@ -838,6 +1099,25 @@ class TestGetGameIds(TestCase):
         self.assertEqual(mock_get_requests.call_count, 2)
 
 
+class TestGetGameIdsComplete(TestCase):
+    @patch.object(Assignr, 'get_requests')
+    def test_failed_page(self, mock_get_requests):
+        temp = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        temp.token = ACCESS_TOKEN
+        temp.site_id = 100
+        mock_get_requests.side_effect = [
+            (200, {'page': {'pages': 2}, '_embedded': {'games': []}}), (500, {})]
+        with self.assertLogs(level='INFO'):
+            self.assertIsNone(temp.get_game_ids(CONST_DATE_2022_01_01,
+                                                CONST_DATE_2022_01_01, complete=True))
+
+        mock_get_requests.side_effect = [
+            (200, {'page': {'pages': 2}, '_embedded': {'games': []}}), (500, {})]
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(temp.get_game_ids(CONST_DATE_2022_01_01,
+                                               CONST_DATE_2022_01_01), {})
+
+
 class TestGetAssignors(TestCase):
 
     def setUp(self):
@@ -969,6 +1249,24 @@ class TestGetLeagueGames(TestCase):
         self.assertEqual(result, [])  # No results due to KeyError
 #        mock_logger.error.assert_called_once_with("Key: 'games', missing from Game response")
 
+    @patch.object(Assignr, 'get_requests')
+    def test_games_yielded_page_by_page(self, mock_get_requests):
+        self.instance.site_id = 123
+        mock_get_requests.side_effect = [
+            (200, {'page': {'pages': 2}, '_embedded': {'games': [
+                {'id': 1, 'league': 'Premier'}, {'id': 2, 'league': 'Championship'}]}}),
+            (200, {'page': {'pages': 2}, '_embedded': {'games': [
+                {'id': 3, 'league': 'Premier'}]}})
+        ]
+
+        games = self.instance.iter_league_games('Premier', '2024-01-01', '2024-01-31')
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(next(games)['id'], 1)
+        mock_get_requests.assert_called_once()
+        with self.assertLogs(level='INFO'):
+            self.assertEqual([game['id'] for game in games], [3])
+        self.assertEqual(mock_get_requests.call_args.kwargs['params']['page'], 2)
+
 
 class TestLoadRefereesAssignors(TestCase):
     def setUp(self):
@@ -1037,13 +1335,10 @@ class TestGetReports(TestCase):
 
     @patch.object(Assignr, 'get_requests')
     @patch('helpers.helpers.process_game_report')
-    @patch('helpers.helpers.get_coaches_name')
-    def test_successful_report_retrieval(self, mock_get_coaches_name, mock_process_game_report,
+    def test_successful_report_retrieval(self, mock_process_game_report,
                                          mock_get_requests):
         # Mock the process_game_report to return a simple dictionary
         mock_process_game_report.side_effect = lambda x: x
-        
-        mock_get_coaches_name.return_value = {}
 
         # Mock the API response for get_requests
         with open(join(response_file_dir, f"{sys._getframe(  ).f_code.co_name}.json")) as file:
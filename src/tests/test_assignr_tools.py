@@ -0,0 +1,150 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from zipfile import ZipFile
+from assignr_tools import (USAGE, add_native_packages, get_command, main,
+                           run_commands, split_commands)
+
+
+class TestGetCommand(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, command = get_command(['-h'])
+        self.assertEqual(cm.output, [f'ERROR:assignr_tools:{USAGE}'])
+        self.assertEqual(rc, 99)
+        self.assertIsNone(command)
+
+    def test_invalid_command(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_command(['delete_games'])
+        self.assertEqual(cm.output, [
+            'ERROR:assignr_tools:Command value, delete_games is invalid',
+            f'ERROR:assignr_tools:{USAGE}'
+        ])
+        self.assertEqual(rc, 77)
+
+    def test_valid_command(self):
+        self.assertEqual(get_command(['game_report', '-s', '01/01/2024']),
+                         (0, 'game_report'))
+
+
+class TestSplitCommands(TestCase):
+    def test_single_command(self):
+        self.assertEqual(split_commands(['flush_outbox', '-r', '5']),
+                         [['flush_outbox', '-r', '5']])
+
+    def test_several_commands(self):
+        self.assertEqual(split_commands(['game_report', '-s', '01/01/2024', '+',
+                                         'missing_game_reports', '-r']),
+                         [['game_report', '-s', '01/01/2024'],
+                          ['missing_game_reports', '-r']])
+
+
+class TestRunCommands(TestCase):
+    @patch('helpers.context.RunContext')
+    @patch('assignr_tools.import_module')
+    def test_commands_share_context(self, mock_import_module, mock_run_context):
+        module = mock_import_module.return_value
+        module.get_arguments.side_effect = [(0, {'a': 1}), (0, {'b': 2})]
+        module.run.return_value = 0
+
+        with self.assertLogs(level='INFO'):
+            rc = run_commands([['game_report', '-s', '01/01/2024'],
+                               ['missing_game_reports']])
+        self.assertEqual(rc, 0)
+        context = mock_run_context.return_value
+        self.assertEqual(module.run.call_args_list[0].args, ({'a': 1}, context))
+        self.assertEqual(module.run.call_args_list[1].args, ({'b': 2}, context))
+        mock_run_context.assert_called_once()
+        context.close.assert_called_once()
+
+    @patch('helpers.context.RunContext')
+    @patch('assignr_tools.import_module')
+    def test_arguments_checked_before_running(self, mock_import_module, mock_run_context):
+        module = mock_import_module.return_value
+        module.get_arguments.side_effect = [(0, {}), (77, None)]
+
+        rc = run_commands([['game_report'], ['missing_game_reports', '-x']])
+        self.assertEqual(rc, 77)
+        module.run.assert_not_called()
+        mock_run_context.assert_not_called()
+
+    @patch('helpers.context.RunContext')
+    @patch('assignr_tools.import_module')
+    def test_stops_at_failed_command(self, mock_import_module, mock_run_context):
+        module = mock_import_module.return_value
+        module.get_arguments.return_value = (0, {})
+        module.run.return_value = 66
+
+        with self.assertLogs(level='INFO') as cm:
+            rc = run_commands([['game_report'], ['missing_game_reports']])
+        self.assertEqual(rc, 66)
+        self.assertEqual(module.run.call_count, 1)
+        self.assertIn('ERROR:assignr_tools:game_report failed with return code 66',
+                      cm.output)
+        mock_run_context.return_value.close.assert_called_once()
+
+
+class TestMain(TestCase):
+    @patch('assignr_tools.add_native_packages')
+    @patch('assignr_tools.import_module')
+    def test_main_runs_command(self, mock_import_module, _):
+        argv = ['assignr_tools.pyz', 'flush_outbox', '-r', '5']
+        with patch('assignr_tools.argv', argv):
+            main()
+        mock_import_module.assert_called_once_with('flush_outbox')
+        mock_import_module.return_value.main.assert_called_once()
+        self.assertEqual(argv, ['flush_outbox.py', '-r', '5'])
+
+    @patch('assignr_tools.add_native_packages')
+    @patch('assignr_tools.run_commands', return_value=0)
+    def test_main_runs_several_commands(self, mock_run_commands, _):
+        argv = ['assignr_tools.pyz', 'game_report', '+', 'flush_outbox']
+        with patch('assignr_tools.argv', argv):
+            main()
+        mock_run_commands.assert_called_once_with([['game_report'], ['flush_outbox']])
+
+    @patch('assignr_tools.add_native_packages')
+    @patch('assignr_tools.run_commands')
+    def test_main_invalid_second_command(self, mock_run_commands, _):
+        argv = ['assignr_tools.pyz', 'game_report', '+', 'delete_games']
+        with patch('assignr_tools.argv', argv):
+            with self.assertLogs(level='INFO'):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 77)
+        mock_run_commands.assert_not_called()
+
+    def test_main_invalid_command(self):
+        with patch('assignr_tools.argv', ['assignr_tools.pyz']):
+            with self.assertLogs(level='INFO'):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 99)
+
+
+class TestAddNativePackages(TestCase):
+    def test_not_zipped(self):
+        with patch('assignr_tools.sys_path', []) as sys_path:
+            add_native_packages()
+        self.assertEqual(sys_path, [])
+
+    def test_extracts_native_packages_once(self):
+        with TemporaryDirectory() as temp_dir:
+            archive = path.join(temp_dir, 'assignr_tools.pyz')
+            with ZipFile(archive, 'w') as bundle:
+                bundle.writestr('assignr_tools.py', '')
+                bundle.writestr('_native/fast/__init__.py', 'VALUE = 1\n')
+            cache_dir = path.join(temp_dir, 'cache')
+
+            with patch('assignr_tools.__file__', path.join(archive, 'assignr_tools.py')), \
+                patch('assignr_tools.get_cache_dir', return_value=cache_dir), \
+                patch('assignr_tools.sys_path', []) as sys_path:
+                add_native_packages()
+                with patch('assignr_tools.ZipFile', MagicMock()) as mock_zip:
+                    add_native_packages()
+                mock_zip.assert_not_called()
+
+            self.assertEqual(len(sys_path), 2)
+            self.assertTrue(path.isfile(path.join(sys_path[0], 'fast', '__init__.py')))
@@ -2,17 +2,18 @@ from os import environ, getcwd
 from datetime import date
 from unittest import (TestCase, mock)
 from unittest.mock import (patch, MagicMock)
-from availability import (get_arguments, get_referees)
+from availability import (get_arguments, get_referees, run)
 
 USAGE='USAGE: availability.py -s <start-date> -e <end-date>' \
-    ' FORMAT=MM/DD/YYYY'
+    ' -f <csv|ndjson|parquet> -o <output file> -c FORMAT=MM/DD/YYYY'
 DATE_11_11_2023 = '11/11/2023'
 
 
 class TestGetArguments(TestCase):
     def test_help(self):
         expected_args = {
-            'start_date': None, 'end_date': None
+            'start_date': None, 'end_date': None, 'format': 'csv', 'output': None,
+            'coverage': False
         }
 
         with self.assertLogs(level='INFO') as cm:
@@ -23,15 +24,24 @@ class TestGetArguments(TestCase):
 
     def test_valid_options(self):
         expected_args = {'start_date': date(2023,11,11),
-                         'end_date': date(2023,11,12)
+                         'end_date': date(2023,11,12),
+                         'format': 'csv', 'output': None,
+                         'coverage': False
                         }
         rc, args = get_arguments(['-s', DATE_11_11_2023, '-e', '11/12/2023'])
         self.assertEqual(rc, 0)
         self.assertEqual(args, expected_args)
 
+    def test_coverage_option(self):
+        rc, args = get_arguments(['-s', DATE_11_11_2023, '-e', '11/12/2023', '-c'])
+        self.assertEqual(rc, 0)
+        self.assertTrue(args['coverage'])
+
     def test_missing_arguments(self):
         expected_args = {'start_date': DATE_11_11_2023,
-                         'end_date': None
+                         'end_date': None,
+                         'format': 'csv', 'output': None,
+                         'coverage': False
                         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', DATE_11_11_2023])
@@ -41,7 +51,9 @@ class TestGetArguments(TestCase):
 
     def test_invalid_start_date(self):
         expected_args = {'start_date': '21/11/2023',
-                         'end_date': date(2023,11,12)
+                         'end_date': date(2023,11,12),
+                         'format': 'csv', 'output': None,
+                         'coverage': False
                         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', '21/11/2023', '-e', '11/12/2023'])
@@ -52,7 +64,9 @@ class TestGetArguments(TestCase):
 
     def test_invalid_end_date(self):
         expected_args = {'start_date': date(2023,11,11),
-                         'end_date': '11/32/2023'
+                         'end_date': '11/32/2023',
+                         'format': 'csv', 'output': None,
+                         'coverage': False
                         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', DATE_11_11_2023, '-e', '11/32/2023'])
@@ -92,3 +106,62 @@ class TestGetReferees(TestCase):
         self.assertEqual(cm.output,
                          ['ERROR:availability:valid_file.csv Not Found!'])
         self.assertEqual(results, [])
+
+
+class TestRun(TestCase):
+    @patch('availability.get_referees',
+           return_value=[{'referee': 'John Doe', 'id': '1'},
+                         {'referee': 'Jane Smith', 'id': '2'}])
+    def test_rows_written_as_returned(self, _):
+        context = MagicMock()
+        assignr = MagicMock()
+        assignr.get_availability.side_effect = [
+            [{'date': '2023-11-11', 'avail': 'ALL DAY'}], []]
+        assignr.without_response_cache.return_value = assignr
+        context.get_assignr.return_value = (0, assignr)
+        args = {'start_date': date(2023, 11, 11), 'end_date': date(2023, 11, 12),
+                'format': 'ndjson', 'output': None, 'coverage': False}
+
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(args, context), 0)
+        self.assertEqual(mock_stdout.write.call_args_list[0].args[0],
+                         '{"referee": "John Doe", "referee_id": "1", '
+                         '"date": "2023-11-11", "availability": "ALL DAY"}')
+        self.assertEqual(cm.output,
+                         ["WARNING:availability:Jane Smith isn't Available",
+                          'INFO:availability:Exported 1 availability row(s)'])
+        assignr.without_response_cache.assert_called_once()
+
+    @patch('availability.get_referees',
+           return_value=[{'referee': 'John Doe', 'id': '1'},
+                         {'referee': 'Jane Smith', 'id': '2'}])
+    def test_coverage(self, _):
+        context = MagicMock()
+        assignr = MagicMock()
+        assignr.get_availability.side_effect = [
+            [{'date': '2024-09-01', 'avail': 'ALL DAY'}],
+            [{'date': '2024-09-01', 'avail': '8:00 AM - 11:00 AM'}]]
+        assignr.get_game_ids.return_value = {
+            1: {'id': 1, 'game_date': '2024-09-01', 'game_time': '9:00 AM',
+                'league': 'CYSL', 'home_team': 'Home', 'away_team': 'Away'},
+            2: {'id': 2, 'game_date': '2024-09-01', 'game_time': '15:00',
+                'league': 'CYSL', 'home_team': 'Home', 'away_team': 'Away'}}
+        assignr.without_response_cache.return_value = assignr
+        context.load_users.return_value = (0, assignr)
+        args = {'start_date': date(2024, 9, 1), 'end_date': date(2024, 9, 1),
+                'format': 'ndjson', 'output': None, 'coverage': True}
+
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(args, context), 0)
+        rows = [call.args[0] for call in mock_stdout.write.call_args_list
+                if call.args[0] != '\n']
+        self.assertEqual(rows, [
+            '{"id": 1, "game_date": "2024-09-01", "game_time": "9:00 AM", '
+            '"league": "CYSL", "home_team": "Home", "away_team": "Away", '
+            '"available": 2, "referees": "John Doe; Jane Smith"}',
+            '{"id": 2, "game_date": "2024-09-01", "game_time": "15:00", '
+            '"league": "CYSL", "home_team": "Home", "away_team": "Away", '
+            '"available": 1, "referees": "John Doe"}'])
+        self.assertEqual(cm.output, ['INFO:availability:Exported coverage of 2 game(s)'])
@@ -0,0 +1,74 @@
+from datetime import date
+from unittest import TestCase
+
+from helpers.availability_index import (AvailabilityIndex, parse_availability,
+                                        parse_time)
+
+
+def get_game(game_id, game_time, game_date='2024-09-01'):
+    return {'id': game_id, 'game_date': game_date, 'game_time': game_time}
+
+
+class TestParse(TestCase):
+    def test_times(self):
+        self.assertEqual(parse_time('8:00 AM'), 480)
+        self.assertEqual(parse_time('4:30 pm'), 990)
+        self.assertEqual(parse_time('09:00'), 540)
+        self.assertEqual(parse_time('12:00 AM'), 0)
+        with self.assertRaises(ValueError):
+            parse_time('noon')
+
+    def test_availability(self):
+        self.assertEqual(parse_availability('ALL DAY'), (0, 1440))
+        self.assertEqual(parse_availability('8:00 AM - 11:00 AM'), (480, 660))
+        self.assertEqual(parse_availability('09:00 - 12:00'), (540, 720))
+
+
+class TestAvailabilityIndex(TestCase):
+    def setUp(self):
+        self.index = AvailabilityIndex()
+        self.index.add_availability('1', [{'date': '2024-09-01', 'avail': 'ALL DAY'}])
+        self.index.add_availability('2', [{'date': '2024-09-01', 'avail': '8:00 AM - 11:00 AM'},
+                                          {'date': '2024-09-01', 'avail': '2:00 PM - 6:00 PM'}])
+        self.index.add_availability('3', [{'date': '2024-09-02', 'avail': 'ALL DAY'}])
+
+    def test_invalid_slot_minutes(self):
+        with self.assertRaises(ValueError):
+            AvailabilityIndex(slot_minutes=7)
+
+    def test_query(self):
+        games = [get_game(1, '9:00 AM'), get_game(2, '10:00 AM'),
+                 get_game(3, '15:00'), get_game(4, '9:00 AM', '2024-09-02'),
+                 get_game(5, '9:00 AM', '2024-09-03')]
+        self.assertEqual(self.index.query(games), {
+            1: ['1', '2'],
+            2: ['1'],
+            3: ['1', '2'],
+            4: ['3'],
+            5: []
+        })
+
+    def test_game_minutes(self):
+        self.assertEqual(self.index.query([get_game(2, '10:00 AM')], game_minutes=60),
+                         {2: ['1', '2']})
+
+    def test_partial_slots_not_available(self):
+        index = AvailabilityIndex(slot_minutes=60)
+        index.add_window('1', date(2024, 9, 1), 510, 720)
+        self.assertEqual(index.query([get_game(1, '8:30 AM')], game_minutes=60), {1: []})
+        self.assertEqual(index.query([get_game(2, '9:00 AM')], game_minutes=60), {2: ['1']})
+
+    def test_referee_without_availability(self):
+        self.index.add_availability('4', [])
+        self.assertEqual(self.index.referee_ids, ['1', '2', '3', '4'])
+
+    def test_invalid_values_ignored(self):
+        with self.assertLogs(level='WARNING') as cm:
+            self.index.add_availability('4', [{'date': '2024-09-01', 'avail': 'soon'}])
+            results = self.index.query([{'id': 1, 'game_date': None, 'game_time': None}])
+        self.assertEqual(results, {1: []})
+        self.assertEqual(len(cm.output), 2)
+
+    def test_query_bits(self):
+        bits = self.index.query_bits([get_game(1, '9:00 AM')])
+        self.assertEqual(bits, {1: self.index.referee_bits['1'] | self.index.referee_bits['2']})
@@ -0,0 +1,194 @@
+from os import (environ, path)
+from datetime import date
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+import json
+
+from backfill import (get_arguments, run, START_DATE, END_DATE, SHARD_DAYS,
+                      WORKERS, OUTPUT, RESUME)
+from helpers.backfill import (ShardStore, get_shards, is_complete, merge_shards)
+
+
+def get_page(report_ids, pages=1):
+    return {'page': {'pages': pages},
+            '_embedded': {'form_submissions': [{'id': report_id}
+                                               for report_id in report_ids]}}
+
+
+class TestGetArguments(TestCase):
+    def test_valid_arguments(self):
+        rc, args = get_arguments(['-s', '08/01/2024', '-e', '06/30/2025',
+                                  '-w', '14', '-j', '8'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args[START_DATE], date(2024, 8, 1))
+        self.assertEqual(args[END_DATE], date(2025, 6, 30))
+        self.assertEqual((args[SHARD_DAYS], args[WORKERS]), (14, 8))
+        self.assertIsNone(args[OUTPUT])
+
+    def test_missing_start_date(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-e', '06/30/2025'])
+        self.assertEqual(rc, 88)
+        self.assertEqual(cm.output[0], 'ERROR:backfill:Start Date is required')
+
+    def test_invalid_shard_days(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-s', '08/01/2024', '-e', '06/30/2025', '-w', '0'])
+        self.assertEqual(rc, 88)
+        self.assertIn('ERROR:backfill:Shard days value, 0 is invalid', cm.output)
+
+    def test_start_after_end(self):
+        with self.assertLogs(level='INFO'):
+            rc, _ = get_arguments(['-s', '08/01/2025', '-e', '06/30/2025'])
+        self.assertEqual(rc, 88)
+
+    def test_help(self):
+        with self.assertLogs(level='INFO'):
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(rc, 99)
+
+
+class TestShards(TestCase):
+    def test_weekly_shards(self):
+        shards = get_shards(date(2024, 8, 1), date(2024, 8, 20), 7)
+        self.assertEqual(shards, [(date(2024, 8, 1), date(2024, 8, 7)),
+                                  (date(2024, 8, 8), date(2024, 8, 14)),
+                                  (date(2024, 8, 15), date(2024, 8, 20))])
+
+    def test_single_day(self):
+        self.assertEqual(get_shards(date(2024, 8, 1), date(2024, 8, 1), 7),
+                         [(date(2024, 8, 1), date(2024, 8, 1))])
+
+    def test_is_complete(self):
+        self.assertTrue(is_complete([get_page([1], 2), get_page([2], 2)]))
+        self.assertTrue(is_complete([get_page([], 0)]))
+        self.assertFalse(is_complete([get_page([1], 2)]))
+        self.assertFalse(is_complete([]))
+        self.assertFalse(is_complete([{'errors': []}]))
+
+    def test_merge_is_deterministic(self):
+        shards = [[{'id': 5}, {'id': 2}], [{'id': 9}, {'id': 2, 'copy': True}]]
+        merged = merge_shards(shards)
+        self.assertEqual(merged, [{'id': 2}, {'id': 5}, {'id': 9}])
+        self.assertEqual(merge_shards(shards[::-1])[1:], merged[1:])
+
+
+class TestShardStore(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.store = ShardStore(self.temp_dir.name, 100)
+        self.shard = (date(2024, 8, 1), date(2024, 8, 7))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_saved_shard_loaded(self):
+        self.assertEqual(self.store.missing([self.shard]), [self.shard])
+        self.store.save(self.shard, [{'id': 1}], fetched_on=date(2024, 8, 8))
+        self.assertEqual(self.store.load(self.shard), [{'id': 1}])
+        self.assertEqual(self.store.missing([self.shard]), [])
+        self.assertTrue(path.isfile(path.join(self.temp_dir.name, '100',
+                                              '2024-08-01_2024-08-07.json')))
+
+    def test_shard_fetched_before_it_ended_is_missing(self):
+        self.store.save(self.shard, [{'id': 1}], fetched_on=date(2024, 8, 7))
+        self.assertEqual(self.store.missing([self.shard]), [self.shard])
+
+    def test_unreadable_shard_is_missing(self):
+        self.store.save(self.shard, [], fetched_on=date(2024, 8, 8))
+        with open(self.store.get_shard_file(self.shard), 'w') as shard_file:
+            shard_file.write('{')
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(self.store.missing([self.shard]), [self.shard])
+
+
+class TestRun(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.args = {START_DATE: date(2024, 8, 1), END_DATE: date(2024, 8, 21),
+                     SHARD_DAYS: 7, WORKERS: 3, OUTPUT: None,
+                     RESUME: False}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_context(self, get_report_pages):
+        site = MagicMock(site_id=100)
+        site.get_report_pages.side_effect = get_report_pages
+        context = MagicMock()
+        context.get_environment_vars.return_value = (0, {})
+        context.get_sites.return_value = (0, [site])
+        return context, site
+
+    def test_backfill(self):
+        def get_report_pages(start_date, end_date):
+            return [get_page([end_date.day * 10 + 1], 2),
+                    get_page([end_date.day * 10], 2)]
+
+        context, site = self.get_context(get_report_pages)
+        with patch.dict(environ, {'BACKFILL_DIR': self.temp_dir.name}):
+            with self.assertLogs(level='INFO') as cm:
+                rc = run(self.args, context)
+            self.assertEqual(rc, 0)
+            self.assertEqual(site.get_report_pages.call_count, 3)
+            self.assertIn('INFO:backfill:Fetching 3 of 3 shard(s)', cm.output)
+
+            output_file = path.join(self.temp_dir.name,
+                                    'game_reports_2024-08-01_2024-08-21.json')
+            with open(output_file) as output:
+                saved = json.load(output)
+            self.assertEqual([item['id'] for item in saved['form_submissions']],
+                             [70, 71, 140, 141, 210, 211])
+            self.assertEqual(saved['sites'], [100])
+
+            site.get_report_pages.reset_mock()
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(self.args, context), 0)
+            site.get_report_pages.assert_not_called()
+            self.assertIn('INFO:backfill:Fetching 0 of 3 shard(s)', cm.output)
+
+    def test_failed_shard_fetched_on_rerun(self):
+        def get_report_pages(start_date, end_date):
+            if start_date == date(2024, 8, 8):
+                return [get_page([2], 2)]
+            return [get_page([start_date.day])]
+
+        context, site = self.get_context(get_report_pages)
+        with patch.dict(environ, {'BACKFILL_DIR': self.temp_dir.name}):
+            with self.assertLogs(level='INFO') as cm:
+                rc = run(self.args, context)
+            self.assertEqual(rc, 33)
+            self.assertIn('ERROR:backfill:Shard 2024-08-08 to 2024-08-14 of site 100'
+                          ' not fetched', cm.output)
+            # The failed shard's pages are kept for --resume
+            context.finish_checkpoint.assert_called_once_with(False)
+
+            site.get_report_pages.reset_mock()
+            site.get_report_pages.side_effect = lambda *_: [get_page([8])]
+            with self.assertLogs(level='INFO'):
+                self.assertEqual(run(self.args, context), 0)
+            site.get_report_pages.assert_called_once_with(date(2024, 8, 8),
+                                                          date(2024, 8, 14))
+
+    def test_malformed_shard_fails_alone(self):
+        def get_report_pages(start_date, end_date):
+            if start_date == date(2024, 8, 8):
+                return [{'page': {'pages': 1}}]
+            return [get_page([start_date.day])]
+
+        context, _ = self.get_context(get_report_pages)
+        with patch.dict(environ, {'BACKFILL_DIR': self.temp_dir.name}):
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(self.args, context), 33)
+            self.assertIn("ERROR:backfill:Shard 2024-08-08 to 2024-08-14 of site 100"
+                          " not fetched, '_embedded' missing from a page", cm.output)
+            store = ShardStore(self.temp_dir.name, 100)
+            self.assertEqual(store.missing(get_shards(date(2024, 8, 1),
+                                                      date(2024, 8, 21), 7)),
+                             [(date(2024, 8, 8), date(2024, 8, 14))])
+
+    def test_missing_environment_vars(self):
+        context = MagicMock()
+        context.get_environment_vars.return_value = (66, None)
+        self.assertEqual(run(self.args, context), 66)
@@ -0,0 +1,86 @@
+from os import (makedirs, path)
+from sys import executable
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from zipfile import ZipFile
+import subprocess
+from build_zipapp import (build_zipapp, find_native_packages, get_arguments,
+                          move_native_packages)
+
+ERROR_USAGE = 'ERROR:build_zipapp:USAGE: build_zipapp.py -o <output file>' \
+    ' -r <requirements file> -b <cold start runs, 0 skips the benchmark>'
+
+
+def touch(*parts):
+    makedirs(path.dirname(path.join(*parts)), exist_ok=True)
+    with open(path.join(*parts), 'w') as file:
+        file.write('')
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [ERROR_USAGE])
+        self.assertEqual(rc, 99)
+
+    def test_invalid_values(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-b', 'many', '-r', 'missing.txt'])
+        self.assertEqual(cm.output, [
+            'ERROR:build_zipapp:Benchmark value, many is invalid',
+            'ERROR:build_zipapp:Requirements file, missing.txt Not Found!'
+        ])
+        self.assertEqual(rc, 88)
+
+
+class TestNativePackages(TestCase):
+    def test_find_and_move_native_packages(self):
+        with TemporaryDirectory() as staging_dir:
+            touch(staging_dir, 'requests', '__init__.py')
+            touch(staging_dir, 'markupsafe', '__init__.py')
+            touch(staging_dir, 'markupsafe', '_speedups.so')
+            touch(staging_dir, 'google', 'auth', '__init__.py')
+            touch(staging_dir, 'google', '_upb', '_message.abi3.so')
+            touch(staging_dir, 'certifi', '__init__.py')
+            touch(staging_dir, '_cffi_backend.so')
+
+            self.assertEqual(find_native_packages(staging_dir), [
+                '_cffi_backend.so', 'certifi',
+                path.join('google', '_upb', '_message.abi3.so'),
+                'markupsafe'
+            ])
+            move_native_packages(staging_dir)
+            self.assertTrue(path.isfile(
+                path.join(staging_dir, '_native', 'google', '_upb', '_message.abi3.so')))
+            self.assertTrue(path.isfile(path.join(staging_dir, 'google', 'auth',
+                                                  '__init__.py')))
+            self.assertFalse(path.exists(path.join(staging_dir, 'markupsafe')))
+
+
+class TestBuildZipapp(TestCase):
+    def test_build_without_requirements(self):
+        with TemporaryDirectory() as temp_dir:
+            output = path.join(temp_dir, 'dist', 'assignr_tools.pyz')
+            with self.assertLogs(level='INFO'):
+                rc = build_zipapp(output, None)
+            self.assertEqual(rc, 0)
+
+            with ZipFile(output) as bundle:
+                names = bundle.namelist()
+            for name in ('__main__.py', 'assignr_tools.pyc', 'helpers/helpers.pyc',
+                         'helpers/templates/summary.html.jinja'):
+                self.assertIn(name, names)
+            self.assertFalse([name for name in names if 'tests/' in name])
+
+            result = subprocess.run(
+                [executable, '-c',
+                 f'import sys; sys.path.insert(0, {output!r}); '
+                 'from helpers.helpers import create_message; '
+                 'print(create_message({"title": "Test"}, "summary.text.jinja"))'],
+                cwd=temp_dir, capture_output=True, text=True, check=True)
+            self.assertIn('Test', result.stdout)
+
+            result = subprocess.run([executable, output, 'flush_outbox', '-h'],
+                                    cwd=temp_dir, capture_output=True, check=False)
+            self.assertEqual(result.returncode, 99)
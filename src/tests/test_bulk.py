@@ -0,0 +1,101 @@
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from helpers.bulk import (CANCEL, DELETE, DONE, DRY_RUN, FAILED, RESCHEDULE, SKIPPED,
+                          BulkUpdater, Journal, select_games)
+
+
+def get_game(game_id, league='CYSL', venue='Park', cancelled=False):
+    return {'id': game_id, 'league': league, 'venue': {'id': 1, 'name': venue},
+            'age_group': 'U12', 'cancelled': cancelled}
+
+
+class TestSelectGames(TestCase):
+    def test_filters(self):
+        games = [get_game(3), get_game(1, venue='School'), get_game(2, league='Rec')]
+        self.assertEqual([game['id'] for game in select_games(games, {})], [1, 2, 3])
+        self.assertEqual([game['id'] for game in
+                          select_games(games, {'league': {'CYSL'}, 'venue': None})],
+                         [1, 3])
+        self.assertEqual([game['id'] for game in
+                          select_games(games, {'league': {'CYSL', 'Rec'},
+                                               'venue': {'Park'}})], [2, 3])
+        self.assertEqual([game['id'] for game in select_games(games, {'id': {'1', '2'}})],
+                         [1, 2])
+
+
+class TestJournal(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resume_reads_done(self):
+        journal = Journal(self.temp_dir.name, 'run')
+        journal.record({'id': 1, 'status': DONE})
+        journal.record({'id': 2, 'status': FAILED})
+        with open(journal.journal_file, 'a') as journal_file:
+            journal_file.write('{"id": 3, "sta')
+        self.assertEqual(Journal(self.temp_dir.name, 'run', resume=True).done(), {1})
+        self.assertEqual(Journal(self.temp_dir.name, 'run').done(), set())
+
+
+class TestBulkUpdater(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.assignr = MagicMock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_delete(self):
+        self.assignr.delete_game.side_effect = [(204, None), (404, None)]
+        results = BulkUpdater(self.assignr, DELETE).run([get_game(1), get_game(2)])
+        self.assertEqual([result['status'] for result in results], [DONE, DONE])
+
+    def test_cancel(self):
+        self.assignr.update_game.return_value = (200, {})
+        results = BulkUpdater(self.assignr, CANCEL).run([get_game(1),
+                                                        get_game(2, cancelled=True)])
+        self.assertEqual([result['status'] for result in results], [DONE, SKIPPED])
+        self.assignr.update_game.assert_called_once_with(1, {'cancelled': True})
+
+    def test_reschedule(self):
+        self.assignr.update_game.return_value = (200, {})
+        fields = {'localized_date': '2024-09-14'}
+        BulkUpdater(self.assignr, RESCHEDULE, fields).run([get_game(1)])
+        self.assignr.update_game.assert_called_once_with(1, fields)
+
+    def test_dry_run(self):
+        results = BulkUpdater(self.assignr, DELETE, dry_run=True).run([get_game(1)])
+        self.assertEqual(results[0]['status'], DRY_RUN)
+        self.assignr.delete_game.assert_not_called()
+
+    def test_failures_reported_per_game(self):
+        self.assignr.delete_game.side_effect = lambda game_id: \
+            (422, {'error': 'locked'}) if game_id == 2 else (204, None)
+        with self.assertLogs(level='ERROR') as cm:
+            results = BulkUpdater(self.assignr, DELETE, workers=2).run(
+                [get_game(1), get_game(2), get_game(3)])
+        self.assertEqual([result['status'] for result in results], [DONE, FAILED, DONE])
+        self.assertEqual(results[1]['status_code'], 422)
+        self.assertEqual(results[1]['error'], '{"error": "locked"}')
+        self.assertEqual(cm.output, ['ERROR:helpers.bulk:Game 2 not changed: 422'])
+
+    def test_resume_after_partial_failure(self):
+        self.assignr.delete_game.side_effect = [(204, None), ConnectionError('reset')]
+        journal = Journal(self.temp_dir.name, 'run')
+        with self.assertLogs(level='ERROR'):
+            results = BulkUpdater(self.assignr, DELETE, workers=1, journal=journal).run(
+                [get_game(1), get_game(2)])
+        self.assertEqual([result['status'] for result in results], [DONE, FAILED])
+
+        self.assignr.delete_game.reset_mock(side_effect=True)
+        self.assignr.delete_game.return_value = (204, None)
+        journal = Journal(self.temp_dir.name, 'run', resume=True)
+        results = BulkUpdater(self.assignr, DELETE, journal=journal).run(
+            [get_game(1), get_game(2)])
+        self.assertEqual([result['status'] for result in results], [SKIPPED, DONE])
+        self.assignr.delete_game.assert_called_once_with(2)
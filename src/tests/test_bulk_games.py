@@ -0,0 +1,164 @@
+from datetime import (date, time)
+from os import environ
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from bulk_games import (get_arguments, get_fields, get_operation_id, run)
+
+USAGE = 'ERROR:bulk_games:USAGE: bulk_games.py -a <delete|cancel|reschedule> -s <start-date>' \
+    ' -e <end-date> -g <game type, default "Coastal"> -l <leagues> -v <venues>' \
+    ' -y <age groups> -i <game ids> --date <new date> --time <new time, HH:MM>' \
+    ' -j <workers> -n -f <csv|ndjson|parquet> -o <output file> --resume' \
+    ' DATE FORMAT=MM/DD/YYYY'
+DATES = ['-s', '09/07/2024', '-e', '09/08/2024']
+
+
+def get_game(game_id, league='CYSL'):
+    return {'id': game_id, 'game_date': '2024-09-07', 'game_time': '9:00 AM',
+            'league': league, 'home_team': 'Home', 'away_team': 'Away',
+            'venue': 'Park', 'age_group': 'U12', 'cancelled': False}
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [USAGE])
+        self.assertEqual(rc, 99)
+
+    def test_missing_action(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(DATES)
+        self.assertEqual(cm.output, [USAGE])
+        self.assertEqual(rc, 99)
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-a', 'reschedule'] + DATES +
+                                 ['-l', 'CYSL, Rec', '-i', '101', '--date', '09/14/2024',
+                                  '--time', '13:30', '-j', '2', '-n', '--resume'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {
+            'action': 'reschedule', 'start_date': date(2024, 9, 7),
+            'end_date': date(2024, 9, 8), 'game_type': 'Coastal',
+            'filters': {'league': {'CYSL', 'Rec'}, 'venue': None, 'age_group': None,
+                        'id': {'101'}},
+            'new_date': date(2024, 9, 14), 'new_time': time(13, 30), 'workers': 2,
+            'dry_run': True, 'resume': True, 'format': 'csv', 'output': None})
+        self.assertEqual(get_fields(args), {'localized_date': '2024-09-14',
+                                            'localized_time': '13:30'})
+
+    def test_invalid_values(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-a', 'postpone'] + DATES + ['--time', '1pm', '-j', '0'])
+        self.assertEqual(rc, 88)
+        self.assertEqual(cm.output, [
+            'ERROR:bulk_games:Action value, postpone is invalid',
+            'ERROR:bulk_games:New Time value, 1pm is invalid',
+            'ERROR:bulk_games:Workers value, 0 is invalid'])
+
+    def test_reschedule_needs_new_start(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-a', 'reschedule'] + DATES)
+        self.assertEqual(rc, 88)
+        self.assertEqual(cm.output, [
+            'ERROR:bulk_games:Rescheduling needs a new date, a new time or both, '
+            'use --date or --time'])
+
+
+class TestRun(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.context = MagicMock()
+        self.assignr = MagicMock()
+        self.assignr.get_game_ids.return_value = {1: get_game(1), 2: get_game(2, 'Rec')}
+        self.context.load_users.return_value = (0, self.assignr)
+        _, self.args = get_arguments(['-a', 'delete', '-f', 'ndjson'] + DATES)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_selected_games_deleted(self):
+        self.assignr.delete_game.return_value = (204, None)
+        self.args['filters']['league'] = {'CYSL'}
+        with patch.dict(environ, {'CHECKPOINT_DIR': self.temp_dir.name}):
+            with patch('helpers.exporters.stdout') as mock_stdout:
+                with self.assertLogs(level='INFO') as cm:
+                    self.assertEqual(run(self.args, self.context), 0)
+        self.assignr.delete_game.assert_called_once_with(1)
+        self.assertEqual(mock_stdout.write.call_args_list[0].args[0],
+                         '{"id": 1, "game_date": "2024-09-07", "game_time": "9:00 AM", '
+                         '"league": "CYSL", "home_team": "Home", "away_team": "Away", '
+                         '"action": "delete", "status": "done", "status_code": 204, '
+                         '"error": null}')
+        self.assertEqual(cm.output,
+                         ['INFO:bulk_games:1 game(s) selected to delete: 1 done'])
+
+    def test_failure_kept_for_resume(self):
+        self.assignr.delete_game.side_effect = [(204, None), (500, None)]
+        self.args['workers'] = 1
+        with patch.dict(environ, {'CHECKPOINT_DIR': self.temp_dir.name}):
+            with patch('helpers.exporters.stdout'):
+                with self.assertLogs(level='INFO') as cm:
+                    self.assertEqual(run(self.args, self.context), 33)
+                self.assertIn('ERROR:bulk_games:1 game(s) not changed, run again with '
+                              '--resume to retry them', cm.output)
+
+                self.assignr.delete_game.reset_mock(side_effect=True)
+                self.assignr.delete_game.return_value = (204, None)
+                self.args['resume'] = True
+                with self.assertLogs(level='INFO') as cm:
+                    self.assertEqual(run(self.args, self.context), 0)
+        self.assignr.delete_game.assert_called_once_with(2)
+        self.assertEqual(cm.output,
+                         ['INFO:bulk_games:2 game(s) selected to delete: 1 done, 1 skipped'])
+
+    def test_dry_run(self):
+        self.args['dry_run'] = True
+        with patch('helpers.exporters.stdout'):
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(self.args, self.context), 0)
+        self.assignr.delete_game.assert_not_called()
+        self.assertEqual(cm.output,
+                         ['INFO:bulk_games:2 game(s) selected to delete: 2 dry run'])
+
+    def test_games_not_fetched(self):
+        self.assignr.get_game_ids.return_value = None
+        with self.assertLogs(level='INFO') as cm:
+            self.assertEqual(run(self.args, self.context), 44)
+        self.assertEqual(cm.output,
+                         ['ERROR:bulk_games:Games not fetched, none were changed'])
+        self.assignr.delete_game.assert_not_called()
+
+    def test_resume_of_another_operation(self):
+        _, args = get_arguments(['-a', 'reschedule', '--date', '09/14/2024', '-j', '1',
+                                 '-f', 'ndjson'] + DATES)
+        self.assignr.update_game.side_effect = [(200, None), (500, None)]
+        with patch.dict(environ, {'CHECKPOINT_DIR': self.temp_dir.name}):
+            with patch('helpers.exporters.stdout'):
+                with self.assertLogs(level='INFO'):
+                    self.assertEqual(run(args, self.context), 33)
+
+                # The journal of the move to the 14th doesn't skip a move to the 21st
+                self.assignr.update_game.reset_mock(side_effect=True)
+                self.assignr.update_game.return_value = (200, None)
+                _, args = get_arguments(['-a', 'reschedule', '--date', '09/21/2024',
+                                         '-f', 'ndjson', '--resume'] + DATES)
+                with self.assertLogs(level='INFO') as cm:
+                    self.assertEqual(run(args, self.context), 0)
+        self.assertEqual(self.assignr.update_game.call_count, 2)
+        self.assertEqual(cm.output,
+                         ['INFO:bulk_games:2 game(s) selected to reschedule: 2 done'])
+
+class TestOperationId(TestCase):
+    def test_operation_id(self):
+        _, args = get_arguments(['-a', 'reschedule', '-l', 'CYSL,Rec',
+                                 '--date', '09/14/2024'] + DATES)
+        _, same = get_arguments(['-a', 'reschedule', '-l', 'Rec, CYSL',
+                                 '--date', '09/14/2024'] + DATES)
+        _, other_date = get_arguments(['-a', 'reschedule', '-l', 'CYSL,Rec',
+                                       '--date', '09/21/2024'] + DATES)
+        _, other_venue = get_arguments(['-a', 'reschedule', '-l', 'CYSL,Rec',
+                                        '-v', 'Park', '--date', '09/14/2024'] + DATES)
+        self.assertEqual(get_operation_id(args), get_operation_id(same))
+        self.assertNotEqual(get_operation_id(args), get_operation_id(other_date))
+        self.assertNotEqual(get_operation_id(args), get_operation_id(other_venue))
@@ -0,0 +1,95 @@
+from datetime import date
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+
+from assignr.assignr import Assignr
+from helpers.checkpoint import (Checkpoint, get_run_id)
+
+BASE_URL = 'https://base.com/api/v2'
+AUTH_URL = 'https://auth.com/oauth/token'
+
+
+def get_response(page_nbr, pages):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {'page': {'pages': pages},
+                                  '_embedded': {'form_submissions': [{'id': page_nbr}]}}
+    return response
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_run_id(self):
+        self.assertEqual(get_run_id('game_report', date(2024, 8, 1), date(2025, 6, 30)),
+                         'game_report_2024-08-01_2025-06-30')
+        self.assertEqual(get_run_id('backfill', None, 7), 'backfill_7')
+
+    def test_pages_saved(self):
+        checkpoint = Checkpoint(self.temp_dir.name, 'run')
+        key = (100, 'games', (('page', 1),))
+        self.assertIsNone(checkpoint.load(key))
+        checkpoint.save(key, {'id': 1})
+        self.assertEqual(checkpoint.load(key), {'id': 1})
+        self.assertEqual(checkpoint.saved_pages(), 1)
+
+    def test_resume_keeps_pages(self):
+        key = (100, 'games', (('page', 1),))
+        Checkpoint(self.temp_dir.name, 'run').save(key, {'id': 1})
+        self.assertEqual(Checkpoint(self.temp_dir.name, 'run', resume=True).load(key),
+                         {'id': 1})
+        self.assertIsNone(Checkpoint(self.temp_dir.name, 'other', resume=True).load(key))
+        self.assertIsNone(Checkpoint(self.temp_dir.name, 'run').load(key))
+
+    def test_discard(self):
+        checkpoint = Checkpoint(self.temp_dir.name, 'run')
+        checkpoint.save(('games',), {'id': 1})
+        checkpoint.discard()
+        self.assertEqual(checkpoint.saved_pages(), 0)
+
+
+class TestAssignrCheckpoint(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_assignr(self, resume=False):
+        assignr = Assignr('123', '234', '345', BASE_URL, AUTH_URL)
+        assignr.token = 'token'
+        assignr.site_id = 100
+        assignr.checkpoint = Checkpoint(self.temp_dir.name, 'run', resume)
+        return assignr
+
+    @patch('assignr.assignr.requests')
+    def test_resume_after_failed_page(self, mock_requests):
+        failed = MagicMock(status_code=500)
+        failed.json.return_value = {}
+        mock_requests.get.side_effect = [get_response(1, 3), get_response(2, 3), failed]
+        with self.assertLogs(level='INFO'):
+            assignr = self.get_assignr()
+            pages = assignr.get_report_pages('2024-08-01', '2025-06-30')
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(assignr.checkpoint.failed_pages, 1)
+
+        mock_requests.get.reset_mock()
+        mock_requests.get.side_effect = [get_response(3, 3)]
+        pages = self.get_assignr(resume=True).get_report_pages('2024-08-01', '2025-06-30')
+        self.assertEqual([page['_embedded']['form_submissions'][0]['id'] for page in pages],
+                         [1, 2, 3])
+        mock_requests.get.assert_called_once()
+        self.assertEqual(mock_requests.get.call_args.kwargs['params']['page'], 3)
+
+    @patch('assignr.assignr.requests')
+    def test_unpaginated_requests_not_saved(self, mock_requests):
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'id': 100}
+        assignr = self.get_assignr()
+        assignr.get_requests('account')
+        self.assertEqual(assignr.checkpoint.saved_pages(), 0)
+
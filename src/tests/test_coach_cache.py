@@ -0,0 +1,161 @@
+from os import (environ, path)
+from datetime import (datetime, timedelta)
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import patch
+import json
+from helpers.coach_cache import (CoachCache, get_coach_cache, DEFAULT_TTL)
+from tests.fake_sheets import FakeSheetsService
+
+CONST_SHEET_ID = 'sheet_id'
+CONST_RANGE = 'Coaches!A:D'
+CONST_ROWS = [
+    ['Age Group', 'Gender', 'Team', 'Coach'],
+    ['Grade 7/8', 'Boys', 'Hanover-1', 'Mickey Mouse']
+]
+CONST_COACHES = {'Grade 7/8': {'Boys': {'Hanover-1': 'Mickey Mouse'}}}
+
+
+class TestCoachCache(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.cache_file = path.join(self.temp_dir.name, 'cache', 'coaches.json')
+        self.service = FakeSheetsService({CONST_RANGE: CONST_ROWS})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_cache(self, ttl=DEFAULT_TTL, max_stale=7200):
+        return CoachCache(self.cache_file, ttl=ttl, max_stale=max_stale,
+                          sheets_service=self.service, drive_service=self.service)
+
+    def age_snapshot(self, seconds):
+        with open(self.cache_file, 'r') as cache_file:
+            snapshot = json.load(cache_file)
+        snapshot['checked_at'] = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+        with open(self.cache_file, 'w') as cache_file:
+            json.dump(snapshot, cache_file)
+
+    def test_first_run_downloads_sheet(self):
+        result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, CONST_COACHES)
+        self.assertEqual(self.service.calls, {'get': 0, 'batchGet': 1, 'files.get': 1})
+        self.assertTrue(path.isfile(self.cache_file))
+
+    def test_fresh_snapshot_skips_google(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, CONST_COACHES)
+        self.assertEqual(self.service.calls['files.get'], 1)
+        self.assertEqual(self.service.calls['batchGet'], 1)
+
+    def test_different_range_is_not_cached(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        result = self.get_cache().get(CONST_SHEET_ID, 'Other!A:D')
+        self.assertEqual(result, {})
+        self.assertEqual(self.service.calls['batchGet'], 2)
+
+    def test_stale_snapshot_revalidated_in_background(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.age_snapshot(DEFAULT_TTL + 1)
+        self.service.ranges[CONST_RANGE] = CONST_ROWS + [
+            ['Grade 5/6', 'Girls', 'Hanover-1', 'Minnie Mouse']]
+
+        cache = self.get_cache()
+        result = cache.get(CONST_SHEET_ID, CONST_RANGE)
+        cache.wait()
+        self.assertEqual(result, CONST_COACHES)
+        self.assertEqual(self.service.calls['files.get'], 2)
+        # modified time didn't change, so the sheet isn't downloaded again
+        self.assertEqual(self.service.calls['batchGet'], 1)
+
+    def test_changed_sheet_downloaded(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.age_snapshot(DEFAULT_TTL + 1)
+        self.service.modified_time = '2024-09-08T12:00:00.000Z'
+        self.service.ranges[CONST_RANGE] = CONST_ROWS + [
+            ['Grade 5/6', 'Girls', 'Hanover-1', 'Minnie Mouse']]
+
+        cache = self.get_cache()
+        cache.get(CONST_SHEET_ID, CONST_RANGE)
+        cache.wait()
+        result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result['Grade 5/6'], {'Girls': {'Hanover-1': 'Minnie Mouse'}})
+        self.assertEqual(self.service.calls['batchGet'], 2)
+
+    def test_too_stale_snapshot_revalidated_first(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.age_snapshot(7201)
+        self.service.modified_time = '2024-09-08T12:00:00.000Z'
+        self.service.ranges[CONST_RANGE] = CONST_ROWS[:1]
+
+        result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, {})
+
+    def test_offline_uses_last_snapshot(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.age_snapshot(30 * 24 * 3600)
+        self.service.set_offline()
+
+        with self.assertLogs(level='INFO') as cm:
+            result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, CONST_COACHES)
+        self.assertTrue(cm.output[-1].startswith(
+            'WARNING:helpers.coach_cache:Coach sheet unavailable, using the copy from'))
+
+    def test_offline_without_snapshot(self):
+        self.service.set_offline()
+        with self.assertLogs(level='INFO') as cm:
+            result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, {})
+        self.assertTrue(cm.output[-1].startswith(
+            'ERROR:helpers.coach_cache:Coach sheet unavailable:'))
+        self.assertFalse(path.exists(self.cache_file))
+
+    def test_drive_unavailable_downloads_sheet(self):
+        drive_service = FakeSheetsService()
+        drive_service.set_offline(403)
+        cache = CoachCache(self.cache_file, sheets_service=self.service,
+                           drive_service=drive_service)
+        with self.assertLogs(level='INFO') as cm:
+            result = cache.get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, CONST_COACHES)
+        self.assertTrue(cm.output[0].startswith(
+            'WARNING:helpers.coach_cache:Coach sheet modified time unavailable'))
+        with open(self.cache_file, 'r') as cache_file:
+            self.assertIsNone(json.load(cache_file)['modified_time'])
+
+        # Without a modified time to compare, a stale snapshot is downloaded again
+        self.age_snapshot(DEFAULT_TTL + 1)
+        with self.assertLogs(level='INFO'):
+            cache.get(CONST_SHEET_ID, CONST_RANGE, background=False)
+        self.assertEqual(self.service.calls['batchGet'], 2)
+
+    def test_unreadable_cache_ignored(self):
+        self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        with open(self.cache_file, 'w') as cache_file:
+            cache_file.write('{not json')
+        with self.assertLogs(level='INFO'):
+            result = self.get_cache().get(CONST_SHEET_ID, CONST_RANGE)
+        self.assertEqual(result, CONST_COACHES)
+        self.assertEqual(self.service.calls['batchGet'], 2)
+
+
+class TestGetCoachCache(TestCase):
+    @patch.dict(environ, {'COACH_CACHE_FILE': 'coaches.json',
+                          'COACH_CACHE_TTL': '60', 'COACH_CACHE_MAX_STALE': '120'})
+    def test_environment(self):
+        cache = get_coach_cache()
+        self.assertEqual(cache.cache_file, 'coaches.json')
+        self.assertEqual(cache.ttl, timedelta(seconds=60))
+        self.assertEqual(cache.max_stale, timedelta(seconds=120))
+
+    @patch.dict(environ, {'COACH_CACHE_TTL': 'hourly'})
+    def test_invalid_ttl(self):
+        with self.assertLogs(level='INFO') as cm:
+            cache = get_coach_cache()
+        self.assertEqual(cache.ttl, timedelta(seconds=DEFAULT_TTL))
+        self.assertEqual(cm.output, [
+            'ERROR:helpers.coach_cache:COACH_CACHE_TTL and COACH_CACHE_MAX_STALE'
+            ' must be integers, using defaults'
+        ])
@@ -0,0 +1,82 @@
+from unittest import TestCase
+from helpers.coach_index import (CoachIndex, get_key, get_near_teams,
+                                 normalize_age_group, normalize_gender,
+                                 normalize_team, UNKNOWN_COACH)
+
+CONST_COACHES = {
+    'Grade 7/8': {
+        'Boys': {'Hanover-1': 'Mickey Mouse', 'Hanover-2': 'Donald Duck'},
+        'Girls': {'Hanover-1': 'Minnie Mouse'}
+    },
+    'Grade 5/6': {
+        'Boys': {'Springfield': 'Homer Simpson'}
+    }
+}
+
+
+class TestNormalize(TestCase):
+    def test_normalize_age_group(self):
+        for age_group in ('Grade 7/8', 'grade 7-8', 'Gr. 7 & 8', ' GRADES 7 / 8 ',
+                          '7 and 8'):
+            with self.subTest(age_group=age_group):
+                self.assertEqual(normalize_age_group(age_group), '7/8')
+
+    def test_normalize_gender(self):
+        self.assertEqual(normalize_gender('Boys'), 'boys')
+        self.assertEqual(normalize_gender('G'), 'girls')
+        self.assertEqual(normalize_gender('Co-Ed'), 'coed')
+        self.assertEqual(normalize_gender(None), '')
+
+    def test_normalize_team(self):
+        self.assertEqual(normalize_team(' Hanover - 1 '), 'hanover1')
+        self.assertEqual(get_key('Grade 7/8', 'Boy', 'HANOVER 1'),
+                         ('7/8', 'boys', 'hanover1'))
+
+    def test_get_near_teams(self):
+        self.assertEqual(get_near_teams('abc'), {'bc', 'ac', 'ab', 'bac', 'acb'})
+
+
+class TestCoachIndex(TestCase):
+    def setUp(self):
+        self.index = CoachIndex(CONST_COACHES)
+
+    def test_exact_match(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.get('Grade 7/8', 'Boys', 'Hanover-2'), 'Donald Duck')
+
+    def test_normalized_match(self):
+        self.assertEqual(self.index.get('grade 7-8', 'girls', 'hanover 1'), 'Minnie Mouse')
+        self.assertEqual(self.index.get('Gr 5/6', 'B', 'SPRINGFIELD'), 'Homer Simpson')
+
+    def test_near_match(self):
+        self.assertEqual(self.index.get('Grade 5/6', 'Boys', 'Sprinfield'), 'Homer Simpson')
+        self.assertEqual(self.index.get('Grade 5/6', 'Boys', 'Sprnigfield'), 'Homer Simpson')
+
+    def test_ambiguous_near_match(self):
+        # Hanover with its number left off is one typo from both teams
+        self.assertEqual(self.index.get('Grade 7/8', 'Boys', 'Hanover'), UNKNOWN_COACH)
+
+    def test_near_match_keeps_other_teams(self):
+        self.assertEqual(self.index.get('Grade 7/8', 'Boys', 'Hanover-3'), UNKNOWN_COACH)
+
+    def test_empty_index(self):
+        for coaches in (None, {}):
+            with self.subTest(coaches=coaches):
+                self.assertEqual(CoachIndex(coaches).get('Grade 7/8', 'Boys', 'Hanover-1'),
+                                 UNKNOWN_COACH)
+
+    def test_report_unmatched(self):
+        self.index.get('Grade 7/8', 'Boys', 'Hanover-3')
+        self.index.get('Grade 7/8', 'Boys', 'Hanover-3')
+        self.index.get('Grade 3/4', 'Girls', 'Ogdenville')
+        self.index.get('Grade 7/8', 'Boys', 'Hanover-1')
+        with self.assertLogs(level='INFO') as cm:
+            self.index.report_unmatched()
+        self.assertEqual(cm.output, [
+            'WARNING:helpers.coach_index:No coach found for 2 team(s): '
+            'Grade 3/4 Girls Ogdenville (1); Grade 7/8 Boys Hanover-3 (2)'
+        ])
+
+    def test_report_nothing_unmatched(self):
+        with self.assertNoLogs(level='INFO'):
+            self.index.report_unmatched()
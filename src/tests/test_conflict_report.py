@@ -0,0 +1,69 @@
+from datetime import date
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from conflict_report import (get_arguments, run)
+
+USAGE='USAGE: conflict_report.py -s <start-date> -e <end-date>' \
+    ' -g <game type, default "Coastal"> -m <game minutes> -t <turnaround minutes>' \
+    ' -f <csv|ndjson|parquet> -o <output file> FORMAT=MM/DD/YYYY'
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [f"ERROR:conflict_report:{USAGE}"])
+        self.assertEqual(rc, 99)
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-s', '09/01/2024', '-e', '09/02/2024', '-g', 'Futsal',
+                                  '-m', '60', '-t', '45', '-f', 'ndjson'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {'start_date': date(2024, 9, 1), 'end_date': date(2024, 9, 2),
+                                'game_type': 'Futsal', 'game_minutes': 60,
+                                'turnaround_minutes': 45, 'format': 'ndjson',
+                                'output': None})
+
+    def test_invalid_minutes(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-s', '09/01/2024', '-e', '09/02/2024',
+                                   '-m', 'long', '-t', '-5'])
+        self.assertEqual(rc, 88)
+        self.assertEqual(cm.output, [
+            'ERROR:conflict_report:Game Minutes value, long is invalid',
+            'ERROR:conflict_report:Turnaround Minutes value, -5 is invalid'])
+
+
+class TestRun(TestCase):
+    def test_conflicts_written(self):
+        referee = {'id': 10, 'first_name': 'John', 'last_name': 'Doe'}
+        context = MagicMock()
+        assignr = MagicMock()
+        assignr.get_game_ids.return_value = {
+            1: {'id': 1, 'game_date': '2024-09-01', 'game_time': '9:00 AM',
+                'venue': 'Park', 'cancelled': False, 'referees': [referee]},
+            2: {'id': 2, 'game_date': '2024-09-01', 'game_time': '10:00 AM',
+                'venue': 'Park', 'cancelled': False, 'referees': [referee]}}
+        context.load_users.return_value = (0, assignr)
+        args = {'start_date': date(2024, 9, 1), 'end_date': date(2024, 9, 1),
+                'game_type': 'Coastal', 'game_minutes': 90, 'turnaround_minutes': 30,
+                'format': 'ndjson', 'output': None}
+
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(args, context), 0)
+        assignr.get_game_ids.assert_called_once_with(date(2024, 9, 1), date(2024, 9, 1),
+                                                     'Coastal')
+        self.assertEqual(mock_stdout.write.call_args_list[0].args[0],
+                         '{"conflict": "overlap", "referee_id": 10, "referee": "John Doe", '
+                         '"game_date": "2024-09-01", "first_game": 1, '
+                         '"first_time": "9:00 AM", "first_venue": "Park", '
+                         '"second_game": 2, "second_time": "10:00 AM", '
+                         '"second_venue": "Park", "gap_minutes": -30}')
+        self.assertEqual(cm.output,
+                         ['INFO:conflict_report:Found 1 conflict(s) in 2 game(s)'])
+
+    def test_users_not_loaded(self):
+        context = MagicMock()
+        context.load_users.return_value = (55, None)
+        self.assertEqual(run({'output': None}, context), 55)
@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from helpers.conflicts import (OVERLAP, TURNAROUND, find_conflicts, get_assignments)
+
+
+def get_referee(referee_id, position='Referee'):
+    return {'id': referee_id, 'accepted': True, 'position': position,
+            'first_name': 'Ref', 'last_name': str(referee_id), 'email_addresses': []}
+
+def get_game(game_id, game_time, venue, referee_ids, game_date='2024-09-01',
+             cancelled=False):
+    return {'id': game_id, 'game_date': game_date, 'game_time': game_time,
+            'venue': venue, 'cancelled': cancelled,
+            'referees': [get_referee(referee_id) for referee_id in referee_ids]}
+
+
+class TestGetAssignments(TestCase):
+    def test_cancelled_and_duplicates_left_out(self):
+        games = [get_game(1, '9:00 AM', 'Park', [10, 10]),
+                 get_game(2, '9:00 AM', 'Park', [10], cancelled=True),
+                 get_game(3, '9:00 AM', 'Park', [])]
+        assignments = get_assignments(games)
+        self.assertEqual(list(assignments), [10])
+        self.assertEqual(len(assignments[10]), 1)
+
+    def test_game_without_start(self):
+        with self.assertLogs(level='WARNING') as cm:
+            assignments = get_assignments([get_game(1, None, 'Park', [10])])
+        self.assertEqual(assignments, {})
+        self.assertEqual(cm.output,
+                         ['WARNING:helpers.conflicts:Game 1 has no start, not checked'])
+
+
+class TestFindConflicts(TestCase):
+    def test_overlap(self):
+        games = [get_game(2, '10:00 AM', 'Park', [10]),
+                 get_game(1, '9:00 AM', 'Park', [10, 11])]
+        conflicts = find_conflicts(games)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['conflict'], OVERLAP)
+        self.assertEqual(conflicts[0]['referee_id'], 10)
+        self.assertEqual(conflicts[0]['referee'], 'Ref 10')
+        self.assertEqual((conflicts[0]['first_game'], conflicts[0]['second_game']), (1, 2))
+        self.assertEqual(conflicts[0]['gap_minutes'], -30)
+
+    def test_turnaround_at_another_venue(self):
+        games = [get_game(1, '9:00 AM', {'id': 1, 'name': 'Park'}, [10]),
+                 get_game(2, '10:45 AM', {'id': 2, 'name': 'School'}, [10]),
+                 get_game(3, '12:15 PM', {'id': 2, 'name': 'School'}, [10])]
+        conflicts = find_conflicts(games)
+        self.assertEqual([conflict['conflict'] for conflict in conflicts], [TURNAROUND])
+        self.assertEqual(conflicts[0]['first_venue'], 'Park')
+        self.assertEqual(conflicts[0]['second_venue'], 'School')
+        self.assertEqual(conflicts[0]['gap_minutes'], 15)
+        self.assertEqual(find_conflicts(games, turnaround_minutes=15), [])
+
+    def test_overlap_with_earlier_long_game(self):
+        games = [get_game(1, '9:00 AM', 'Park', [10]),
+                 get_game(2, '9:15 AM', 'Park', [10]),
+                 get_game(3, '10:00 AM', 'Park', [10])]
+        conflicts = find_conflicts(games, game_minutes=120)
+        self.assertEqual([(conflict['first_game'], conflict['second_game'])
+                          for conflict in conflicts], [(1, 2), (2, 3)])
+
+    def test_other_days_and_referees(self):
+        games = [get_game(1, '9:00 AM', 'Park', [10]),
+                 get_game(2, '9:00 AM', 'School', [11]),
+                 get_game(3, '9:00 AM', 'School', [10], game_date='2024-09-02')]
+        self.assertEqual(find_conflicts(games), [])
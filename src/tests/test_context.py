@@ -0,0 +1,234 @@
+from os import environ
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from assignr.assignr import Assignr
+from helpers.context import RunContext
+from helpers.coach_index import CoachIndex
+
+ENV_VARS = {
+    'CLIENT_ID': 'client_id',
+    'CLIENT_SECRET': 'client_secret',
+    'CLIENT_SCOPE': 'read',
+    'BASE_URL': 'https://base.com/',
+    'AUTH_URL': 'https://auth.com/'
+}
+
+
+class TestRunContext(TestCase):
+    @patch.dict(environ, ENV_VARS, clear=True)
+    def test_environment_vars_loaded_once(self):
+        context = RunContext()
+        with patch('helpers.context.get_environment_vars',
+                   return_value=(0, ENV_VARS)) as mock_get_environment_vars:
+            self.assertEqual(context.get_environment_vars(), (0, ENV_VARS))
+            self.assertEqual(context.get_environment_vars(), (0, ENV_VARS))
+        mock_get_environment_vars.assert_called_once()
+
+    @patch.dict(environ, {}, clear=True)
+    def test_missing_environment_vars(self):
+        context = RunContext()
+        with self.assertLogs(level='INFO'):
+            rc, assignr = context.get_assignr()
+        self.assertEqual(rc, 66)
+        self.assertIsNone(assignr)
+        self.assertIsNone(context.env_vars)
+
+    @patch.dict(environ, ENV_VARS, clear=True)
+    def test_assignr_shared(self):
+        context = RunContext()
+        rc, assignr = context.get_assignr()
+        self.assertEqual(rc, 0)
+        self.assertEqual(assignr.client_id, 'client_id')
+        self.assertEqual(assignr.response_cache, {})
+        self.assertIs(context.get_assignr()[1], assignr)
+
+    @patch.dict(environ, ENV_VARS, clear=True)
+    @patch('assignr.assignr.requests')
+    def test_responses_shared_until_cleared(self, mock_requests):
+        mock_requests.post.return_value.status_code = 200
+        mock_requests.post.return_value.json.return_value = {'access_token': 'token'}
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'id': 1}
+
+        context = RunContext()
+        _, assignr = context.get_assignr()
+        assignr.get_requests('games', params={'page': 1})
+        _, assignr = context.get_assignr()
+        assignr.get_requests('games', params={'page': 1})
+        self.assertEqual(mock_requests.get.call_count, 1)
+
+        context.clear()
+        assignr.get_requests('games', params={'page': 1})
+        self.assertEqual(mock_requests.get.call_count, 2)
+        self.assertEqual(mock_requests.post.call_count, 1)
+
+    @patch.dict(environ, ENV_VARS, clear=True)
+    @patch('assignr.assignr.Assignr.load_referees_assignors', autospec=True)
+    def test_users_loaded_once(self, mock_load_referees_assignors):
+        def load(assignr):
+            assignr.referees = {1: {'first_name': 'Homer'}}
+        mock_load_referees_assignors.side_effect = load
+
+        context = RunContext()
+        context.load_users()
+        rc, assignr = context.load_users()
+        self.assertEqual(rc, 0)
+        self.assertEqual(assignr.referees, {1: {'first_name': 'Homer'}})
+        mock_load_referees_assignors.assert_called_once()
+
+        context.reset()
+        context.load_users()
+        self.assertEqual(mock_load_referees_assignors.call_count, 2)
+
+    @patch('helpers.context.get_assignor_information',
+           return_value={'Association': []})
+    def test_assignors_loaded_once(self, mock_get_assignor_information):
+        context = RunContext()
+        context.get_assignors()
+        self.assertEqual(context.get_assignors(), {'Association': []})
+        mock_get_assignor_information.assert_called_once()
+
+    @patch.dict(environ, {'SPREADSHEET_ID': 'sheet', 'SPREADSHEET_RANGE': 'A:D',
+                          'GOOGLE_APPLICATION_CREDENTIALS': 'credentials.json'},
+                clear=True)
+    @patch('helpers.coach_cache.get_coach_cache')
+    def test_coaches_loaded_once(self, mock_get_coach_cache):
+        mock_get_coach_cache.return_value.get.return_value = {
+            'Grade 7/8': {'Boys': {'Hawks': 'Homer Simpson'}}
+        }
+        context = RunContext()
+        rc, coaches = context.get_coaches()
+        self.assertEqual(rc, 0)
+        self.assertIsInstance(coaches, CoachIndex)
+        self.assertEqual(coaches.get('Grade 7/8', 'Boys', 'Hawks'), 'Homer Simpson')
+        self.assertIs(context.get_coaches()[1], coaches)
+        mock_get_coach_cache.return_value.get.assert_called_once_with('sheet', 'A:D')
+
+        context.close()
+        mock_get_coach_cache.return_value.wait.assert_called_once()
+
+    def test_close_without_coaches(self):
+        RunContext().close()
+
+    @patch('helpers.context.get_outbox', return_value=MagicMock())
+    def test_outbox_shared(self, mock_get_outbox):
+        context = RunContext()
+        self.assertIs(context.get_outbox(), context.get_outbox())
+        mock_get_outbox.assert_called_once()
+
+
+SITES = [{'id': 100, 'name': 'CYSL'}, {'id': 200, 'name': 'Rec'}, {'id': 300, 'name': 'Travel'}]
+
+
+class TestRateLimit(TestCase):
+    @patch.dict(environ, dict(ENV_VARS, ASSIGNR_RATE_LIMIT='5'), clear=True)
+    def test_rate_limiter_shared_by_sites(self):
+        context = RunContext()
+        _, assignr = context.get_assignr()
+        self.assertEqual(assignr.rate_limiter.interval, 0.2)
+        site = assignr.for_site({'id': 200, 'name': 'Rec'})
+        self.assertIs(site.rate_limiter, assignr.rate_limiter)
+
+    @patch.dict(environ, ENV_VARS, clear=True)
+    def test_not_limited_by_default(self):
+        _, assignr = RunContext().get_assignr()
+        self.assertIsNone(assignr.rate_limiter)
+
+
+class TestSites(TestCase):
+    @patch.dict(environ, ENV_VARS, clear=True)
+    @patch('assignr.assignr.Assignr.get_sites')
+    def test_first_site_by_default(self, mock_get_sites):
+        context = RunContext()
+        rc, sites = context.get_sites()
+        self.assertEqual(rc, 0)
+        self.assertEqual(sites, [context.get_assignr()[1]])
+        self.assertIsNone(sites[0].session)
+        mock_get_sites.assert_not_called()
+
+    @patch.dict(environ, dict(ENV_VARS, ASSIGNR_SITES='all'), clear=True)
+    @patch('assignr.assignr.Assignr.get_sites', return_value=SITES)
+    def test_all_sites(self, mock_get_sites):
+        context = RunContext()
+        with self.assertLogs(level='INFO') as cm:
+            rc, sites = context.get_sites()
+        self.assertEqual(rc, 0)
+        self.assertEqual([site.site_id for site in sites], [100, 200, 300])
+        self.assertEqual(cm.output,
+                         ['INFO:helpers.context:Reporting on 3 site(s): CYSL, Rec, Travel'])
+        _, assignr = context.get_assignr()
+        for site in sites:
+            self.assertIs(site.session, assignr.session)
+            self.assertIs(site.response_cache, assignr.response_cache)
+        self.assertIs(context.get_sites()[1], sites)
+        mock_get_sites.assert_called_once()
+
+        context.clear()
+        self.assertEqual({id(site.response_cache) for site in sites},
+                         {id(assignr.response_cache)})
+        context.close()
+
+    @patch.dict(environ, dict(ENV_VARS, ASSIGNR_SITES='300, Rec, Shelbyville'), clear=True)
+    @patch('assignr.assignr.Assignr.get_sites', return_value=SITES)
+    def test_selected_sites(self, _):
+        context = RunContext()
+        with self.assertLogs(level='INFO') as cm:
+            rc, sites = context.get_sites()
+        self.assertEqual(rc, 0)
+        self.assertEqual([site.site_name for site in sites], ['Rec', 'Travel'])
+        self.assertIn('ERROR:helpers.context:ASSIGNR_SITES site, Shelbyville not found',
+                      cm.output)
+
+    @patch.dict(environ, dict(ENV_VARS, ASSIGNR_SITES='Shelbyville'), clear=True)
+    @patch('assignr.assignr.Assignr.get_sites', return_value=SITES)
+    def test_no_sites_found(self, _):
+        context = RunContext()
+        with self.assertLogs(level='INFO') as cm:
+            rc, sites = context.get_sites()
+        self.assertEqual(rc, 66)
+        self.assertIsNone(sites)
+        self.assertIn('ERROR:helpers.context:No Assignr sites found', cm.output)
+
+
+class TestContextCheckpoint(TestCase):
+    def test_checkpoint_shared_by_sites(self):
+        with TemporaryDirectory() as temp_dir:
+            context = RunContext()
+            context.assignr = Assignr('123', '234', '345', 'https://base.com/', 'https://auth.com/')
+            context.sites = [context.assignr.for_site({'id': 200, 'name': 'Rec'})]
+            with patch.dict(environ, {'CHECKPOINT_DIR': temp_dir}):
+                checkpoint = context.start_checkpoint('run')
+            self.assertIs(context.sites[0].checkpoint, checkpoint)
+            checkpoint.save(('games',), {'id': 1})
+
+            with patch.dict(environ, {'CHECKPOINT_DIR': temp_dir}):
+                with self.assertLogs(level='INFO') as cm:
+                    checkpoint = context.start_checkpoint('run', resume=True)
+            self.assertEqual(cm.output,
+                             ['INFO:helpers.context:Resuming run run from 1 saved page(s)'])
+
+            context.finish_checkpoint()
+            self.assertEqual(checkpoint.saved_pages(), 0)
+            self.assertIsNone(context.assignr.checkpoint)
+            self.assertIsNone(context.sites[0].checkpoint)
+
+    def test_checkpoint_kept_after_failure(self):
+        with TemporaryDirectory() as temp_dir:
+            context = RunContext()
+            context.assignr = Assignr('123', '234', '345', 'https://base.com/', 'https://auth.com/')
+            with patch.dict(environ, {'CHECKPOINT_DIR': temp_dir}):
+                checkpoint = context.start_checkpoint('run')
+            checkpoint.save(('games',), {'id': 1})
+            with self.assertLogs(level='INFO') as cm:
+                context.finish_checkpoint(completed=False)
+            self.assertEqual(cm.output, ['INFO:helpers.context:Keeping 1 saved page(s)'
+                                         ' of run run, use --resume to continue'])
+            self.assertIsNone(context.assignr.checkpoint)
+
+            with patch.dict(environ, {'CHECKPOINT_DIR': temp_dir}):
+                checkpoint = context.start_checkpoint('run', resume=True)
+            checkpoint.record_failure()
+            with self.assertLogs(level='INFO'):
+                context.finish_checkpoint()
+            self.assertEqual(checkpoint.saved_pages(), 1)
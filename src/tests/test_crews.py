@@ -0,0 +1,90 @@
+from itertools import permutations
+from unittest import TestCase
+
+from helpers.availability_index import AvailabilityIndex
+from helpers.crews import (CrewSolver, solve_assignment)
+
+
+def get_game(game_id, game_time, venue='Park', open_positions=('Referee',),
+             referee_ids=(), game_date='2024-09-07'):
+    return {'id': game_id, 'game_date': game_date, 'game_time': game_time,
+            'venue': venue, 'cancelled': False, 'open_positions': list(open_positions),
+            'referees': [{'id': referee_id, 'first_name': 'Ref', 'last_name': str(referee_id)}
+                         for referee_id in referee_ids]}
+
+def get_index(referees):
+    index = AvailabilityIndex()
+    for referee_id, avail in referees.items():
+        index.add_availability(referee_id, [{'date': '2024-09-07', 'avail': avail}])
+    return index
+
+def get_crew(proposals):
+    return [(proposal['game']['id'], proposal['position'], proposal['referee_id'])
+            for proposal in proposals]
+
+
+class TestSolveAssignment(TestCase):
+    def test_least_cost(self):
+        costs = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+        columns = solve_assignment(costs)
+        self.assertEqual(sorted(columns), [0, 1, 2])
+        self.assertEqual(sum(costs[row][column] for row, column in enumerate(columns)),
+                         min(sum(costs[row][column] for row, column in enumerate(order))
+                             for order in permutations(range(3))))
+
+    def test_more_columns(self):
+        self.assertEqual(solve_assignment([[5, 1, 9, 4], [1, 5, 9, 4]]), [1, 0])
+
+    def test_no_rows(self):
+        self.assertEqual(solve_assignment([]), [])
+
+
+class TestCrewSolver(TestCase):
+    def test_only_available_referees(self):
+        solver = CrewSolver(get_index({1: '8:00 AM - 11:00 AM', 2: '1:00 PM - 6:00 PM'}))
+        proposals = solver.solve([get_game(1, '9:00 AM'), get_game(2, '2:00 PM'),
+                                  get_game(3, '7:00 PM')])
+        self.assertEqual(get_crew(proposals), [(1, 'Referee', 1), (2, 'Referee', 2),
+                                               (3, 'Referee', None)])
+
+    def test_no_overlaps(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY', 2: 'ALL DAY'}))
+        proposals = solver.solve([
+            get_game(1, '9:00 AM', open_positions=('Referee', 'Assistant Referee')),
+            get_game(2, '10:00 AM')])
+        crew = get_crew(proposals)
+        self.assertEqual(sorted(referee_id for _, _, referee_id in crew[:2]), [1, 2])
+        self.assertEqual(crew[2], (2, 'Referee', None))
+
+    def test_existing_assignments_booked(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY', 2: 'ALL DAY'}))
+        proposals = solver.solve([get_game(1, '9:00 AM', referee_ids=(1,))])
+        self.assertEqual(get_crew(proposals), [(1, 'Referee', 2)])
+
+    def test_turnaround_at_another_venue(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY'}))
+        proposals = solver.solve([get_game(1, '9:00 AM', 'Park'),
+                                  get_game(2, '10:45 AM', 'School'),
+                                  get_game(3, '10:45 AM', 'Park', game_date='2024-09-08')])
+        self.assertEqual(get_crew(proposals)[:2], [(1, 'Referee', 1), (2, 'Referee', None)])
+
+    def test_max_games_per_day(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY'}), max_games_per_day=2)
+        proposals = solver.solve([get_game(1, '8:00 AM'), get_game(2, '10:00 AM'),
+                                  get_game(3, '12:00 PM')])
+        self.assertEqual(get_crew(proposals), [(1, 'Referee', 1), (2, 'Referee', 1),
+                                               (3, 'Referee', None)])
+
+    def test_fewer_games_preferred(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY', 2: 'ALL DAY'}))
+        proposals = solver.solve([get_game(1, '8:00 AM', referee_ids=(1,),
+                                           open_positions=()),
+                                  get_game(2, '10:00 AM')])
+        self.assertEqual(get_crew(proposals), [(2, 'Referee', 2)])
+
+    def test_game_without_start(self):
+        solver = CrewSolver(get_index({1: 'ALL DAY'}))
+        with self.assertLogs(level='WARNING') as cm:
+            proposals = solver.solve([get_game(1, None)])
+        self.assertEqual(proposals, [])
+        self.assertIn('WARNING:helpers.crews:Game 1 has no start, not staffed', cm.output)
@@ -109,3 +109,16 @@ class TestEMail(TestCase):
 
         ])
 
+
+    def test_create_email_text_part_and_attachment(self):
+        email_client = EMailClient('test', 587, CONST_SENDER_EMAIL,
+                                   CONST_SENDER_NAME, 'test_password')
+        email = email_client.create_email(
+            CONST_SUBJECT, '<p>html</p>', CONST_EMAIL, True, 'plain text',
+            [{'file_name': 'report.zip', 'maintype': 'application',
+              'subtype': 'zip', 'data': b'PK'}])
+        parts = [part.get_content_type() for part in email.walk()]
+        self.assertEqual(parts, ['multipart/mixed', 'multipart/alternative',
+                                 'text/plain', 'text/html', 'application/zip'])
+        self.assertEqual(email.get_body(('plain',)).get_content().strip(), 'plain text')
+        self.assertEqual(next(email.iter_attachments()).get_filename(), 'report.zip')
@@ -0,0 +1,38 @@
+from unittest import TestCase
+from email_benchmark import (get_arguments, run_benchmark)
+
+ERROR_USAGE = 'ERROR:email_benchmark:USAGE: email_benchmark.py -n <messages>' \
+    ' -r <rows per message> -t <administrator|misconduct|missing_report>'
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [ERROR_USAGE])
+        self.assertEqual(rc, 99)
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-n', '5', '-r', '2', '-t', 'misconduct'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {'messages': 5, 'rows': 2, 'template': 'misconduct'})
+
+    def test_invalid_values(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-n', 'many', '-t', 'unknown'])
+        self.assertEqual(cm.output, [
+            'ERROR:email_benchmark:Messages value, many is invalid',
+            'ERROR:email_benchmark:Template value, unknown is invalid'
+        ])
+        self.assertEqual(rc, 88)
+
+
+class TestRunBenchmark(TestCase):
+    def test_run_benchmark(self):
+        results = run_benchmark(3, 2, 'missing_report')
+        self.assertEqual(results['messages'], 3)
+        self.assertEqual(results['failures'], 0)
+        self.assertEqual(results['connections'], 3)
+        self.assertEqual(results['handshakes'], 3)
+        self.assertGreater(results['bytes_per_message'], 0)
+        self.assertGreater(results['messages_per_second'], 0)
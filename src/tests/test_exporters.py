@@ -0,0 +1,106 @@
+from os import path
+from tempfile import TemporaryDirectory
+from unittest import (TestCase, skipIf)
+from unittest.mock import (patch, MagicMock)
+from importlib.util import find_spec
+import csv
+import json
+import logging
+
+from helpers.exporters import (AVAILABILITY_FIELDS, GAME_FIELDS,
+                               check_export_arguments, get_exporter,
+                               get_game_row, log_to_stderr)
+
+ROWS = [
+    {'referee': 'Homer Simpson', 'referee_id': '1', 'date': '2024-08-01',
+     'availability': 'ALL DAY'},
+    {'referee': 'Marge Simpson', 'referee_id': '2', 'date': '2024-08-02',
+     'availability': '09:00 AM - 12:00 PM', 'extra': 'ignored'}
+]
+
+
+class TestExporters(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_csv(self):
+        output_file = path.join(self.temp_dir.name, 'availability.csv')
+        with get_exporter('csv', output_file, AVAILABILITY_FIELDS) as exporter:
+            for row in ROWS:
+                exporter.write(row)
+        self.assertEqual(exporter.count, 2)
+        with open(output_file, newline='') as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        self.assertEqual(rows[1], {'referee': 'Marge Simpson', 'referee_id': '2',
+                                   'date': '2024-08-02',
+                                   'availability': '09:00 AM - 12:00 PM'})
+
+    def test_ndjson(self):
+        output_file = path.join(self.temp_dir.name, 'availability.ndjson')
+        with get_exporter('ndjson', output_file, AVAILABILITY_FIELDS) as exporter:
+            for row in ROWS:
+                exporter.write(row)
+        with open(output_file) as ndjson_file:
+            rows = [json.loads(line) for line in ndjson_file]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(list(rows[1]), ['referee', 'referee_id', 'date', 'availability'])
+
+    def test_stdout(self):
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with get_exporter('ndjson', None, AVAILABILITY_FIELDS) as exporter:
+                exporter.write(ROWS[0])
+        self.assertEqual(mock_stdout.write.call_args_list[-1].args, ('\n',))
+        mock_stdout.close.assert_not_called()
+
+    def test_log_to_stderr(self):
+        mock_stdout = MagicMock()
+        mock_stderr = MagicMock()
+        handler = logging.StreamHandler(mock_stdout)
+        logging.getLogger().addHandler(handler)
+        try:
+            with patch('helpers.exporters.stdout', mock_stdout), \
+                patch('helpers.exporters.stderr', mock_stderr):
+                log_to_stderr()
+            self.assertIs(handler.stream, mock_stderr)
+        finally:
+            logging.getLogger().removeHandler(handler)
+
+    @skipIf(find_spec('pyarrow') is None, 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        output_file = path.join(self.temp_dir.name, 'availability.parquet')
+        with get_exporter('parquet', output_file, AVAILABILITY_FIELDS,
+                          batch_size=1) as exporter:
+            for row in ROWS:
+                exporter.write(row)
+        parquet_file = pyarrow.parquet.ParquetFile(output_file)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        self.assertEqual(parquet_file.read().to_pylist()[0], ROWS[0])
+
+    def test_check_export_arguments(self):
+        self.assertIsNone(check_export_arguments('csv', None))
+        self.assertEqual(check_export_arguments('xlsx', None),
+                         'Format value, xlsx is invalid')
+        self.assertEqual(check_export_arguments('parquet', None),
+                         'Parquet exports need an output file, use -o')
+        with patch('helpers.exporters.find_spec', return_value=None):
+            self.assertEqual(check_export_arguments('parquet', 'games.parquet'),
+                             'Parquet exports need pyarrow, run pip install pyarrow')
+
+    def test_game_row(self):
+        row = get_game_row({
+            'id': 1, 'league': 'Futsal', 'cancelled': False,
+            'referees': [{'position': 'Referee', 'first_name': 'Homer',
+                          'last_name': 'Simpson'},
+                         {'position': 'AR1', 'first_name': 'Marge',
+                          'last_name': 'Simpson'}],
+            'assignor': {'first_name': 'Ned', 'last_name': 'Flanders'}
+        })
+        self.assertEqual(list(row), [name for name, _ in GAME_FIELDS])
+        self.assertEqual(row['referees'], 'Referee: Homer Simpson; AR1: Marge Simpson')
+        self.assertEqual(row['assignor'], 'Ned Flanders')
+        self.assertIsNone(get_game_row({'id': 2, 'assignor': None})['assignor'])
@@ -0,0 +1,31 @@
+from unittest import TestCase
+from flush_outbox import get_arguments
+
+ERROR_USAGE = 'ERROR:flush_outbox:USAGE: flush_outbox.py -r <retries>'
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, args = get_arguments(['-h'])
+        self.assertEqual(cm.output, [ERROR_USAGE])
+        self.assertEqual(rc, 99)
+        self.assertEqual(args, {'retries': 3})
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-r', '5'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {'retries': 5})
+
+    def test_invalid_options(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-n'])
+        self.assertEqual(cm.output, [ERROR_USAGE])
+        self.assertEqual(rc, 77)
+
+    def test_invalid_retries(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-r', 'abc'])
+        self.assertEqual(cm.output,
+                         ['ERROR:flush_outbox:Retries value, abc is invalid'])
+        self.assertEqual(rc, 88)
@@ -1,9 +1,20 @@
 from datetime import (datetime, timedelta)
+from os import environ
+from tempfile import TemporaryDirectory
 from unittest import TestCase
-from game_report import get_arguments
+from unittest.mock import (patch, MagicMock)
+from game_report import (get_arguments, get_assignor_emails,
+                         get_league_workers, group_reports_by_league,
+                         get_site_reports,
+                         process_assignor_reports,
+                         process_leagues, run, START_DATE, END_DATE,
+                         RESUME)
+from assignr.assignr import Assignr
+from helpers.coach_index import CoachIndex
+from helpers.outbox import Outbox
 
 ERROR_USAGE='ERROR:game_report:USAGE: game_report.py -s <start-date>' \
-    ' -e <end-date> DATE FORMAT=MM/DD/YYYY'
+    ' -e <end-date> --resume DATE FORMAT=MM/DD/YYYY'
 DATE_01012020 = '01/01/2020'
 DATE_01012021 = '01/01/2021'
 DATE_FORMAT_01012020 = datetime.strptime(DATE_01012020, "%m/%d/%Y").date()
@@ -12,7 +23,7 @@ DATE_FORMAT_01012021 = datetime.strptime(DATE_01012021, "%m/%d/%Y").date()
 
 class TestGetArguments(TestCase):
     def test_help(self):
-        expected_args = {'start_date': None, 'end_date': None}
+        expected_args = {'start_date': None, 'end_date': None, 'resume': False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-h'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -22,14 +33,15 @@ class TestGetArguments(TestCase):
     def test_valid_options(self):
         expected_args = {
             'start_date': DATE_FORMAT_01012020,
-            'end_date': DATE_FORMAT_01012021
+            'end_date': DATE_FORMAT_01012021,
+            'resume': False
         }
         rc, args = get_arguments(['-s', DATE_01012020, '-e', DATE_01012021])
         self.assertEqual(rc, 0)
         self.assertEqual(args, expected_args)
 
     def test_invalid_options(self):
-        expected_args = {'start_date': None, 'end_date': None}
+        expected_args = {'start_date': None, 'end_date': None, 'resume': False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-n'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -41,7 +53,8 @@ class TestGetArguments(TestCase):
 
         expected_args = {
             'start_date': start_date,
-            'end_date': DATE_FORMAT_01012020
+            'end_date': DATE_FORMAT_01012020,
+            'resume': False
         }
 
         expected_error = [
@@ -59,7 +72,8 @@ class TestGetArguments(TestCase):
         end_date = datetime.now().date()
         expected_args = {
             'start_date': DATE_FORMAT_01012020,
-            'end_date': end_date
+            'end_date': end_date,
+            'resume': False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', DATE_01012020])
@@ -76,7 +90,8 @@ class TestGetArguments(TestCase):
         start_date = datetime.strptime('01/10/2020', "%m/%d/%Y").date()
         expected_args = {
             'start_date': start_date,
-            'end_date': end_date
+            'end_date': end_date,
+            'resume': False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', '01/10/2020', '-e', DATE_01012020])
@@ -87,3 +102,283 @@ class TestGetArguments(TestCase):
         ])
         self.assertEqual(rc, 88)
         self.assertEqual(args, expected_args)
+
+
+def get_report(report_id, league):
+    return {
+        'report_id': report_id,
+        'league': league,
+        'author': 'Homer Simpson',
+        'game_dt': datetime(2020, 1, 1, 9, 0),
+        'age_group': 'Grade 5/6',
+        'gender': 'Boys',
+        'venue_subvenue': 'Springfield Elementary',
+        'home_team': 'Springfield-1',
+        'away_team': 'Ogdenville-1',
+        'home_team_score': '1',
+        'away_team_score': '2',
+        'home_coach': 'Mr. Burns',
+        'away_coach': 'Mr. Smithers',
+        'officials': [],
+        'assignments_correct': False,
+        'crewChanges': 'AR2 replaced',
+        'narrative': None
+    }
+
+
+class TestAssignorReports(TestCase):
+    def test_group_reports_by_league(self):
+        reports = [get_report(1, 'Springfield'), get_report(2, 'Ogdenville'),
+                   get_report(3, 'Springfield')]
+        result = group_reports_by_league(reports)
+        self.assertEqual(list(result.keys()), ['Springfield', 'Ogdenville'])
+        self.assertEqual([report['report_id'] for report in result['Springfield']],
+                         [1, 3])
+
+    def test_process_assignor_reports_one_email_per_league(self):
+        outbox = MagicMock()
+        reports = [get_report(1, 'Springfield'), get_report(2, 'Ogdenville'),
+                   get_report(3, 'Springfield')]
+        assignors = {
+            'Springfield': [{'email': 'Ned Flanders<ned@simpsons.com>'},
+                            {'email': 'Moe Szyslak<moe@simpsons.com>'}],
+            'Ogdenville': [{'email': 'Lyle Lanley<lyle@simpsons.com>'}]
+        }
+        with self.assertLogs(level='INFO'):
+            process_assignor_reports({}, reports, DATE_FORMAT_01012020,
+                                     DATE_FORMAT_01012021, assignors, outbox)
+
+        self.assertEqual(outbox.add.call_count, 2)
+        key, _ = outbox.add.call_args_list[0][0]
+        message = outbox.add.call_args_list[0][1]['message']
+        send_to = outbox.add.call_args_list[0][1]['send_to']
+        self.assertEqual(key, 'assignor:Springfield:1-3:2020-01-01:2021-01-01')
+        self.assertEqual(send_to,
+                         'Ned Flanders<ned@simpsons.com>,Moe Szyslak<moe@simpsons.com>')
+        self.assertEqual(message.count('<h2>Game Information</h2>'), 2)
+        self.assertIn('Assignor Report: Springfield', message)
+
+
+class TestRun(TestCase):
+    def test_run_stages(self):
+        reports = {
+            'misconducts': [],
+            'admin_reports': [],
+            'assignor_reports': [get_report(1, 'Springfield')]
+        }
+        assignors = {'Springfield': [{'email': 'Ned Flanders<ned@simpsons.com>'}]}
+        context = MagicMock()
+        for method in ('get_environment_vars', 'get_spreadsheet_vars'):
+            getattr(context, method).return_value = (0, {})
+        context.get_email_vars.return_value = (0, {
+            'ADMIN_EMAIL': 'admin@simpsons.com',
+            'MISCONDUCTS_EMAIL': 'misconducts@simpsons.com'
+        })
+        assignr = MagicMock()
+        assignr.classify_reports.return_value = reports
+        context.get_sites.return_value = (0, [assignr])
+        context.get_coaches.return_value = (0, CoachIndex())
+        context.get_assignors.return_value = assignors
+        outbox = context.get_outbox.return_value
+        outbox.flush.return_value = 0
+
+        with self.assertLogs(level='INFO') as cm:
+            rc = run({START_DATE: DATE_FORMAT_01012020,
+                      END_DATE: DATE_FORMAT_01012021,
+                      RESUME: False}, context)
+
+        self.assertEqual(rc, 0)
+        assignr.get_report_pages.assert_called_once_with(DATE_FORMAT_01012020,
+                                                         DATE_FORMAT_01012021)
+        assignr.classify_reports.assert_called_once_with(
+            assignr.get_report_pages.return_value, assignors,
+            context.get_coaches.return_value[1])
+        keys = sorted(call[0][0] for call in outbox.add.call_args_list)
+        self.assertEqual(keys, ['administrator::2020-01-01:2021-01-01',
+                                'assignor:Springfield:1:2020-01-01:2021-01-01',
+                                'misconduct::2020-01-01:2021-01-01'])
+        outbox.flush.assert_called_once()
+        self.assertTrue(any(line.startswith('INFO:helpers.stages:Critical path')
+                            for line in cm.output))
+        context.finish_checkpoint.assert_called_once_with(True)
+
+    def test_run_checkpoint_detached_on_error(self):
+        context = MagicMock()
+        for method in ('get_environment_vars', 'get_spreadsheet_vars',
+                       'get_email_vars'):
+            getattr(context, method).return_value = (0, {})
+        assignr = MagicMock()
+        assignr.get_report_pages.side_effect = ConnectionError('Assignr unavailable')
+        context.get_sites.return_value = (0, [assignr])
+
+        with self.assertRaises(ConnectionError), self.assertLogs(level='INFO'):
+            run({START_DATE: DATE_FORMAT_01012020,
+                 END_DATE: DATE_FORMAT_01012021,
+                 RESUME: False}, context)
+        context.finish_checkpoint.assert_called_once_with(False)
+
+    def get_site_context(self, assignors):
+        context = MagicMock()
+        for method in ('get_environment_vars', 'get_spreadsheet_vars'):
+            getattr(context, method).return_value = (0, {})
+        context.get_email_vars.return_value = (0, {
+            'ADMIN_EMAIL': 'admin@simpsons.com',
+            'MISCONDUCTS_EMAIL': 'misconducts@simpsons.com'
+        })
+        sites = []
+        for site_id, name in ((100, 'CYSL'), (200, 'Rec')):
+            site = MagicMock(site_id=site_id, site_name=name)
+            site.get_report_pages.return_value = [{'site': name}]
+            site.classify_reports.return_value = {
+                'misconducts': [get_report(site_id, 'Springfield')],
+                'admin_reports': [],
+                'assignor_reports': [get_report(site_id + 1, 'Springfield')]
+            }
+            sites.append(site)
+        context.get_sites.return_value = (0, sites)
+        context.get_coaches.return_value = (0, CoachIndex())
+        context.get_assignors.return_value = assignors
+        context.get_outbox.return_value.flush.return_value = 0
+        return context, sites
+
+    @patch.dict(environ, {'SITE_REPORTS': 'merge', 'LEAGUE_WORKERS': '0'})
+    def test_run_sites_merged(self):
+        assignors = {'Springfield': [{'email': 'Ned Flanders<ned@simpsons.com>'}]}
+        context, sites = self.get_site_context(assignors)
+        with self.assertLogs(level='INFO') as cm:
+            rc = run({START_DATE: DATE_FORMAT_01012020,
+                      END_DATE: DATE_FORMAT_01012021,
+                      RESUME: False}, context)
+
+        self.assertEqual(rc, 0)
+        for site in sites:
+            site.get_report_pages.assert_called_once_with(DATE_FORMAT_01012020,
+                                                          DATE_FORMAT_01012021)
+        sites[0].classify_reports.assert_called_once_with(
+            [{'site': 'CYSL'}, {'site': 'Rec'}], assignors,
+            context.get_coaches.return_value[1])
+        sites[1].classify_reports.assert_not_called()
+        outbox = context.get_outbox.return_value
+        keys = sorted(call[0][0] for call in outbox.add.call_args_list)
+        self.assertEqual(keys, ['administrator::2020-01-01:2021-01-01',
+                                'assignor:Springfield:101:2020-01-01:2021-01-01',
+                                'misconduct::2020-01-01:2021-01-01'])
+        self.assertIn('INFO:helpers.stages:Stage report_pages:Rec took',
+                      ' '.join(cm.output))
+
+    @patch.dict(environ, {'SITE_REPORTS': 'split', 'LEAGUE_WORKERS': '0'})
+    def test_run_sites_split(self):
+        assignors = {'Springfield': [{'email': 'Ned Flanders<ned@simpsons.com>'}]}
+        context, sites = self.get_site_context(assignors)
+        with self.assertLogs(level='INFO'):
+            rc = run({START_DATE: DATE_FORMAT_01012020,
+                      END_DATE: DATE_FORMAT_01012021,
+                      RESUME: False}, context)
+
+        self.assertEqual(rc, 0)
+        for site in sites:
+            site.classify_reports.assert_called_once_with(
+                [{'site': site.site_name}], assignors,
+                context.get_coaches.return_value[1])
+        outbox = context.get_outbox.return_value
+        keys = sorted(call[0][0] for call in outbox.add.call_args_list)
+        self.assertEqual(keys, ['administrator:CYSL:2020-01-01:2021-01-01',
+                                'administrator:Rec:2020-01-01:2021-01-01',
+                                'assignor:CYSL:Springfield:101:2020-01-01:2021-01-01',
+                                'assignor:Rec:Springfield:201:2020-01-01:2021-01-01',
+                                'misconduct:CYSL:2020-01-01:2021-01-01',
+                                'misconduct:Rec:2020-01-01:2021-01-01'])
+        subjects = sorted(call[0][1] for call in outbox.add.call_args_list)
+        self.assertTrue(subjects[0].startswith('Administrator Game Reports: CYSL: '))
+        outbox.flush.assert_called_once()
+
+    @patch.dict(environ, {'SITE_REPORTS': 'separate'})
+    def test_invalid_site_reports(self):
+        with self.assertLogs(level='INFO') as cm:
+            self.assertEqual(get_site_reports(), 'merge')
+        self.assertEqual(cm.output, ['ERROR:game_report:SITE_REPORTS value, separate is invalid, merging sites'])
+
+    def test_get_assignor_emails(self):
+        self.assertEqual(get_assignor_emails({
+            'Springfield': [{'email': 'ned@simpsons.com'}],
+            'Ogdenville': [{'email': 'lyle@simpsons.com'}]
+        }), ['ned@simpsons.com', 'lyle@simpsons.com'])
+
+
+def get_submission(report_id, league, misconduct='false', assignments_correct='true'):
+    values = {
+        '.startTime': '2020-01-01T09:00:00-05:00', '.league': league,
+        '.description': None, '.adminReview': 'false',
+        '.misconductCheckbox': misconduct, '.assignmentsCorrect': assignments_correct,
+        '.homeTeamScore': '1', '.awayTeamScore': '2', '.homeTeam': 'Springfield-1',
+        '.awayTeam': 'Ogdenville-1', '.venue': 'Springfield Elementary',
+        '.ageGroup': 'Grade 5/6', '.gender': 'Boys', '.ejections': 'false'
+    }
+    return {
+        'id': report_id,
+        'author_name': 'Homer Simpson',
+        '_embedded': {'values': [{'key': key, 'value': value}
+                                 for key, value in values.items()]}
+    }
+
+
+class TestLeagueWorkers(TestCase):
+    @patch.dict(environ, {'LEAGUE_WORKERS': '4'})
+    def test_get_league_workers(self):
+        self.assertEqual(get_league_workers(), 4)
+
+    @patch.dict(environ, {'LEAGUE_WORKERS': 'many'})
+    def test_get_league_workers_invalid(self):
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(get_league_workers(), 0)
+
+    @patch.dict(environ, {}, clear=True)
+    def test_get_league_workers_default(self):
+        self.assertEqual(get_league_workers(), 0)
+
+    def test_process_leagues(self):
+        pages = [{'_embedded': {'form_submissions': [
+            get_submission(1, 'Springfield', misconduct='true'),
+            get_submission(2, 'Ogdenville', assignments_correct='false'),
+            get_submission(3, 'Springfield', assignments_correct='false')
+        ]}}]
+        assignors = {
+            'Springfield': [{'email': 'Ned Flanders<ned@simpsons.com>'}],
+            'Ogdenville': [{'email': 'Lyle Lanley<lyle@simpsons.com>'}]
+        }
+        email_vars = {'ADMIN_EMAIL': 'admin@simpsons.com',
+                      'MISCONDUCTS_EMAIL': 'misconducts@simpsons.com'}
+        assignr = Assignr('123', '234', '345', 'https://base.com', 'https://auth.com')
+
+        with TemporaryDirectory() as temp_dir:
+            outbox = Outbox(temp_dir)
+            outbox.add('referee_reminder:9:2020-01-01:2021-01-01', 'Reminder',
+                       'reminder', 'bart@simpsons.com')
+            with patch('game_report.send_email', return_value=0) as mock_send_email, \
+                self.assertLogs(level='INFO') as cm:
+                process_leagues(email_vars, pages, assignr, assignors,
+                                CoachIndex(), DATE_FORMAT_01012020,
+                                DATE_FORMAT_01012021, outbox, 2)
+                mock_send_email.assert_not_called()
+                failed = outbox.flush(mock_send_email)
+            self.assertEqual(outbox.pending(), [])
+
+        self.assertEqual(failed, 0)
+        sent = [(call.args[0], call.args[2])
+                for call in mock_send_email.call_args_list]
+        self.assertEqual(len(sent), 4)
+        # Misconducts go first, to every assignor, as when leagues run together
+        self.assertEqual(sent[0], (
+            'Misconduct: Springfield: 01/01/2020 - 01/01/2021',
+            'misconducts@simpsons.com,Ned Flanders<ned@simpsons.com>,'
+            'Lyle Lanley<lyle@simpsons.com>'))
+        self.assertEqual(sorted(sent[1:3]), [
+            ('Game Reports Needing Attention: 01/01/2020 - 01/01/2021',
+             'Lyle Lanley<lyle@simpsons.com>'),
+            ('Game Reports Needing Attention: 01/01/2020 - 01/01/2021',
+             'Ned Flanders<ned@simpsons.com>')
+        ])
+        self.assertEqual(sent[3], ('Reminder', 'bart@simpsons.com'))
+        self.assertTrue(any(line.startswith(
+            'INFO:game_report:League Springfield: 2 game report(s) in ')
+            for line in cm.output))
@@ -2,15 +2,15 @@ from os import environ
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import (patch, MagicMock, ANY)
-from googleapiclient.errors import HttpError
 from helpers import constants
 from helpers.helpers import (get_environment_vars, get_spreadsheet_vars,
                              get_email_vars, format_str_hh_mm,
-                             format_str_mm_dd_yyyy, load_sheet,
-                             rows_to_dict, get_match_count, get_misconducts,
-                             get_referees, get_coaches_name, set_boolean_value,
+                             format_str_mm_dd_yyyy, get_match_count,
+                             get_misconducts,
+                             get_referees, set_boolean_value,
                              format_date_mm_dd_yyyy, format_date_hh_mm,
-                             get_center_referee_info)
+                             get_center_referee_info, create_message,
+                             get_content_hash)
 
 CONST_GRADE_78 = "Grade 7/8"
 CLIENT_SECRET = "client_secret"
@@ -286,57 +286,6 @@ class TestHelpers(TestCase):
             'ERROR:helpers.helpers:Failed to parse date: '
         ])
 
-    @patch('helpers.helpers.build')
-    def test_load_sheet_success(self, mock_build):
-        mock_spreadsheets = MagicMock()
-        mock_values = [['A1', 'B1'], ['A2', 'B2']]  # Sample values
-        mock_spreadsheets.values().get().execute.return_value = {'values': mock_values}
-        mock_service = MagicMock()
-        mock_service.spreadsheets.return_value = mock_spreadsheets
-        mock_build.return_value = mock_service
-
-        sheet_id = 'sheet_id'
-        sheet_range = 'sheet_range'
-        result = load_sheet(sheet_id, sheet_range)
-
-        # Assertions
-        self.assertEqual(result, mock_values)
-
-#    @patch('helpers.helpers.build')
-#    def test_load_sheet_http_error(self, mock_build):
-#        mock_service = MagicMock()
-#        mock_service.spreadsheets().values().get().execute.side_effect = \
-#            HttpError(resp=MagicMock(status=404, ), content='Not Found')
-#        mock_build.return_value = mock_service
-#
-#        sheet_id = 'sheet_id'
-#        sheet_range = 'sheet_range'
-#        with self.assertLogs(level='INFO') as cm:
-#            result = load_sheet(sheet_id, sheet_range)
-#
-#        self.assertEqual(result, [])
-#        self.assertEqual(cm.output, [
-#            'ERROR:helpers.helpers:Failed to parse date: '
-#        ])
-
-    def test_rows_to_dict_success(self):
-        rows = [
-            [CONST_GRADE_78, 'Boys', 'Hanover-1', 'Mickey Mouse'],
-            [CONST_GRADE_78, 'Girls', 'Hanover-1', 'Dumbo'],
-            ['Grade 5/6', 'Boys', 'Hanover-1', 'Bad Coach']
-        ]
-        expected_result = {
-            CONST_GRADE_78: {
-                'Boys': {'Hanover-1': 'Mickey Mouse'}, 
-                'Girls': {'Hanover-1': 'Dumbo'}
-            },
-            'Grade 5/6': {
-                'Boys': {'Hanover-1': 'Bad Coach'}
-            }
-        }
-        result = rows_to_dict(rows)
-        self.assertEqual(result, expected_result)
-
 #    def test_get_referees(self):
 #        payload = [{
 #            'id': 12345,
@@ -582,30 +531,6 @@ class TestHelpers(TestCase):
 
         self.assertEqual(expected_results, get_misconducts(payload))
 
-    def test_get_valid_coach_name(self):
-        coaches = {
-            'Grade 7/8': {
-                'Boys': {
-                    'Isotopes': 'Mr. Burns',
-                    'Springfield': 'Homer Simpson'
-                }
-            }
-        }
-        result = get_coaches_name(coaches, 'Grade 7/8', 'Boys', 'Springfield')
-        self.assertEqual(result, 'Homer Simpson')
-
-    def test_get_invalid_coach_name(self):
-        coaches = {
-            'Grade 7/8': {
-                'Boys': {
-                    'Isotopes': 'Mr. Burns',
-                    'Springfield': 'Homer Simpson'
-                }
-            }
-        }
-        result = get_coaches_name(coaches, 'Grade 7/8', 'Girls', 'Springfield')
-        self.assertEqual(result, 'Unknown')
-
 
 import unittest
 
@@ -642,7 +567,7 @@ class TestFormatDateMMDDYYYY(TestCase):
 
     def test_parser_error(self):
         with self.assertLogs(level='INFO') as cm:
-            with patch('helpers.helpers.parser.ParserError', Exception):
+            with patch('dateutil.parser.ParserError', Exception):
                 date_input = "invalid_date"  # Simulating a parser issue
                 formatted = format_date_mm_dd_yyyy(date_input)
         self.assertIsNone(formatted)
@@ -652,7 +577,7 @@ class TestFormatDateMMDDYYYY(TestCase):
 
     def test_unknown_timezone_warning(self):
         with self.assertLogs(level='INFO') as cm:
-            with patch('helpers.helpers.parser.UnknownTimezoneWarning', Warning):
+            with patch('dateutil.parser.UnknownTimezoneWarning', Warning):
                 date_input = "invalid_time_zone"  # Simulating an unknown timezone
                 formatted = format_date_mm_dd_yyyy(date_input)
         self.assertIsNone(formatted)
@@ -677,7 +602,7 @@ class TestFormatDateHHMM(TestCase):
 
     def test_parser_error(self):
         with self.assertLogs(level='INFO') as cm:
-            with patch('helpers.helpers.parser.ParserError', Exception):
+            with patch('dateutil.parser.ParserError', Exception):
                 date_input = "invalid_date"  # Simulating a parser issue
                 formatted = format_date_hh_mm(date_input)
         self.assertIsNone(formatted)
@@ -759,3 +684,39 @@ class TestGetCenterRefereeInfo(TestCase):
 
         result = get_center_referee_info(payload)
         self.assertEqual(result, expected_result)
+
+
+class TestCreateMessage(TestCase):
+    def test_content_hash_ignores_key_order(self):
+        first = get_content_hash('assignor.html.jinja', {'a': 1, 'b': [1, 2]})
+        second = get_content_hash('assignor.html.jinja', {'b': [1, 2], 'a': 1})
+        self.assertEqual(first, second)
+
+    def test_content_hash_includes_template(self):
+        content = {'reports': []}
+        self.assertNotEqual(get_content_hash('administrator.html.jinja', content),
+                            get_content_hash('missing_report.html.jinja', content))
+
+    @patch('helpers.helpers.get_jinja_environment')
+    def test_identical_content_rendered_once(self, mock_environment):
+        mock_environment.return_value.get_template.return_value.render.return_value = 'rendered'
+        content = {'reports': ['unique render test']}
+        self.assertEqual(create_message(content, 'administrator.html.jinja'), 'rendered')
+        self.assertEqual(create_message(dict(content), 'administrator.html.jinja'), 'rendered')
+        mock_environment.return_value.get_template.return_value.render.assert_called_once()
+
+    @patch('helpers.helpers.get_jinja_environment')
+    def test_unhashable_content_rendered_uncached(self, mock_environment):
+        mock_environment.return_value.get_template.return_value.render.return_value = 'rendered'
+        content = {('Grade 7/8', 'Boys'): 1, 2: 'mixed keys'}
+        self.assertEqual(create_message(content, 'administrator.html.jinja'), 'rendered')
+        self.assertEqual(create_message(content, 'administrator.html.jinja'), 'rendered')
+        self.assertEqual(
+            mock_environment.return_value.get_template.return_value.render.call_count, 2)
+
+    def test_missing_template(self):
+        with self.assertLogs(level='INFO') as cm:
+            result = create_message({}, 'missing.html.jinja')
+        self.assertIsNone(result)
+        self.assertEqual(len(cm.output), 1)
+        self.assertIn('ERROR:helpers.helpers:Missing File:', cm.output[0])
@@ -0,0 +1,69 @@
+from os import path
+from sys import executable
+from unittest import TestCase
+import subprocess
+from import_benchmark import (get_arguments, parse_import_times, run_benchmark)
+
+ERROR_USAGE = 'ERROR:import_benchmark:USAGE: import_benchmark.py -e <entry point>' \
+    ' -n <runs> -t <slowest imports listed>'
+SAMPLE_REPORT = """import time: self [us] | cumulative | imported package
+import time:       202 |        202 |   _io
+import time:       900 |       1102 | site
+import time:       300 |        300 |     urllib3
+import time:       500 |        800 |   requests
+import time:       100 |        100 |   getopt
+import time:       250 |       1150 | availability
+"""
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [ERROR_USAGE])
+        self.assertEqual(rc, 99)
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-e', 'availability', '-n', '2', '-t', '3'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {'entry_point': 'availability', 'runs': 2, 'top': 3})
+
+    def test_invalid_values(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-e', 'unknown', '-n', 'many'])
+        self.assertEqual(cm.output, [
+            'ERROR:import_benchmark:Runs value, many is invalid',
+            'ERROR:import_benchmark:Entry point value, unknown is invalid'
+        ])
+        self.assertEqual(rc, 88)
+
+
+class TestParseImportTimes(TestCase):
+    def test_parse_import_times(self):
+        self.assertEqual(parse_import_times(SAMPLE_REPORT), {
+            'site': {'cumulative': 1102, 'imports': {'_io': 202}},
+            'availability': {'cumulative': 1150,
+                             'imports': {'requests': 800, 'getopt': 100}}
+        })
+
+    def test_run_benchmark(self):
+        result = run_benchmark('flush_outbox', 1)
+        self.assertGreater(result['cumulative'], 0)
+        self.assertIn('helpers.context', result['imports'])
+
+
+class TestLazyImports(TestCase):
+    def get_loaded_modules(self, entry_point):
+        result = subprocess.run(
+            [executable, '-c', f'import sys, {entry_point}; print(" ".join(sys.modules))'],
+            cwd=path.dirname(path.dirname(path.realpath(__file__))),
+            capture_output=True, text=True, check=True)
+        return result.stdout.split()
+
+    def test_heavy_dependencies_not_loaded(self):
+        for entry_point in ('availability', 'score_sheet', 'missing_game_reports',
+                            'flush_outbox'):
+            with self.subTest(entry_point=entry_point):
+                modules = self.get_loaded_modules(entry_point)
+                for module in ('googleapiclient', 'google.auth', 'jinja2', 'dateutil'):
+                    self.assertNotIn(module, modules)
@@ -1,13 +1,16 @@
-from os import environ
 from datetime import (datetime, timedelta)
+from tempfile import TemporaryDirectory
 from helpers import constants
-from missing_game_reports import get_arguments, main
+from helpers.outbox import Outbox
+from missing_game_reports import (get_arguments, main,
+                                  group_games_by_recipient,
+                                  send_referee_digests)
 
 from unittest import TestCase
 from unittest.mock import (patch, MagicMock)
 
 ERROR_USAGE='ERROR:missing_game_reports:USAGE: missing_game_reports.py -s <start-date>' \
-    ' -e <end-date> DATE FORMAT=MM/DD/YYYY -r'
+    ' -e <end-date> DATE FORMAT=MM/DD/YYYY -r -d --resume'
 DATE_01012020 = '01/01/2020'
 DATE_01012021 = '01/01/2021'
 DATE_FORMAT_01012020 = datetime.strptime(DATE_01012020, "%m/%d/%Y").date()
@@ -15,6 +18,8 @@ DATE_FORMAT_01012021 = datetime.strptime(DATE_01012021, "%m/%d/%Y").date()
 START_DATE = 'start_date'
 END_DATE = 'end_date'
 REFEREE_REMINDER = 'referee_reminder'
+REFEREE_DIGEST = 'referee_digest'
+RESUME = 'resume'
 CLIENT_SECRET = "client_secret"
 CLIENT_ID = "client_id"
 CLIENT_SCOPE = "client_scope"
@@ -30,7 +35,8 @@ EMAIL_PASSWORD = "email_password"
 class TestGetArguments(TestCase):
     def test_help(self):
         expected_args = {START_DATE: None, END_DATE: None,
-                         REFEREE_REMINDER: False}
+                         REFEREE_REMINDER: False, REFEREE_DIGEST: False,
+                         RESUME: False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-h'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -41,14 +47,18 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: DATE_FORMAT_01012020,
             END_DATE: DATE_FORMAT_01012021,
-            REFEREE_REMINDER: True
+            REFEREE_REMINDER: True,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
         rc, args = get_arguments(['-s', DATE_01012020, '-e', DATE_01012021, '-r'])
         self.assertEqual(rc, 0)
         self.assertEqual(args, expected_args)
 
     def test_invalid_options(self):
-        expected_args = {START_DATE: None, END_DATE: None, REFEREE_REMINDER: False}
+        expected_args = {START_DATE: None, END_DATE: None, REFEREE_REMINDER: False,
+                         REFEREE_DIGEST: False,
+                         RESUME: False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-n'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -61,7 +71,9 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: start_date,
             END_DATE: DATE_FORMAT_01012020,
-            REFEREE_REMINDER: True
+            REFEREE_REMINDER: True,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-e', DATE_01012020, '-r'])
@@ -78,7 +90,9 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: DATE_FORMAT_01012020,
             END_DATE: end_date,
-            REFEREE_REMINDER: True
+            REFEREE_REMINDER: True,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', DATE_01012020, '-r'])
@@ -94,7 +108,9 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: DATE_FORMAT_01012020,
             END_DATE: DATE_FORMAT_01012021,
-            REFEREE_REMINDER: False
+            REFEREE_REMINDER: False,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
         rc, args = get_arguments(['-s', DATE_01012020, '-e', DATE_01012021])
         self.assertEqual(rc, 0)
@@ -104,7 +120,9 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: '01-01-1980',
             END_DATE: '01010101',
-            REFEREE_REMINDER: False
+            REFEREE_REMINDER: False,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
 
         with self.assertLogs(level='INFO') as cm:
@@ -122,7 +140,9 @@ class TestGetArguments(TestCase):
         expected_args = {
             START_DATE: start_date,
             END_DATE: end_date,
-            REFEREE_REMINDER: True
+            REFEREE_REMINDER: True,
+            REFEREE_DIGEST: False,
+            RESUME: False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', '01/10/2020', '-e', DATE_01012020, '-r'])
@@ -134,57 +154,138 @@ class TestGetArguments(TestCase):
         self.assertEqual(rc, 88)
         self.assertEqual(args, expected_args)
 
+    def test_digest_option(self):
+        expected_args = {
+            START_DATE: DATE_FORMAT_01012020,
+            END_DATE: DATE_FORMAT_01012021,
+            REFEREE_REMINDER: True,
+            REFEREE_DIGEST: True,
+            RESUME: False
+        }
+        rc, args = get_arguments(['-s', DATE_01012020, '-e', DATE_01012021, '-d'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, expected_args)
+
+
+def get_game(game_id, referee_email, assignor_email):
+    return {
+        'id': game_id,
+        'game_date': '01/01/2020',
+        'game_time': '09:00 AM',
+        'age_group': 'Grade 5/6',
+        'gender': 'Boys',
+        'venue': {'name': 'Springfield Elementary'},
+        'sub_venue': 'Field 1',
+        'game_report_url': None,
+        'home_roster': None,
+        'away_roster': None,
+        'referees': [{
+            'position': 'Referee',
+            'first_name': 'Homer',
+            'last_name': 'Simpson',
+            'email_addresses': [referee_email]
+        }],
+        'assignor': {'email_addresses': [assignor_email]}
+    }
+
+
+class TestRefereeDigest(TestCase):
+    def test_group_games_by_recipient(self):
+        games = [
+            get_game(1, 'homer@simpsons.com', 'ned@simpsons.com'),
+            get_game(2, 'marge@simpsons.com', 'ned@simpsons.com'),
+            get_game(3, 'homer@simpsons.com', 'ned@simpsons.com')
+        ]
+        result = group_games_by_recipient(games)
+        self.assertEqual(len(result), 2)
+        homer_games = result[('homer@simpsons.com', 'ned@simpsons.com')]['games']
+        self.assertEqual([game['id'] for game in homer_games], [1, 3])
+        self.assertEqual(
+            result[('marge@simpsons.com', 'ned@simpsons.com')]['referee']['first_name'],
+            'Homer')
+
+    def test_group_games_by_recipient_different_assignor(self):
+        games = [
+            get_game(1, 'homer@simpsons.com', 'ned@simpsons.com'),
+            get_game(2, 'homer@simpsons.com', 'moe@simpsons.com')
+        ]
+        result = group_games_by_recipient(games)
+        self.assertEqual(len(result), 2)
+
+    def test_send_referee_digests(self):
+        outbox = MagicMock()
+        games = [
+            get_game(1, 'homer@simpsons.com', 'ned@simpsons.com'),
+            get_game(3, 'homer@simpsons.com', 'ned@simpsons.com')
+        ]
+        with self.assertLogs(level='INFO') as cm:
+            send_referee_digests(games, outbox, 'Subject',
+                                 DATE_FORMAT_01012020, DATE_FORMAT_01012021)
+        outbox.add.assert_called_once()
+        key, subject = outbox.add.call_args[0]
+        self.assertEqual(key, 'referee_digest:1-3:2020-01-01:2021-01-01')
+        self.assertEqual(outbox.add.call_args[1]['send_to'],
+                         'homer@simpsons.com,ned@simpsons.com')
+        self.assertEqual(outbox.add.call_args[1]['message'].count('Complete the game report'), 2)
+        self.assertIn('Hi Homer,', outbox.add.call_args[1]['message'])
+        self.assertIn('Complete the game report', outbox.add.call_args[1]['text'])
+        self.assertEqual(cm.output, [
+            'INFO:missing_game_reports:Queued 1 referee digest(s) for 2 game(s)'
+        ])
+
 
 class TestMainFunction(TestCase):
-    @patch.dict(environ,
-        {
-            constants.CLIENT_SECRET: CLIENT_SECRET,
-            constants.CLIENT_ID: CLIENT_ID,
-            constants.CLIENT_SCOPE: CLIENT_SCOPE,
-            constants.AUTH_URL: AUTH_URL,
-            constants.BASE_URL: BASE_URL,
-            constants.EMAIL_SERVER: EMAIL_SERVER,
-            constants.EMAIL_PORT: EMAIL_PORT,
-            constants.EMAIL_USERNAME: EMAIL_USERNAME,
-            constants.EMAIL_PASSWORD: EMAIL_PASSWORD,
-            constants.ADMIN_EMAIL: ADMIN_EMAIL,
-            constants.MISCONDUCTS_EMAIL: MISCONDUCTS_EMAIL
-        }, clear=True)
-    @patch('missing_game_reports.get_arguments')
-    @patch('assignr.assignr.Assignr')
-    @patch('helpers.helpers.get_assignor_information')
-    @patch('helpers.helpers.create_message')
-    @patch('missing_game_reports.send_email')
-    def test_main_success(self, mock_send_email, mock_create_message,
-                          mock_get_assignor_information, mock_assignr,
-                          mock_get_arguments):
-        # Mock return values
-        mock_get_arguments.return_value = (0, {'START_DATE': '2023-09-01',
-                                               'END_DATE': '2023-09-22', 
-                                               'REFEREE_REMINDER': False})
-        
-        # Mock Assignr instance
-        mock_assignr_instance = MagicMock()
-        mock_assignr_instance.get_game_ids.return_value = {
-            1: {'cancelled': False, 'game_report_url': None, 'home_roster': True, 'away_roster': False}
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.args = {START_DATE: DATE_FORMAT_01012020, END_DATE: DATE_FORMAT_01012021,
+                     REFEREE_REMINDER: False, REFEREE_DIGEST: False, RESUME: False}
+        self.assignr = MagicMock()
+        self.context = MagicMock()
+        self.context.get_environment_vars.return_value = (0, {})
+        self.context.get_email_vars.return_value = (0, {constants.ADMIN_EMAIL: ADMIN_EMAIL})
+        self.context.get_assignr.return_value = (0, self.assignr)
+        self.context.load_users.return_value = (0, self.assignr)
+        self.context.get_assignors.return_value = {
+            'association_1': [{'email': 'assignor1@example.com'},
+                              {'email': 'assignor2@example.com'}]
         }
-        mock_assignr_instance.match_games_to_reports.return_value = mock_assignr_instance.get_game_ids.return_value
-        mock_assignr.return_value = mock_assignr_instance
+        self.context.get_outbox.return_value = Outbox(self.temp_dir.name)
 
-        mock_get_assignor_information.return_value = {
-            'association_1': [{'email': 'assignor1@example.com'}, {'email': 'assignor2@example.com'}]
-        }
-        
-        mock_create_message.return_value = 'Email Message'
-        mock_send_email.return_value = None  # No error
+    def tearDown(self):
+        self.temp_dir.cleanup()
 
-        main()
+    def set_games(self, games):
+        self.assignr.get_game_ids.return_value = games
+        self.assignr.match_games_to_reports.return_value = games
 
-        mock_get_arguments.assert_called_once()
-        mock_assignr_instance.get_game_ids.assert_called_once_with('2023-09-01', '2023-09-22')
-        mock_assignr_instance.match_games_to_reports.assert_called_once_with('2023-09-01', '2023-09-22', mock_assignr_instance.get_game_ids.return_value)
-        mock_create_message.assert_called()
-        mock_send_email.assert_called()
+    @patch('missing_game_reports.get_arguments')
+    @patch('missing_game_reports.RunContext')
+    @patch('missing_game_reports.build_report_message',
+           return_value={'message': 'Email Message'})
+    @patch('missing_game_reports.send_email', return_value=0)
+    def test_main_success(self, mock_send_email, mock_build_report_message,
+                          mock_run_context, mock_get_arguments):
+        mock_get_arguments.return_value = (0, self.args)
+        mock_run_context.return_value = self.context
+        self.set_games({
+            1: {'cancelled': False, 'game_report_url': None, 'home_roster': True,
+                'away_roster': False}
+        })
+
+        with self.assertLogs(level='INFO') as cm:
+            main()
+
+        self.assignr.get_game_ids.assert_called_once_with(DATE_FORMAT_01012020,
+                                                          DATE_FORMAT_01012021)
+        self.assignr.match_games_to_reports.assert_called_once_with(
+            DATE_FORMAT_01012020, DATE_FORMAT_01012021,
+            self.assignr.get_game_ids.return_value)
+        self.assertEqual(len(mock_build_report_message.call_args.args[0]['reports']), 1)
+        mock_send_email.assert_called_once()
+        self.assertEqual(mock_send_email.call_args.args[3], ADMIN_EMAIL)
+        self.context.finish_checkpoint.assert_called_once_with(True)
+        self.context.close.assert_called_once()
+        self.assertIn('INFO:missing_game_reports:Completed Missing Game Report', cm.output)
 
     @patch('missing_game_reports.get_arguments')
     def test_main_get_arguments_failure(self, mock_get_arguments):
@@ -197,57 +298,41 @@ class TestMainFunction(TestCase):
         mock_get_arguments.assert_called_once()
 
     @patch('missing_game_reports.get_arguments')
-    @patch('helpers.helpers.get_environment_vars')
-    def test_main_get_environment_vars_failure(self, mock_get_env_vars, mock_get_arguments):
-        mock_get_arguments.return_value = (0, {'START_DATE': '2023-09-01', 'END_DATE': '2023-09-22', 'REFEREE_REMINDER': False})
-        
-        mock_get_env_vars.return_value = (1, None)
+    @patch('missing_game_reports.RunContext')
+    def test_main_get_environment_vars_failure(self, mock_run_context, mock_get_arguments):
+        mock_get_arguments.return_value = (0, self.args)
+        mock_run_context.return_value = self.context
+        self.context.get_environment_vars.return_value = (66, None)
 
-        with self.assertRaises(SystemExit) as cm:
+        with self.assertRaises(SystemExit) as cm, self.assertLogs(level='INFO'):
             main()
 
         # Assert that the script exits with the correct return code
-        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(cm.exception.code, 66)
         mock_get_arguments.assert_called_once()
-        mock_get_env_vars.assert_called_once()
+        self.context.get_environment_vars.assert_called_once()
+        self.context.start_checkpoint.assert_not_called()
+        self.context.close.assert_called_once()
 
     @patch('missing_game_reports.get_arguments')
-    @patch('helpers.helpers.get_environment_vars')
-    @patch('helpers.helpers.get_email_vars')
-    @patch('assignr.assignr.Assignr')
-    @patch('helpers.helpers.get_assignor_information')
-    @patch('helpers.helpers.create_message')
-    @patch('missing_game_reports.send_email')
-    def test_main_no_missing_reports(self, mock_send_email, mock_create_message, mock_get_assignor_information, mock_assignr, mock_get_email_vars, mock_get_env_vars, mock_get_arguments, mock_logger):
-        # Mock return values
-        mock_get_arguments.return_value = (0, {'START_DATE': '2023-09-01', 'END_DATE': '2023-09-22', 'REFEREE_REMINDER': False})
-        mock_get_env_vars.return_value = (0, {
-            'CLIENT_ID': 'client_id',
-            'CLIENT_SECRET': 'client_secret',
-            'CLIENT_SCOPE': 'scope',
-            'BASE_URL': 'base_url',
-            'AUTH_URL': 'auth_url'
+    @patch('missing_game_reports.RunContext')
+    @patch('missing_game_reports.build_report_message',
+           return_value={'message': 'Email Message'})
+    @patch('missing_game_reports.send_email', return_value=0)
+    def test_main_no_missing_reports(self, mock_send_email, mock_build_report_message,
+                                     mock_run_context, mock_get_arguments):
+        mock_get_arguments.return_value = (0, self.args)
+        mock_run_context.return_value = self.context
+        self.set_games({
+            1: {'cancelled': False, 'game_report_url': 'http://report_url',
+                'home_roster': True, 'away_roster': True}
         })
-        mock_get_email_vars.return_value = (0, 'email_vars')
-        
-        # Mock Assignr instance
-        mock_assignr_instance = MagicMock()
-        mock_assignr_instance.get_game_ids.return_value = {
-            1: {'cancelled': False, 'game_report_url': 'http://report_url', 'home_roster': True, 'away_roster': True}
-        }
-        mock_assignr_instance.match_games_to_reports.return_value = mock_assignr_instance.get_game_ids.return_value
-        mock_assignr.return_value = mock_assignr_instance
 
-        mock_get_assignor_information.return_value = {
-            'association_1': [{'email': 'assignor1@example.com'}, {'email': 'assignor2@example.com'}]
-        }
-        
-        mock_create_message.return_value = 'Email Message'
-        mock_send_email.return_value = None  # No error
-
-        main()
+        with self.assertLogs(level='INFO') as cm:
+            main()
 
-        # Assertions
-        mock_send_email.assert_called_once()  # No missing reports, so no second email should be sent
-        mock_create_message.assert_called()
-        mock_logger.info.assert_called_with("Completed Missing Game Report")
+        # Only the administrator report is sent, listing no games
+        mock_send_email.assert_called_once()
+        self.assertEqual(mock_build_report_message.call_args.args[0]['reports'], [])
+        self.assertEqual(cm.output[-1],
+                         'INFO:missing_game_reports:Completed Missing Game Report')
@@ -0,0 +1,251 @@
+from os import listdir
+from tempfile import TemporaryDirectory
+from datetime import date
+from smtplib import SMTPServerDisconnected
+from unittest import TestCase
+from unittest.mock import MagicMock
+from helpers.outbox import (Outbox, Quota, get_idempotency_key, get_priority,
+                            merge_recipients, remove_recipients, PENDING, SENT,
+                            PRIORITY_MISCONDUCT, PRIORITY_REFEREE_REMINDER)
+
+CONST_SUBJECT = 'Test Subject'
+CONST_MESSAGE = '<p>Test Message</p>'
+CONST_ADMIN_MESSAGE = '<p>Test Admin Message</p>'
+CONST_SEND_TO = 'Homer Simpson<homer@simpsons.com>'
+CONST_KEY = 'misconduct::2024-01-01:2024-01-08'
+
+
+class TestIdempotencyKey(TestCase):
+    def test_key_without_item(self):
+        result = get_idempotency_key('misconduct', date(2024, 1, 1),
+                                     date(2024, 1, 8))
+        self.assertEqual(result, CONST_KEY)
+
+    def test_key_with_item(self):
+        result = get_idempotency_key('assignor', date(2024, 1, 1),
+                                     date(2024, 1, 8), 948093)
+        self.assertEqual(result, 'assignor:948093:2024-01-01:2024-01-08')
+
+
+class TestRecipients(TestCase):
+    def test_merge_recipients_removes_duplicates(self):
+        result = merge_recipients('Homer Simpson<homer@simpsons.com>,ned@simpsons.com',
+                                  'HOMER@simpsons.com, moe@simpsons.com')
+        self.assertEqual(result, 'Homer Simpson<homer@simpsons.com>,'
+                                 'ned@simpsons.com,moe@simpsons.com')
+
+    def test_remove_recipients(self):
+        result = remove_recipients('homer@simpsons.com,Ned Flanders<ned@simpsons.com>',
+                                   'Homer Simpson<homer@simpsons.com>')
+        self.assertEqual(result, 'Ned Flanders<ned@simpsons.com>')
+
+
+class TestOutbox(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.outbox = Outbox(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_add_creates_pending_entry(self):
+        self.assertTrue(self.outbox.add(CONST_KEY, CONST_SUBJECT,
+                                        CONST_MESSAGE, CONST_SEND_TO))
+        pending = self.outbox.pending()
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(pending[0]['status'], PENDING)
+        self.assertEqual(pending[0]['send_to'], CONST_SEND_TO)
+        self.assertEqual(len(listdir(self.temp_dir.name)), 1)
+
+    def test_add_same_key_replaces_pending(self):
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, 'updated', CONST_SEND_TO)
+        pending = self.outbox.pending()
+        self.assertEqual(len(pending), 1)
+        self.assertEqual(pending[0]['message'], 'updated')
+
+    def test_flush_marks_sent(self):
+        send = MagicMock(return_value=0)
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        failed = self.outbox.flush(send, backoff=0)
+        self.assertEqual(failed, 0)
+        send.assert_called_once_with(CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.assertEqual(self.outbox.pending(), [])
+        self.assertEqual(self.outbox.entries()[0]['status'], SENT)
+
+    def test_add_after_sent_is_skipped(self):
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.flush(MagicMock(return_value=0), backoff=0)
+        with self.assertLogs(level='INFO') as cm:
+            result = self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE,
+                                     CONST_SEND_TO)
+        self.assertFalse(result)
+        self.assertIn(f'Skipping {CONST_KEY}, already sent', cm.output[0])
+        self.assertEqual(self.outbox.pending(), [])
+
+    def test_flush_retries_then_succeeds(self):
+        send = MagicMock(side_effect=[SMTPServerDisconnected('gone'), 0])
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO'):
+            failed = self.outbox.flush(send, retries=3, backoff=0)
+        self.assertEqual(failed, 0)
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(self.outbox.entries()[0]['attempts'], 2)
+
+    def test_flush_leaves_failures_pending(self):
+        send = MagicMock(return_value=44)
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                        CONST_ADMIN_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO'):
+            failed = self.outbox.flush(send, retries=2, backoff=0)
+        self.assertEqual(failed, 2)
+        self.assertEqual(send.call_count, 4)
+        self.assertEqual(len(self.outbox.pending()), 2)
+
+    def test_rerun_only_sends_pending(self):
+        first_send = MagicMock(side_effect=[0, 44])
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                        CONST_ADMIN_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO'):
+            self.outbox.flush(first_send, retries=1, backoff=0)
+
+        second_send = MagicMock(return_value=0)
+        rerun = Outbox(self.temp_dir.name)
+        rerun.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        rerun.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                  CONST_ADMIN_MESSAGE, CONST_SEND_TO)
+        rerun.flush(second_send, backoff=0)
+        second_send.assert_called_once()
+        self.assertEqual(rerun.pending(), [])
+
+    def test_purge_removes_old_sent_entries(self):
+        outbox = Outbox(self.temp_dir.name, retention_days=-1)
+        outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        outbox.flush(MagicMock(return_value=0), backoff=0)
+        self.assertEqual(listdir(self.temp_dir.name), [])
+
+    def test_identical_content_is_merged(self):
+        send = MagicMock(return_value=0)
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO') as cm:
+            self.outbox.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                            CONST_MESSAGE, 'ned@simpsons.com,homer@simpsons.com')
+        self.assertEqual(cm.output, [
+            f'INFO:helpers.outbox:Merged admin::2024-01-01:2024-01-08 into {CONST_KEY}, same content'
+        ])
+        self.outbox.flush(send, backoff=0)
+        send.assert_called_once_with(CONST_SUBJECT, CONST_MESSAGE,
+                                     f'{CONST_SEND_TO},ned@simpsons.com')
+
+    def test_identical_content_not_resent(self):
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.flush(MagicMock(return_value=0), backoff=0)
+
+        rerun = Outbox(self.temp_dir.name)
+        with self.assertLogs(level='INFO') as cm:
+            result = rerun.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                               CONST_MESSAGE, 'homer@simpsons.com')
+        self.assertFalse(result)
+        self.assertEqual(cm.output, [
+            'INFO:helpers.outbox:Skipping admin::2024-01-01:2024-01-08, identical content already sent'
+        ])
+
+    def test_identical_content_sent_to_new_recipients(self):
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        self.outbox.flush(MagicMock(return_value=0), backoff=0)
+
+        send = MagicMock(return_value=0)
+        self.outbox.add('admin::2024-01-01:2024-01-08', CONST_SUBJECT,
+                        CONST_MESSAGE, f'{CONST_SEND_TO},ned@simpsons.com')
+        self.outbox.flush(send, backoff=0)
+        send.assert_called_once_with(CONST_SUBJECT, CONST_MESSAGE,
+                                     'ned@simpsons.com')
+
+    def test_text_and_attachments_are_passed_to_send(self):
+        send = MagicMock(return_value=0)
+        attachments = [{'file_name': 'report.zip', 'maintype': 'application',
+                        'subtype': 'zip', 'data': b'PK\x03\x04'}]
+        self.outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO,
+                        'plain text', attachments)
+        Outbox(self.temp_dir.name).flush(send, backoff=0)
+        send.assert_called_once_with(CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO,
+                                     text='plain text', attachments=attachments)
+
+
+class TestPriority(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_priority(self):
+        self.assertEqual(get_priority(CONST_KEY), PRIORITY_MISCONDUCT)
+        self.assertEqual(get_priority('referee_digest:1-2:2024-01-01:2024-01-08'),
+                         PRIORITY_REFEREE_REMINDER)
+
+    def test_misconducts_sent_first(self):
+        outbox = Outbox(self.temp_dir.name)
+        send = MagicMock(return_value=0)
+        outbox.add('referee_reminder:1:2024-01-01:2024-01-08', CONST_SUBJECT,
+                   'reminder', CONST_SEND_TO)
+        outbox.add('administrator::2024-01-01:2024-01-08', CONST_SUBJECT,
+                   'admin', CONST_SEND_TO)
+        outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        outbox.flush(send, backoff=0)
+        self.assertEqual([call[0][1] for call in send.call_args_list],
+                         [CONST_MESSAGE, 'admin', 'reminder'])
+
+    def test_quota_defers_bulk_emails(self):
+        outbox = Outbox(self.temp_dir.name, daily_quota=3, quota_reserve=1)
+        send = MagicMock(return_value=0)
+        outbox.add('referee_reminder:1:2024-01-01:2024-01-08', CONST_SUBJECT,
+                   'reminder', 'homer@simpsons.com,ned@simpsons.com')
+        outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO') as cm:
+            failed = outbox.flush(send, backoff=0)
+        self.assertEqual(failed, 0)
+        send.assert_called_once()
+        self.assertIn('WARNING:helpers.outbox:Daily email quota reached, 1 email(s) deferred',
+                      cm.output)
+        self.assertEqual(len(outbox.pending()), 1)
+
+    def test_quota_reserve_kept_for_misconducts(self):
+        outbox = Outbox(self.temp_dir.name, daily_quota=2, quota_reserve=1)
+        send = MagicMock(return_value=0)
+        outbox.add('referee_reminder:1:2024-01-01:2024-01-08', CONST_SUBJECT,
+                   'reminder', 'homer@simpsons.com')
+        outbox.flush(send, backoff=0)
+
+        rerun = Outbox(self.temp_dir.name, daily_quota=2, quota_reserve=1)
+        rerun.add('referee_reminder:2:2024-01-01:2024-01-08', CONST_SUBJECT,
+                  'reminder 2', 'ned@simpsons.com')
+        rerun.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+        with self.assertLogs(level='INFO'):
+            rerun.flush(send, backoff=0)
+        self.assertEqual([call[0][1] for call in send.call_args_list],
+                         ['reminder', CONST_MESSAGE])
+
+    def test_quota_returned_when_send_fails(self):
+        outbox = Outbox(self.temp_dir.name, daily_quota=1)
+        with self.assertLogs(level='INFO'):
+            outbox.add(CONST_KEY, CONST_SUBJECT, CONST_MESSAGE, CONST_SEND_TO)
+            outbox.flush(MagicMock(return_value=44), retries=1, backoff=0)
+        self.assertEqual(outbox.quota.sent, 0)
+        with self.assertLogs(level='INFO'):
+            failed = outbox.flush(MagicMock(return_value=0), backoff=0)
+        self.assertEqual(failed, 0)
+        self.assertEqual(outbox.quota.sent, 1)
+
+    def test_quota_resets_each_day(self):
+        quota_file = f'{self.temp_dir.name}/quota.state'
+        with open(quota_file, 'w') as file:
+            file.write('{"date": "2000-01-01", "sent": 100}')
+        quota = Quota(quota_file, daily_limit=10)
+        self.assertEqual(quota.sent, 0)
+        self.assertTrue(quota.allows(10, PRIORITY_REFEREE_REMINDER))
+        quota.record(10)
+        self.assertFalse(Quota(quota_file, daily_limit=10).allows(
+            1, PRIORITY_MISCONDUCT))
@@ -0,0 +1,36 @@
+from os import environ
+from unittest import TestCase
+from unittest.mock import patch
+
+from helpers.rate_limiter import (RateLimiter, get_rate_limiter)
+
+
+class TestRateLimiter(TestCase):
+    @patch('helpers.rate_limiter.sleep')
+    @patch('helpers.rate_limiter.monotonic', return_value=100.0)
+    def test_requests_spaced(self, _, mock_sleep):
+        limiter = RateLimiter(4)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual([call.args[0] for call in mock_sleep.call_args_list],
+                         [0.25, 0.5])
+
+    @patch('helpers.rate_limiter.sleep')
+    @patch('helpers.rate_limiter.monotonic', side_effect=[100.0, 101.0])
+    def test_no_wait_after_idle(self, _, mock_sleep):
+        limiter = RateLimiter(4)
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+
+    def test_get_rate_limiter(self):
+        with patch.dict(environ, {'ASSIGNR_RATE_LIMIT': '2'}):
+            self.assertEqual(get_rate_limiter().interval, 0.5)
+        with patch.dict(environ, {'ASSIGNR_RATE_LIMIT': '0'}):
+            self.assertIsNone(get_rate_limiter())
+        with patch.dict(environ, {'ASSIGNR_RATE_LIMIT': 'fast'}):
+            with self.assertLogs(level='ERROR') as cm:
+                self.assertIsNone(get_rate_limiter())
+        self.assertEqual(cm.output, [
+            'ERROR:helpers.rate_limiter:ASSIGNR_RATE_LIMIT environment variable is '
+            'not a number, requests are not limited'])
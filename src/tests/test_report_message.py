@@ -0,0 +1,112 @@
+from os import environ
+from io import BytesIO
+from datetime import (date, datetime)
+from zipfile import ZipFile
+import csv
+from unittest import TestCase
+from unittest.mock import patch
+from helpers import constants
+from helpers.report_message import (build_report_message, flatten_value,
+                                    get_text_template_name, write_rows_archive)
+
+CONST_START_DATE = date(2024, 9, 21)
+CONST_END_DATE = date(2024, 9, 28)
+
+
+def get_report(report_nbr, league='Springfield'):
+    return {
+        'author': f'Referee {report_nbr}',
+        'game_dt': datetime(2024, 9, 21, 9, 0),
+        'league': league,
+        'age_group': 'Grade 5/6',
+        'gender': 'Boys',
+        'venue_subvenue': 'Springfield Elementary - Field 1',
+        'home_team': 'Springfield-1',
+        'away_team': 'Ogdenville-1',
+        'home_team_score': '2',
+        'away_team_score': '1',
+        'home_coach': 'Mr. Burns',
+        'away_coach': 'Mr. Smithers',
+        'officials': [{'position': 'Referee', 'name': 'Homer Simpson'}],
+        'narrative': 'Game played & finished.',
+        'admin_narrative': None
+    }
+
+
+def get_content(count):
+    return {
+        'start_date': CONST_START_DATE,
+        'end_date': CONST_END_DATE,
+        'reports': [get_report(nbr, 'Springfield' if nbr % 2 else 'Ogdenville')
+                    for nbr in range(count)]
+    }
+
+
+class TestReportMessage(TestCase):
+    def test_text_template_name(self):
+        self.assertEqual(get_text_template_name('misconduct.html.jinja'),
+                         'misconduct.text.jinja')
+        self.assertIsNone(get_text_template_name('summary.text.jinja'))
+
+    def test_flatten_value(self):
+        self.assertEqual(flatten_value(datetime(2024, 9, 21, 9, 0)),
+                         '2024-09-21T09:00:00')
+        self.assertEqual(flatten_value({'name': 'Summit Field', 'id': 1}),
+                         'Summit Field')
+        self.assertEqual(flatten_value([{'position': 'Referee', 'name': 'Homer'},
+                                        {'position': 'AR', 'name': 'Ned'}]),
+                         'Referee: Homer; AR: Ned')
+        self.assertEqual(flatten_value('text'), 'text')
+
+    def test_write_rows_archive(self):
+        data = write_rows_archive([get_report(1), get_report(2)], 'reports.csv')
+        with ZipFile(BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), ['reports.csv'])
+            rows = list(csv.DictReader(
+                archive.read('reports.csv').decode('utf-8').splitlines()))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['author'], 'Referee 2')
+        self.assertEqual(rows[0]['officials'], 'Referee: Homer Simpson')
+
+    def test_small_report_uses_text_template(self):
+        result = build_report_message(get_content(2), 'administrator.html.jinja',
+                                      'reports')
+        self.assertEqual(result['attachments'], [])
+        self.assertIn('<h1>Administrative Report', result['message'])
+        self.assertNotIn('<h1>', result['text'])
+        self.assertIn('Game played & finished.', result['text'])
+        self.assertIn('Game played &amp; finished.', result['message'])
+
+    @patch.dict(environ, {constants.REPORT_ROW_THRESHOLD: '3'})
+    def test_large_report_sends_summary_and_attachment(self):
+        with self.assertLogs(level='INFO') as cm:
+            result = build_report_message(get_content(5), 'administrator.html.jinja',
+                                          'reports', 'Administrative Report')
+        self.assertEqual(cm.output, [
+            'INFO:helpers.report_message:Administrative Report has 5 rows, '
+            'sending summary with administrator.zip'
+        ])
+        self.assertIn('5 entries are too many', result['message'])
+        self.assertIn('<td>Springfield</td>', result['message'])
+        self.assertIn('Ogdenville: 3', result['text'])
+        self.assertEqual(len(result['attachments']), 1)
+        self.assertEqual(result['attachments'][0]['file_name'], 'administrator.zip')
+
+    @patch.dict(environ, {constants.REPORT_BYTE_THRESHOLD: '100'})
+    def test_large_html_sends_summary(self):
+        with self.assertLogs(level='INFO'):
+            result = build_report_message(get_content(1), 'administrator.html.jinja',
+                                          'reports')
+        self.assertEqual(len(result['attachments']), 1)
+        self.assertIn('1 entries are too many', result['message'])
+
+    @patch.dict(environ, {constants.REPORT_ROW_THRESHOLD: 'many'})
+    def test_invalid_threshold(self):
+        with self.assertLogs(level='INFO') as cm:
+            result = build_report_message(get_content(1), 'administrator.html.jinja',
+                                          'reports')
+        self.assertEqual(cm.output, [
+            'ERROR:helpers.report_message:REPORT_ROW_THRESHOLD environment '
+            'variable is not an integer, defaulting to 25'
+        ])
+        self.assertEqual(result['attachments'], [])
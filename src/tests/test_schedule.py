@@ -0,0 +1,102 @@
+from os import path
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+import json
+from helpers.schedule import (Job, load_schedule, DEFAULT_REFRESH)
+
+COMMANDS = ('game_report', 'missing_game_reports')
+# A Wednesday
+CONST_NOW = datetime(2024, 1, 3, 9, 30)
+
+
+class TestJob(TestCase):
+    def test_every(self):
+        job = Job('reminders', 'missing_game_reports', every=3600)
+        self.assertEqual(job.next_run(CONST_NOW), datetime(2024, 1, 3, 10, 30))
+
+    def test_daily_later_today(self):
+        job = Job('report', 'game_report', at='18:00')
+        self.assertEqual(job.next_run(CONST_NOW), datetime(2024, 1, 3, 18, 0))
+
+    def test_daily_passed_today(self):
+        job = Job('report', 'game_report', at='09:30')
+        self.assertEqual(job.next_run(CONST_NOW), datetime(2024, 1, 4, 9, 30))
+
+    def test_days(self):
+        job = Job('report', 'game_report', at='07:00', days=['Sunday', 'mon'])
+        self.assertEqual(job.next_run(CONST_NOW), datetime(2024, 1, 7, 7, 0))
+        self.assertEqual(job.next_run(datetime(2024, 1, 7, 7, 0)),
+                         datetime(2024, 1, 8, 7, 0))
+
+    def test_every_or_at_required(self):
+        with self.assertRaises(ValueError):
+            Job('report', 'game_report')
+        with self.assertRaises(ValueError):
+            Job('report', 'game_report', every=60, at='07:00')
+
+    def test_invalid_values(self):
+        for kwargs in ({'every': 0}, {'every': 'hourly'}, {'at': '7am'},
+                       {'at': '07:00', 'days': ['someday']}):
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    Job('report', 'game_report', **kwargs)
+
+
+class TestLoadSchedule(TestCase):
+    def write_schedule(self, temp_dir, settings):
+        schedule_file = path.join(temp_dir, 'schedule.json')
+        with open(schedule_file, 'w') as schedule:
+            json.dump(settings, schedule)
+        return schedule_file
+
+    def test_load_schedule(self):
+        with TemporaryDirectory() as temp_dir:
+            schedule_file = self.write_schedule(temp_dir, {
+                'refresh': 600,
+                'jobs': [
+                    {'command': 'game_report', 'at': '07:00', 'days': ['sun']},
+                    {'name': 'referee_reminders', 'command': 'missing_game_reports',
+                     'args': ['-r'], 'every': 3600}
+                ]
+            })
+            jobs, refresh = load_schedule(schedule_file, COMMANDS)
+        self.assertEqual(refresh, 600)
+        self.assertEqual([job.name for job in jobs], ['game_report', 'referee_reminders'])
+        self.assertEqual(jobs[1].args, ['-r'])
+
+    def test_default_refresh(self):
+        with TemporaryDirectory() as temp_dir:
+            schedule_file = self.write_schedule(temp_dir, {
+                'jobs': [{'command': 'game_report', 'every': 60}]
+            })
+            _, refresh = load_schedule(schedule_file, COMMANDS)
+        self.assertEqual(refresh, DEFAULT_REFRESH)
+
+    def test_invalid_schedules(self):
+        for settings in ({'jobs': []},
+                         {'jobs': [{'command': 'delete_games', 'every': 60}]},
+                         {'jobs': [{'command': 'game_report', 'every': 60},
+                                   {'command': 'game_report', 'at': '07:00'}]},
+                         {'jobs': [{'command': 'game_report', 'every': 60}], 'refresh': None},
+                         {'jobs': [{'command': 'game_report', 'every': 60}], 'refresh': [600]},
+                         {'jobs': [{'command': 'game_report', 'every': 60}], 'refresh': 'daily'},
+                         {'jobs': [{'command': 'game_report', 'every': 60}], 'refresh': 0}):
+            with self.subTest(settings=settings):
+                with TemporaryDirectory() as temp_dir:
+                    schedule_file = self.write_schedule(temp_dir, settings)
+                    with self.assertRaises(ValueError):
+                        load_schedule(schedule_file, COMMANDS)
+
+    def test_missing_file(self):
+        with TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                load_schedule(path.join(temp_dir, 'schedule.json'), COMMANDS)
+
+    def test_unreadable_file(self):
+        with TemporaryDirectory() as temp_dir:
+            schedule_file = path.join(temp_dir, 'schedule.json')
+            with open(schedule_file, 'w') as schedule:
+                schedule.write('{jobs')
+            with self.assertRaises(ValueError):
+                load_schedule(schedule_file, COMMANDS)
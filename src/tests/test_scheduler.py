@@ -0,0 +1,187 @@
+from os import path
+from datetime import (datetime, timedelta)
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from urllib.error import HTTPError
+from urllib.request import urlopen
+import json
+from scheduler import (Scheduler, get_arguments, start_health_server,
+                       DEFAULT_PORT, PORT, SCHEDULE_FILE)
+
+CONST_NOW = datetime(2024, 1, 3, 9, 30)
+SCHEDULE = {
+    'refresh': 3600,
+    'jobs': [
+        {'command': 'game_report', 'at': '10:00'},
+        {'name': 'referee_reminders', 'command': 'missing_game_reports',
+         'args': ['-r'], 'every': 600}
+    ]
+}
+
+
+class Clock:
+    def __init__(self, now) -> None:
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestGetArguments(TestCase):
+    def test_defaults(self):
+        rc, args = get_arguments([])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {SCHEDULE_FILE: 'schedule.json', PORT: DEFAULT_PORT})
+
+    def test_invalid_port(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-p', 'http'])
+        self.assertEqual(cm.output, ['ERROR:scheduler:Port value, http is invalid'])
+        self.assertEqual(rc, 88)
+
+    def test_help(self):
+        with self.assertLogs(level='INFO'):
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(rc, 99)
+
+
+class TestScheduler(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.schedule_file = path.join(self.temp_dir.name, 'schedule.json')
+        self.write_schedule(SCHEDULE)
+        self.clock = Clock(CONST_NOW)
+        self.context = MagicMock()
+        self.context.created_at = CONST_NOW
+        self.scheduler = Scheduler(self.schedule_file, self.context, self.clock)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_schedule(self, settings):
+        with open(self.schedule_file, 'w') as schedule:
+            json.dump(settings, schedule)
+
+    def test_load(self):
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(self.scheduler.load(), 0)
+        self.assertEqual(self.scheduler.next_runs, {
+            'game_report': datetime(2024, 1, 3, 10, 0),
+            'referee_reminders': datetime(2024, 1, 3, 9, 40)
+        })
+        self.assertEqual(self.scheduler.seconds_until_next_run(), 600)
+
+    def test_load_invalid(self):
+        self.write_schedule({'jobs': []})
+        with self.assertLogs(level='INFO'):
+            self.assertEqual(self.scheduler.load(), 88)
+
+    @patch('scheduler.import_module')
+    def test_run_pending(self, mock_import_module):
+        module = mock_import_module.return_value
+        module.get_arguments.return_value = (0, {'reminder': True})
+        module.run.return_value = 0
+        with self.assertLogs(level='INFO'):
+            self.scheduler.load()
+            self.clock.now = datetime(2024, 1, 3, 9, 45)
+            self.scheduler.run_pending()
+
+        mock_import_module.assert_called_once_with('missing_game_reports')
+        module.get_arguments.assert_called_once_with(['-r'])
+        module.run.assert_called_once_with({'reminder': True}, self.context)
+        self.context.clear.assert_called_once()
+        self.context.reset.assert_not_called()
+        self.assertEqual(self.scheduler.next_runs['referee_reminders'],
+                         datetime(2024, 1, 3, 9, 55))
+        self.assertEqual(self.scheduler.metrics['referee_reminders']['runs'], 1)
+        self.assertEqual(self.scheduler.metrics['referee_reminders']['last_rc'], 0)
+        self.assertEqual(self.scheduler.metrics['game_report']['runs'], 0)
+
+    @patch('scheduler.import_module')
+    def test_failures_counted(self, mock_import_module):
+        module = mock_import_module.return_value
+        module.get_arguments.return_value = (0, {})
+        module.run.side_effect = [66, KeyError('id')]
+        with self.assertLogs(level='INFO') as cm:
+            self.scheduler.load()
+            job = self.scheduler.jobs[1]
+            self.assertEqual(self.scheduler.run_job(job), 66)
+            self.assertEqual(self.scheduler.run_job(job), 1)
+
+        self.assertIn('ERROR:scheduler:referee_reminders failed with return code 66',
+                      cm.output)
+        self.assertEqual(self.scheduler.metrics['referee_reminders']['failures'], 2)
+
+    @patch('scheduler.import_module')
+    def test_context_refreshed(self, mock_import_module):
+        module = mock_import_module.return_value
+        module.get_arguments.return_value = (0, {})
+        module.run.return_value = 0
+        with self.assertLogs(level='INFO'):
+            self.scheduler.load()
+            self.clock.now = CONST_NOW + timedelta(hours=2)
+            self.scheduler.run_job(self.scheduler.jobs[0])
+        self.context.close.assert_called_once()
+        self.context.reset.assert_called_once()
+
+    def test_reload_keeps_schedule_when_invalid(self):
+        with self.assertLogs(level='INFO'):
+            self.scheduler.load()
+            self.write_schedule({'jobs': [{'command': 'delete_games', 'every': 60}]})
+            self.scheduler.request_reload()
+            self.scheduler.reload()
+        self.assertEqual(len(self.scheduler.jobs), 2)
+        self.assertFalse(self.scheduler.reload_requested)
+        self.context.reset.assert_not_called()
+
+    def test_reload(self):
+        with self.assertLogs(level='INFO') as cm:
+            self.scheduler.load()
+            self.write_schedule({'jobs': [{'command': 'flush_outbox', 'every': 60}]})
+            self.scheduler.reload()
+        self.assertIn('INFO:scheduler:Reloaded schedule, 1 job(s)', cm.output)
+        self.assertEqual([job.name for job in self.scheduler.jobs], ['flush_outbox'])
+        self.context.reset.assert_called_once()
+
+    def test_stop_before_pending_jobs(self):
+        with self.assertLogs(level='INFO') as cm:
+            self.scheduler.load()
+            self.scheduler.request_stop()
+            self.scheduler.run_forever()
+        self.assertEqual(cm.output[-1], 'INFO:scheduler:Scheduler stopped')
+        self.context.close.assert_called_once()
+
+    def test_metrics(self):
+        with self.assertLogs(level='INFO'):
+            self.scheduler.load()
+        self.clock.now = CONST_NOW + timedelta(seconds=90)
+        metrics = self.scheduler.get_metrics()
+        self.assertIn('assignr_scheduler_uptime_seconds 90\n', metrics)
+        self.assertIn('assignr_job_runs_total{job="game_report"} 0\n', metrics)
+        self.assertIn('assignr_job_last_return_code{job="referee_reminders"} NaN\n', metrics)
+
+    def test_health_server(self):
+        with self.assertLogs(level='INFO'):
+            self.scheduler.load()
+            server = start_health_server(self.scheduler, 0)
+        try:
+            url = f'http://127.0.0.1:{server.server_address[1]}'
+            with urlopen(f'{url}/health') as response:
+                health = json.load(response)
+            self.assertEqual(health['status'], 'ok')
+            self.assertEqual(health['jobs']['game_report']['next_run'],
+                             '2024-01-03T10:00:00')
+            with urlopen(f'{url}/metrics') as response:
+                self.assertIn(b'assignr_job_failures_total', response.read())
+
+            self.scheduler.request_stop()
+            with self.assertRaises(HTTPError) as cm:
+                urlopen(f'{url}/health')
+            self.assertEqual(cm.exception.code, 503)
+            with self.assertRaises(HTTPError) as cm:
+                urlopen(f'{url}/unknown')
+            self.assertEqual(cm.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
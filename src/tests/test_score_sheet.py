@@ -1,9 +1,12 @@
 from datetime import (datetime, timedelta)
 from unittest import TestCase
-from score_sheet import get_arguments
+from unittest.mock import (patch, MagicMock)
+from score_sheet import (get_arguments, run)
 
 USAGE='USAGE: score_sheet.py -s <start-date> (MM/DD/YYYY) ' \
-        '-e <end-date> (MM/DD/YYYY) -g <game type, default "Futsal">' 
+        '-e <end-date> (MM/DD/YYYY) -g <game type, default "Futsal">' \
+        ' -f <csv|ndjson|parquet> -o <output file>' \
+        ' -d <score sheet directory> -z <archive> -j <workers> -p'
 ERROR_USAGE=f'ERROR:score_sheet:{USAGE}'
 DATE_01012020 = '01/01/2020'
 DATE_01012021 = '01/01/2021'
@@ -13,7 +16,9 @@ DATE_FORMAT_01012021 = datetime.strptime(DATE_01012021, "%m/%d/%Y").date()
 class TestGetArguments(TestCase):
     def test_help(self):
         expected_args = {'start_date': None, 'end_date': None,
-                         'game_type': None}
+                         'game_type': None, 'format': 'csv',
+                         'output': None, 'sheet_dir': None, 'archive': None,
+                         'workers': None, 'pdf': False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-h'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -24,7 +29,13 @@ class TestGetArguments(TestCase):
         expected_args = {
             'start_date': DATE_FORMAT_01012020,
             'end_date': DATE_FORMAT_01012021,
-            'game_type': GAME_TYPE
+            'game_type': GAME_TYPE,
+            'format': 'csv',
+            'output': None,
+            'sheet_dir': None,
+            'archive': None,
+            'workers': None,
+            'pdf': False
         }
         rc, args = get_arguments(['-s', DATE_01012020, '-e', DATE_01012021,
                                   '-g', GAME_TYPE])
@@ -33,7 +44,9 @@ class TestGetArguments(TestCase):
 
     def test_invalid_options(self):
         expected_args = {'start_date': None, 'end_date': None,
-                         'game_type': None}
+                         'game_type': None, 'format': 'csv',
+                         'output': None, 'sheet_dir': None, 'archive': None,
+                         'workers': None, 'pdf': False}
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-n'])
         self.assertEqual(cm.output, [ERROR_USAGE])
@@ -46,7 +59,13 @@ class TestGetArguments(TestCase):
         expected_args = {
             'start_date': start_date,
             'end_date': '01/01/2020',
-            'game_type': GAME_TYPE
+            'game_type': GAME_TYPE,
+            'format': 'csv',
+            'output': None,
+            'sheet_dir': None,
+            'archive': None,
+            'workers': None,
+            'pdf': False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-e', DATE_01012020,'-g', GAME_TYPE])
@@ -60,7 +79,13 @@ class TestGetArguments(TestCase):
         expected_args = {
             'start_date': DATE_01012020,
             'end_date': end_date,
-            'game_type': GAME_TYPE
+            'game_type': GAME_TYPE,
+            'format': 'csv',
+            'output': None,
+            'sheet_dir': None,
+            'archive': None,
+            'workers': None,
+            'pdf': False
         }
         with self.assertLogs(level='INFO') as cm:
             rc, args = get_arguments(['-s', DATE_01012020, '-g', GAME_TYPE])
@@ -74,7 +99,13 @@ class TestGetArguments(TestCase):
         expected_args = {
             'start_date': start_date,
             'end_date': end_date,
-            'game_type': GAME_TYPE
+            'game_type': GAME_TYPE,
+            'format': 'csv',
+            'output': None,
+            'sheet_dir': None,
+            'archive': None,
+            'workers': None,
+            'pdf': False
         }
         error_message = [
             'ERROR:score_sheet:Start Date, 2021-01-01, occurs AFTER End Date:2020-01-01',
@@ -86,3 +117,44 @@ class TestGetArguments(TestCase):
         self.assertEqual(cm.output, error_message)
         self.assertEqual(rc, 77)
         self.assertEqual(args, expected_args)
+
+
+class TestRun(TestCase):
+    def test_games_exported(self):
+        context = MagicMock()
+        assignr = MagicMock()
+        assignr.iter_league_games.return_value = iter([
+            {'id': 1, 'league': 'Futsal', 'referees': [], 'assignor': None}])
+        assignr.without_response_cache.return_value = assignr
+        context.load_users.return_value = (0, assignr)
+        args = {'start_date': DATE_FORMAT_01012020, 'end_date': DATE_FORMAT_01012021,
+                'game_type': GAME_TYPE, 'format': 'csv', 'output': None,
+                'sheet_dir': None}
+
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(args, context), 0)
+        self.assertEqual(cm.output, ['INFO:score_sheet:Exported 1 game(s)'])
+        self.assertTrue(mock_stdout.write.call_args_list[0].args[0].startswith(
+            'id,game_date,game_time'))
+        assignr.iter_league_games.assert_called_once_with(
+            GAME_TYPE, DATE_FORMAT_01012020, DATE_FORMAT_01012021)
+        assignr.without_response_cache.assert_called_once()
+
+    @patch('helpers.score_sheets.ScoreSheetGenerator')
+    def test_score_sheets_generated(self, mock_generator):
+        mock_generator.return_value.generate.return_value = (['score_sheet_1'], 1, 0)
+        context = MagicMock()
+        context.load_users.return_value = (0, MagicMock())
+        args = {'start_date': DATE_FORMAT_01012020, 'end_date': DATE_FORMAT_01012021,
+                'game_type': GAME_TYPE, 'format': 'csv', 'output': None,
+                'sheet_dir': 'sheets', 'archive': None, 'workers': 4, 'pdf': False}
+
+        with self.assertLogs(level='INFO') as cm:
+            self.assertEqual(run(args, context), 0)
+        mock_generator.assert_called_once_with('sheets', 4, False)
+        mock_generator.return_value.bundle.assert_called_once_with(
+            'sheets/score_sheets_2020-01-01_2021-01-01.zip', ['score_sheet_1'])
+        self.assertEqual(cm.output, [
+            'INFO:score_sheet:1 score sheet(s) rendered, 0 unchanged',
+            'INFO:score_sheet:1 score sheet(s) saved to sheets/score_sheets_2020-01-01_2021-01-01.zip'])
@@ -0,0 +1,75 @@
+from os import (path, remove)
+from tempfile import TemporaryDirectory
+from unittest import (TestCase, skipIf)
+from unittest.mock import patch
+from importlib.util import find_spec
+from zipfile import ZipFile
+
+from helpers.score_sheets import ScoreSheetGenerator
+
+
+def get_game(game_id, home_team='Springfield-1'):
+    return {
+        'id': game_id, 'game_date': '08/03/2024', 'game_time': '09:00 AM',
+        'league': 'Futsal', 'age_group': 'Grade 7/8', 'gender': 'Boys',
+        'home_team': home_team, 'away_team': 'Ogdenville-1',
+        'venue': {'name': 'Springfield Elementary'}, 'sub_venue': 'Gym',
+        'cancelled': False,
+        'referees': [{'position': 'Referee', 'first_name': 'Homer',
+                      'last_name': 'Simpson'}]
+    }
+
+
+class TestScoreSheetGenerator(TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.sheet_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sheets_rendered_once(self):
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=2)
+        names, rendered, failed = generator.generate([get_game(1), get_game(2)])
+        self.assertEqual((names, rendered, failed),
+                         (['score_sheet_1', 'score_sheet_2'], 2, 0))
+        with open(path.join(self.sheet_dir, 'score_sheet_1.html')) as sheet:
+            html = sheet.read()
+        self.assertIn('Springfield-1', html)
+        self.assertIn('Homer Simpson', html)
+
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=2)
+        self.assertEqual(generator.generate([get_game(1), get_game(2)])[1], 0)
+        self.assertEqual(generator.generate([get_game(1), get_game(2, 'Shelbyville-1')])[1], 1)
+
+    def test_missing_sheet_rendered_again(self):
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=1)
+        generator.generate([get_game(1)])
+        remove(path.join(self.sheet_dir, 'score_sheet_1.html'))
+        self.assertEqual(generator.generate([get_game(1)])[1], 1)
+
+    def test_template_change_renders_again(self):
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=1)
+        generator.generate([get_game(1)])
+        with patch.object(ScoreSheetGenerator, 'get_template_source',
+                          return_value='<p>{{ id }}</p>'):
+            self.assertEqual(generator.generate([get_game(1)])[1], 1)
+
+    def test_bundle(self):
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=2)
+        names, _, _ = generator.generate([get_game(2), get_game(1)])
+        archive_file = path.join(self.sheet_dir, 'bundle', 'score_sheets.zip')
+        generator.bundle(archive_file, names)
+        with ZipFile(archive_file) as archive:
+            self.assertEqual(archive.namelist(),
+                             ['score_sheet_1.html', 'score_sheet_2.html'])
+
+    @skipIf(find_spec('weasyprint') is not None, 'weasyprint is installed')
+    def test_failed_sheet(self):
+        generator = ScoreSheetGenerator(self.sheet_dir, workers=1, pdf=True)
+        with self.assertLogs(level='INFO') as cm:
+            names, rendered, failed = generator.generate([get_game(1)])
+        self.assertEqual((names, rendered, failed), ([], 0, 1))
+        self.assertTrue(cm.output[0].startswith(
+            'ERROR:helpers.score_sheets:Score sheet score_sheet_1 not rendered:'))
+        self.assertNotIn('score_sheet_1', generator.manifest)
@@ -0,0 +1,127 @@
+from unittest import TestCase
+from unittest.mock import patch
+from google.auth.credentials import AnonymousCredentials
+from helpers.sheets import (SheetsReader, build_sheets_service,
+                            get_coach_information, get_modified_time,
+                            get_sheets_service, rows_to_dict, split_ranges)
+from tests.fake_sheets import FakeSheetsService
+
+CONST_GRADE_78 = "Grade 7/8"
+
+
+class TestSheets(TestCase):
+    def test_rows_to_dict_success(self):
+        rows = [
+            [CONST_GRADE_78, 'Boys', 'Hanover-1', 'Mickey Mouse'],
+            [CONST_GRADE_78, 'Girls', 'Hanover-1', 'Dumbo'],
+            ['Grade 5/6', 'Boys', 'Hanover-1', 'Bad Coach']
+        ]
+        expected_result = {
+            CONST_GRADE_78: {
+                'Boys': {'Hanover-1': 'Mickey Mouse'}, 
+                'Girls': {'Hanover-1': 'Dumbo'}
+            },
+            'Grade 5/6': {
+                'Boys': {'Hanover-1': 'Bad Coach'}
+            }
+        }
+        result = rows_to_dict(rows)
+        self.assertEqual(result, expected_result)
+
+    @patch('helpers.sheets.get_sheets_service')
+    def test_get_coach_information(self, mock_service):
+        mock_service.return_value = FakeSheetsService({
+            'Grade 7/8!A:D': [
+                ['Age Group', 'Gender', 'Team', 'Coach'],
+                [],
+                [CONST_GRADE_78, 'Boys', 'Hanover-1', 'Mickey Mouse']
+            ],
+            'Grade 5/6!A:D': [['Grade 5/6', 'Girls', 'Hanover-1', 'Minnie Mouse']]
+        })
+        with self.assertLogs(level='INFO'):
+            result = get_coach_information('sheet_id', 'Grade 7/8!A:D; Grade 5/6!A:D')
+        self.assertEqual(result, {
+            CONST_GRADE_78: {'Boys': {'Hanover-1': 'Mickey Mouse'}},
+            'Grade 5/6': {'Girls': {'Hanover-1': 'Minnie Mouse'}}
+        })
+        self.assertEqual(mock_service.return_value.calls['batchGet'], 1)
+
+    @patch('helpers.sheets.get_sheets_service')
+    def test_get_coach_information_error(self, mock_service):
+        mock_service.return_value = FakeSheetsService()
+        mock_service.return_value.set_offline()
+        with self.assertLogs(level='INFO') as cm:
+            result = get_coach_information('sheet_id', 'Grade 7/8!A:D')
+        self.assertEqual(result, {})
+        self.assertTrue(cm.output[0].startswith('ERROR:helpers.sheets:An error occurred:'))
+
+    def test_build_sheets_service(self):
+        service = build_sheets_service(AnonymousCredentials())
+        self.assertTrue(hasattr(service, 'spreadsheets'))
+
+    @patch('helpers.sheets.build')
+    @patch('helpers.sheets.pkgutil.get_data', return_value=None)
+    def test_build_sheets_service_without_document(self, _, mock_build):
+        build_sheets_service(None)
+        mock_build.assert_called_once_with('sheets', 'v4', credentials=None,
+                                           cache_discovery=False)
+
+    @patch('helpers.sheets.build')
+    @patch('helpers.sheets.pkgutil.get_data', side_effect=FileNotFoundError)
+    def test_build_sheets_service_document_missing(self, _, mock_build):
+        build_sheets_service(None)
+        mock_build.assert_called_once_with('sheets', 'v4', credentials=None,
+                                           cache_discovery=False)
+
+    def test_get_modified_time(self):
+        service = FakeSheetsService(modified_time='2024-09-08T12:00:00.000Z')
+        self.assertEqual(get_modified_time(service, 'sheet_id'),
+                         '2024-09-08T12:00:00.000Z')
+
+
+class TestSheetsReader(TestCase):
+    def setUp(self):
+        self.service = FakeSheetsService({
+            'Grade 5/6!A:D': [['Grade 5/6', 'Boys', 'Hanover-1', 'Goofy']],
+            'Grade 7/8!A:D': [['Age Group', 'Gender', 'Team', 'Coach'],
+                              [CONST_GRADE_78, 'Boys', 'Hanover-1', 'Mickey Mouse']]
+        })
+
+    def test_split_ranges(self):
+        self.assertEqual(split_ranges('Grade 5/6!A:D; Grade 7/8!A:D;'),
+                         ['Grade 5/6!A:D', 'Grade 7/8!A:D'])
+
+    def test_read_ranges_in_one_request(self):
+        reader = SheetsReader(self.service)
+        with self.assertLogs(level='INFO') as cm:
+            result = reader.read_ranges('sheet_id', ['Grade 7/8!A:D', 'Grade 5/6!A:D',
+                                                     'Empty!A:D'])
+        self.assertEqual(result['Grade 5/6!A:D'],
+                         [['Grade 5/6', 'Boys', 'Hanover-1', 'Goofy']])
+        self.assertEqual(result['Empty!A:D'], [])
+        self.assertEqual(self.service.calls, {'get': 0, 'batchGet': 1, 'files.get': 0})
+        self.assertEqual(cm.output, [
+            'INFO:helpers.sheets:3 rows retrieved from 3 range(s)'])
+
+    def test_read_no_ranges(self):
+        self.assertEqual(SheetsReader(self.service).read_ranges('sheet_id', []), {})
+        self.assertEqual(self.service.calls['batchGet'], 0)
+
+    def test_read_coach_rows(self):
+        with self.assertLogs(level='INFO'):
+            result = SheetsReader(self.service).read_coach_rows(
+                'sheet_id', ['Grade 7/8!A:D', 'Grade 5/6!A:D'])
+        self.assertEqual(result, {
+            'Grade 7/8!A:D': [[CONST_GRADE_78, 'Boys', 'Hanover-1', 'Mickey Mouse']],
+            'Grade 5/6!A:D': [['Grade 5/6', 'Boys', 'Hanover-1', 'Goofy']]
+        })
+
+    @patch('helpers.sheets.build_sheets_service')
+    @patch('helpers.sheets.get_credentials', return_value=None)
+    def test_service_built_once(self, _, mock_build):
+        get_sheets_service.cache_clear()
+        try:
+            self.assertIs(SheetsReader().service, SheetsReader().service)
+            mock_build.assert_called_once_with(None)
+        finally:
+            get_sheets_service.cache_clear()
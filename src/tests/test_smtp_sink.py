@@ -0,0 +1,42 @@
+import smtplib
+from unittest import TestCase
+from helpers.email import EMailClient
+from helpers.smtp_sink import SMTPSink
+
+CONST_SENDER_EMAIL = 'test_sender@example.com'
+CONST_SEND_TO = 'Homer Simpson<homer@example.com>,marge@example.com'
+
+
+class TestSMTPSink(TestCase):
+    def setUp(self):
+        self.sink = SMTPSink().start()
+
+    def tearDown(self):
+        self.sink.stop()
+
+    def test_email_client_delivers_to_sink(self):
+        email_client = EMailClient('127.0.0.1', self.sink.port, CONST_SENDER_EMAIL,
+                                   'Test Sender', 'test_password', starttls=False)
+        for _ in range(2):
+            result = email_client.send_email('Test Email', '<p>Test message</p>',
+                                             CONST_SEND_TO, True)
+            self.assertEqual(result, 0)
+
+        stats = self.sink.stats.as_dict()
+        self.assertEqual(stats['connections'], 2)
+        self.assertEqual(stats['handshakes'], 2)
+        self.assertEqual(stats['logins'], 2)
+        self.assertEqual(stats['messages'], 2)
+        self.assertEqual(stats['recipients'], 4)
+        self.assertGreater(stats['bytes'], 0)
+
+    def test_one_connection_many_messages(self):
+        with smtplib.SMTP('127.0.0.1', self.sink.port) as server:
+            server.login(CONST_SENDER_EMAIL, 'test_password')
+            for _ in range(3):
+                server.sendmail(CONST_SENDER_EMAIL, ['homer@example.com'],
+                                'Subject: Test\r\n\r\nTest message\r\n')
+
+        stats = self.sink.stats.as_dict()
+        self.assertEqual(stats['connections'], 1)
+        self.assertEqual(stats['messages'], 3)
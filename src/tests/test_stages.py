@@ -0,0 +1,75 @@
+from threading import Barrier
+from time import sleep
+from unittest import TestCase
+from helpers.stages import StageExecutor
+
+
+class TestStageExecutor(TestCase):
+    def test_results_passed_in_order(self):
+        stages = StageExecutor()
+        stages.add('first', lambda: 2)
+        stages.add('second', lambda: 3)
+        stages.add('product', lambda first, second: first * second - second,
+                   requires=('first', 'second'))
+        with self.assertLogs(level='INFO'):
+            results = stages.run()
+        self.assertEqual(results, {'first': 2, 'second': 3, 'product': 3})
+
+    def test_independent_stages_run_concurrently(self):
+        # Each stage waits for the other, so this only finishes when both
+        # run at the same time
+        barrier = Barrier(2, timeout=5)
+        stages = StageExecutor()
+        stages.add('sheets', barrier.wait)
+        stages.add('assignr', barrier.wait)
+        with self.assertLogs(level='INFO'):
+            results = stages.run()
+        self.assertEqual(sorted(results.values()), [0, 1])
+
+    def test_dependencies_complete_first(self):
+        completed = []
+        stages = StageExecutor()
+        stages.add('slow', lambda: sleep(0.05) or completed.append('slow'))
+        stages.add('fast', lambda: completed.append('fast'))
+        stages.add('after', lambda *_: completed.append('after'),
+                   requires=('slow', 'fast'))
+        with self.assertLogs(level='INFO'):
+            stages.run()
+        self.assertEqual(completed[-1], 'after')
+
+    def test_failed_stage(self):
+        started = []
+
+        def fail():
+            raise KeyError('league')
+
+        stages = StageExecutor()
+        stages.add('reports', fail)
+        stages.add('emails', lambda reports: started.append('emails'),
+                   requires=('reports',))
+        with self.assertLogs(level='INFO') as cm:
+            with self.assertRaises(KeyError):
+                stages.run()
+        self.assertIn("ERROR:helpers.stages:Stage reports failed: 'league'", cm.output)
+        self.assertEqual(started, [])
+
+    def test_critical_path(self):
+        stages = StageExecutor()
+        stages.add('coaches', lambda: sleep(0.01))
+        stages.add('reports', lambda: sleep(0.08))
+        stages.add('classify', lambda *_: None, requires=('coaches', 'reports'))
+        stages.add('email', lambda *_: sleep(0.01), requires=('classify',))
+        with self.assertLogs(level='INFO') as cm:
+            stages.run()
+        self.assertEqual(stages.get_critical_path(), ['reports', 'classify', 'email'])
+        self.assertTrue(cm.output[-1].startswith(
+            'INFO:helpers.stages:Critical path reports -> classify -> email: '))
+        self.assertEqual(len(cm.output), 5)
+
+    def test_invalid_stages(self):
+        stages = StageExecutor()
+        stages.add('reports', lambda: None)
+        with self.assertRaises(ValueError):
+            stages.add('reports', lambda: None)
+        with self.assertRaises(ValueError):
+            stages.add('emails', lambda reports: None, requires=('missing',))
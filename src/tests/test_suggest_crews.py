@@ -0,0 +1,64 @@
+from datetime import date
+from unittest import TestCase
+from unittest.mock import (patch, MagicMock)
+from suggest_crews import (get_arguments, run)
+
+USAGE='USAGE: suggest_crews.py -s <start-date> -e <end-date>' \
+    ' -g <game type, default "Coastal"> -m <game minutes> -t <turnaround minutes>' \
+    ' -x <max games per day> -f <csv|ndjson|parquet> -o <output file> FORMAT=MM/DD/YYYY'
+
+
+class TestGetArguments(TestCase):
+    def test_help(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-h'])
+        self.assertEqual(cm.output, [f"ERROR:suggest_crews:{USAGE}"])
+        self.assertEqual(rc, 99)
+
+    def test_valid_options(self):
+        rc, args = get_arguments(['-s', '09/07/2024', '-e', '09/08/2024', '-x', '2'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(args, {'start_date': date(2024, 9, 7), 'end_date': date(2024, 9, 8),
+                                'game_type': 'Coastal', 'game_minutes': 90,
+                                'turnaround_minutes': 30, 'max_games': 2,
+                                'format': 'csv', 'output': None})
+
+    def test_invalid_max_games(self):
+        with self.assertLogs(level='INFO') as cm:
+            rc, _ = get_arguments(['-s', '09/07/2024', '-e', '09/08/2024', '-x', '0'])
+        self.assertEqual(rc, 88)
+        self.assertEqual(cm.output, ['ERROR:suggest_crews:Max Games value, 0 is invalid'])
+
+
+class TestRun(TestCase):
+    def test_crews_written(self):
+        context = MagicMock()
+        assignr = MagicMock()
+        assignr.referees = {10: {'first_name': 'John', 'last_name': 'Doe'}}
+        assignr.get_availability.return_value = [{'date': '2024-09-07', 'avail': 'ALL DAY'}]
+        assignr.get_game_ids.return_value = {
+            1: {'id': 1, 'game_date': '2024-09-07', 'game_time': '9:00 AM',
+                'league': 'CYSL', 'home_team': 'Home', 'away_team': 'Away',
+                'venue': {'id': 5, 'name': 'Park'}, 'cancelled': False,
+                'referees': [], 'open_positions': ['Referee', 'Assistant Referee']}}
+        context.load_users.return_value = (0, assignr)
+        args = {'start_date': date(2024, 9, 7), 'end_date': date(2024, 9, 8),
+                'game_type': 'Coastal', 'game_minutes': 90, 'turnaround_minutes': 30,
+                'max_games': 3, 'format': 'ndjson', 'output': None}
+
+        with patch('helpers.exporters.stdout') as mock_stdout:
+            with self.assertLogs(level='INFO') as cm:
+                self.assertEqual(run(args, context), 0)
+        rows = [call.args[0] for call in mock_stdout.write.call_args_list
+                if call.args[0] != '\n']
+        self.assertEqual(rows, [
+            '{"id": 1, "game_date": "2024-09-07", "game_time": "9:00 AM", '
+            '"league": "CYSL", "home_team": "Home", "away_team": "Away", '
+            '"venue": "Park", "position": "Referee", "referee_id": 10, '
+            '"referee": "John Doe"}',
+            '{"id": 1, "game_date": "2024-09-07", "game_time": "9:00 AM", '
+            '"league": "CYSL", "home_team": "Home", "away_team": "Away", '
+            '"venue": "Park", "position": "Assistant Referee", "referee_id": null, '
+            '"referee": null}'])
+        self.assertEqual(cm.output, [
+            'INFO:suggest_crews:Proposed referees for 1 of 2 open position(s)'])